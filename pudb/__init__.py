@@ -297,7 +297,84 @@ def _interrupt_handler(signum, frame):
     _get_debugger().set_trace(frame, as_breakpoint=False)
 
 
-def set_interrupt_handler(interrupt_signal: int | None = None):
+class _Watchdog:
+    """Watches the main thread from a daemon thread and sends it
+    `interrupt_signal` once it has been at the same line of the same frame
+    for `timeout` seconds. Only samples :func:`sys._current_frames`, so no
+    trace function is needed until it fires.
+    """
+
+    def __init__(self, main_thread_id: int, interrupt_signal: int, timeout: float):
+        import threading
+
+        self.main_thread_id = main_thread_id
+        self.interrupt_signal = interrupt_signal
+        self.timeout = timeout
+        self._stop_event = threading.Event()
+        self.thread = threading.Thread(
+                target=self._run, name="pudb-watchdog", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    @staticmethod
+    def _debugger_ui_active() -> bool:
+        # Avoid importing here: the main thread may hold the import lock.
+        debugger_mod = sys.modules.get("pudb.debugger")
+        if debugger_mod is None:
+            return False
+
+        current_debugger = debugger_mod.Debugger._current_debugger
+        return bool(current_debugger) and current_debugger[0].ui.show_count > 0
+
+    def _fire(self):
+        import signal
+        if hasattr(signal, "pthread_kill"):
+            signal.pthread_kill(self.main_thread_id, self.interrupt_signal)
+        else:
+            import _thread
+            try:
+                _thread.interrupt_main(self.interrupt_signal)
+            except TypeError:
+                # Python < 3.10 can only simulate SIGINT.
+                _thread.interrupt_main()
+
+    def _run(self):
+        from time import monotonic
+
+        last_position = None
+        last_progress = monotonic()
+        fired_position = None
+
+        while not self._stop_event.wait(min(self.timeout / 4, 1)):
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is None:
+                # The main thread has exited.
+                return
+            position = (id(frame), frame.f_code, frame.f_lineno)
+            del frame
+
+            now = monotonic()
+            if position != last_position or self._debugger_ui_active():
+                last_position = position
+                last_progress = now
+                continue
+
+            if position != fired_position and now - last_progress >= self.timeout:
+                fired_position = position
+                self._fire()
+
+
+_watchdog: _Watchdog | None = None
+
+
+def set_interrupt_handler(
+            interrupt_signal: int | None = None,
+            watchdog_timeout: float | None = None,
+        ):
     """
     Set up an interrupt handler, to activate PuDB when Python receives the
     signal `interrupt_signal`.  By default it is SIGINT (i.e., Ctrl-c).
@@ -316,8 +393,24 @@ def set_interrupt_handler(interrupt_signal: int | None = None):
     Note, this may not work if you use threads or subprocesses.
 
     Note, this only works when called from the main thread.
+
+    If `watchdog_timeout` is given, a daemon thread additionally watches
+    the main thread and sends it `interrupt_signal` when it has stayed at
+    the same line of the same frame for more than `watchdog_timeout`
+    seconds, so that PuDB breaks into the stuck code without anyone
+    pressing Ctrl-c. The watchdog fires at most once per stall and does not
+    use a trace function until then. Like Ctrl-c, it cannot break into code
+    that stays blocked inside a C function, e.g. waiting for a lock
+    without a timeout.
+
+    >>> pudb.set_interrupt_handler(watchdog_timeout=600)
     """
 
+    global _watchdog
+
+    if watchdog_timeout is not None and watchdog_timeout <= 0:
+        raise ValueError("watchdog_timeout must be positive")
+
     if interrupt_signal is None:
         interrupt_signal = DEFAULT_SIGNAL
 
@@ -354,6 +447,15 @@ def set_interrupt_handler(interrupt_signal: int | None = None):
         exc_str = "".join(format_exception(*sys.exc_info()))
         warn("setting interrupt handler on signal "
              f"{interrupt_signal} failed: {exc_str}", stacklevel=2)
+        return
+
+    if watchdog_timeout is not None:
+        if _watchdog is not None:
+            _watchdog.stop()
+
+        _watchdog = _Watchdog(
+                threading.main_thread().ident, interrupt_signal, watchdog_timeout)
+        _watchdog.start()
 
 
 def post_mortem(
@@ -37,6 +37,7 @@ from dataclasses import dataclass
 from functools import partial
 from itertools import count
 from os.path import splitext
+from time import perf_counter_ns
 from types import FrameType, ModuleType, TracebackType
 from typing import TYPE_CHECKING, Any, ClassVar, Mapping, TextIO, TypeVar, cast, final
 
@@ -51,6 +52,8 @@ if TYPE_CHECKING:
     from collections.abc import Callable, Sequence
 
     from pudb.source_view import SourceLine
+    from pudb.tracing import CallTreeRecorder, MemoryStopInfo, StepTiming
+    from pudb.var_view import FrameKey
 
 
 P = ParamSpec("P")
@@ -78,6 +81,10 @@ Keys:
     t - run to cursor
     J - jump to line
     e - show traceback [post-mortem or in exception state]
+    T - show calls made since the last stop [if recording is enabled]
+    M - show memory allocations and garbage collections since the last stop
+        [if tracking is enabled]
+    O - show counts and sizes of live objects by type
     b - set/clear breakpoint
     Ctrl-e - open file at current line to edit with $EDITOR
 
@@ -130,7 +137,7 @@ Sidebar-related (active in sidebar):
     [/] - grow/shrink relative height of active sidebar box
 
 Keys in variables list:
-    \/enter/space - expand/collapse
+    \/enter/space - expand/collapse, or evaluate a property
     h - collapse
     l - expand
     d/t/r/s/i/c - show default/type/repr/str/id/custom for this variable
@@ -138,9 +145,17 @@ Keys in variables list:
     @ - toggle repetition at top
     * - cycle attribute visibility: public/_private/__dunder__
     m - toggle method visibility
+        (on Globals: also modules, classes and functions)
     w - toggle line wrapping
+    R - retry a slow stringifier or watch expression without time budget
+    # - go to an index in a container
     n/insert - add new watch expression
-    delete - remove watch expression
+    delete - remove watch expression or inspected object
+    </> - show the objects referring to/referred to by this value
+    x - export this value to a JSON or JSON Lines file
+    p - page through a string, or bytes, bytearray, memoryview or mmap
+    / - search variables by name and value, including collapsed ones
+    ,/. - search previous/next
     e - edit options
 
 Keys in stack list:
@@ -500,9 +515,28 @@ class Debugger(bdb.Bdb):
         # set_trace() call at that location.
         self.set_traces = {}
 
+        from pudb.tracing import LineHitCounter
+        # Hit counts are collected into line_hit_counter while the debuggee
+        # runs and moved to last_line_hit_counter when it stops.
+        self.line_hit_counter = LineHitCounter()
+        self.last_line_hit_counter = LineHitCounter()
+
+        # Likewise, call_tree_recorder is only active while the debuggee runs.
+        self.call_tree_recorder: CallTreeRecorder | None = None
+        self.last_call_tree: CallTreeRecorder | None = None
+
+        from pudb.tracing import StepTimer
+        self.step_timer = StepTimer()
+        self.last_step_timing: StepTiming | None = None
+
+        from pudb.tracing import MemoryTracker
+        self.memory_tracker = MemoryTracker()
+        self.last_memory_info: MemoryStopInfo | None = None
+
     def restart(self):
         from linecache import checkcache
         checkcache()
+        self.stop_recording()
         self.ui.set_source_code_provider(NullSourceCodeProvider())
         self.setup_state()
 
@@ -623,13 +657,108 @@ class Debugger(bdb.Bdb):
         if self.post_mortem:
             index = len(self.stack)-1
 
+        self.last_step_timing = self.step_timer.stop()
+        self.last_memory_info = self.memory_tracker.stop()
+
+        from pudb.tracing import LineHitCounter
+        self.last_line_hit_counter = self.line_hit_counter
+        self.line_hit_counter = LineHitCounter()
+
+        if self.call_tree_recorder is not None:
+            self.last_call_tree = self.call_tree_recorder
+            self.stop_call_tree_recording()
+
         self.set_frame_index(index)
+        self.ui.update_hit_counts()
 
         self.ui.call_with_ui(self.ui.interaction, exc_tuple,
                 show_exc_dialog=show_exc_dialog)
 
-    def get_stack_situation_id(self):
-        return str(id(self.stack[self.curindex][0].f_code))
+        if CONFIG["record_call_tree"] and not self.quitting:
+            self.start_call_tree_recording()
+
+        if CONFIG["track_memory"] and not self.quitting:
+            self.memory_tracker.enable()
+            self.memory_tracker.resume()
+        else:
+            self.memory_tracker.disable()
+
+        self.step_timer.resume()
+
+    def get_stack_situation_id(self) -> FrameKey:
+        code = self.stack[self.curindex][0].f_code
+        return (
+                self.canonic(code.co_filename),
+                # co_qualname is new in Python 3.11
+                getattr(code, "co_qualname", code.co_name),
+                code.co_firstlineno)
+
+    # {{{ hit counting
+
+    @override
+    def dispatch_line(self, frame: FrameType):
+        if CONFIG["show_hit_counts"]:
+            self.line_hit_counter.count(frame)
+        return super().dispatch_line(frame)
+
+    @override
+    def break_anywhere(self, frame: FrameType):
+        if super().break_anywhere(frame):
+            return True
+
+        # Also trace the file that is on screen, so that its hit counts
+        # are available at the next stop.
+        if CONFIG["show_hit_counts"] and self.ui.source_code_provider is not None:
+            return (self.canonic(frame.f_code.co_filename)
+                    == self.ui.source_code_provider.get_source_identifier())
+
+        return False
+
+    @override
+    def set_continue(self):
+        if CONFIG["show_hit_counts"]:
+            # Keep tracing even without breakpoints: bdb would otherwise
+            # remove the trace function and no hits would be counted.
+            self._set_stopinfo(self.botframe, None, -1)
+        else:
+            super().set_continue()
+
+    # }}}
+
+    # {{{ recording between stops
+
+    def start_call_tree_recording(self):
+        from pudb.tracing import CallTreeRecorder
+
+        module_roots = [
+                root.strip()
+                for root in CONFIG["call_tree_module_roots"].split(",")]
+        self.call_tree_recorder = CallTreeRecorder(
+                module_roots, CONFIG["call_tree_max_edges"])
+        self.call_tree_recorder.start()
+
+    def stop_call_tree_recording(self):
+        if self.call_tree_recorder is not None:
+            self.call_tree_recorder.stop()
+            self.call_tree_recorder = None
+
+    def stop_recording(self):
+        self.stop_call_tree_recording()
+        self.memory_tracker.disable()
+
+    @override
+    def set_quit(self):
+        self.stop_recording()
+        super().set_quit()
+
+    @override
+    def run(self, cmd, globals=None, locals=None):
+        try:
+            super().run(cmd, globals, locals)
+        finally:
+            self.stop_recording()
+
+    # }}}
 
     @override
     def user_call(self, frame: FrameType, argument_list: None):
@@ -654,7 +783,17 @@ class Debugger(bdb.Bdb):
 
         try:
             self.ui.update_breakpoints()
+
+            count_hits = CONFIG["show_hit_counts"]
+            if count_hits:
+                # This line has been reached, but it only runs once we
+                # resume. Count it towards the next stop instead.
+                self.line_hit_counter.uncount(frame)
+
             self.interaction(frame)
+
+            if count_hits:
+                self.line_hit_counter.count(frame)
         except Exception:
             self.ui.show_internal_exc_dlg(sys.exc_info())
 
@@ -792,6 +931,7 @@ class Debugger(bdb.Bdb):
 
 # UI stuff --------------------------------------------------------------------
 
+from pudb.tracing import deep_size_cache
 from pudb.ui_tools import (
     BreakpointFrame,
     EventListener,
@@ -800,15 +940,21 @@ from pudb.ui_tools import (
     SignalWrap,
     StackFrame,
     UrwidSize,
+    VarSearchController,
     focus_widget_in_container,
     labelled_value,
     make_hotkey_markup,
 )
 from pudb.var_view import (
     FrameVarInfoKeeper,
+    ValueWalker,
     VarAccessLevel,
     VariableWidget,
+    VarViewWalker,
     WatchExpression,
+    stringifier_budget,
+    stringifier_cache,
+    type_attributes_cache,
 )
 
 
@@ -1034,10 +1180,12 @@ class StoppedScreen:
 class DebuggerUI(FrameVarInfoKeeper):
     debugger: Debugger
     search_controller: SearchController
+    var_search_controller: VarSearchController
     last_module_filter: str
     source_code_provider: SourceCodeProvider | None
     source: urwid.SimpleListWalker[SourceLine]
     show_count: int
+    stop_serial: int
     current_line: SourceLine | None
     quit_event_loop: object
 
@@ -1052,8 +1200,9 @@ class DebuggerUI(FrameVarInfoKeeper):
 
         from urwid import AttrMap
 
-        from pudb.ui_tools import SearchController
+        from pudb.ui_tools import SearchController, VarSearchController
         self.search_controller = SearchController(self)
+        self.var_search_controller = VarSearchController(self)
 
         self.last_module_filter = ""
 
@@ -1173,7 +1322,7 @@ class DebuggerUI(FrameVarInfoKeeper):
 
         # {{{ right column
 
-        self.locals = urwid.SimpleListWalker([])
+        self.locals = VarViewWalker()
         self.var_list = SignalWrap(
                 urwid.ListBox(self.locals))
 
@@ -1185,11 +1334,15 @@ class DebuggerUI(FrameVarInfoKeeper):
         self.bp_list = SignalWrap(
                 urwid.ListBox(self.bp_walker))
 
-        self.rhs_col = urwid.Pile([
-            (urwid.WEIGHT, float(CONFIG["variables_weight"]), AttrMap(urwid.Pile([
+        # The variables search box is inserted after the heading.
+        self.var_pile = urwid.Pile([
                 (urwid.FLOW, urwid.Text(make_hotkey_markup("_Variables:"))),
                 AttrMap(self.var_list, "variables"),
-                ]), None, "focused sidebar"),),
+                ])
+
+        self.rhs_col = urwid.Pile([
+            (urwid.WEIGHT, float(CONFIG["variables_weight"]), AttrMap(
+                self.var_pile, None, "focused sidebar"),),
             (urwid.WEIGHT, float(CONFIG["stack_weight"]), AttrMap(urwid.Pile([
                 (urwid.FLOW, urwid.Text(make_hotkey_markup("_Stack:"))),
                 AttrMap(self.stack_list, "stack"),
@@ -1275,7 +1428,12 @@ class DebuggerUI(FrameVarInfoKeeper):
             iinfo = get_inspect_info(var.id_path)
             focus_index = None
 
-            if key in {"enter", "\\", " "}:
+            if key in {"d", "t", "r", "s", "i", "c"}:
+                iinfo.slow_display_type = None
+
+            if key in {"enter", "\\", " ", "l"} and var.unevaluated_property:
+                iinfo.evaluate_property = True
+            elif key in {"enter", "\\", " "}:
                 iinfo.show_detail = not iinfo.show_detail
             elif key == "h":
                 focus_index = collapse_current(var, pos, iinfo)
@@ -1304,6 +1462,20 @@ class DebuggerUI(FrameVarInfoKeeper):
                 iinfo.wrap = not iinfo.wrap
             elif key == "m":
                 iinfo.show_methods = not iinfo.show_methods
+            elif key == "R":
+                if iinfo.slow_display_type is not None:
+                    iinfo.display_type = iinfo.slow_display_type
+                    iinfo.slow_display_type = None
+                iinfo.ignore_time_budget = True
+
+                if var.watch_expr is not None:
+                    watch_state = self.get_frame_var_info(read_only=False) \
+                            .watch_states.get(var.watch_expr.expression)
+                    if watch_state is not None:
+                        watch_state.force_evaluation = True
+            elif key == "delete" and var.parent is None \
+                    and var.id_path in self.inspected_objects:
+                del self.inspected_objects[var.id_path]
             elif key == "delete":
                 fvi = self.get_frame_var_info(read_only=False)
                 for i, watch_expr in enumerate(fvi.watches):
@@ -1331,8 +1503,11 @@ class DebuggerUI(FrameVarInfoKeeper):
                 watch_edit = urwid.Edit([
                     ("label", "Watch expression: ")
                     ], var.watch_expr.expression)
+                pinned_checkbox = urwid.CheckBox(
+                        "Pinned (evaluate at every stop)", var.watch_expr.pinned)
                 id_segment = [
                         urwid.AttrMap(watch_edit, "input", "focused input"),
+                        pinned_checkbox,
                         urwid.Text(""),
                         ]
 
@@ -1422,7 +1597,14 @@ class DebuggerUI(FrameVarInfoKeeper):
                     iinfo.access_level = "all"
 
                 if var.watch_expr is not None:
-                    var.watch_expr = WatchExpression(watch_edit.get_edit_text())   # pyright: ignore[reportPossiblyUnboundVariable]
+                    new_watch_expr = WatchExpression(
+                            watch_edit.get_edit_text(),   # pyright: ignore[reportPossiblyUnboundVariable]
+                            bool_only(pinned_checkbox.get_state()))  # pyright: ignore[reportPossiblyUnboundVariable]
+                    fvi.watches = [
+                            new_watch_expr if watch_expr is var.watch_expr
+                            else watch_expr
+                            for watch_expr in fvi.watches]
+                    var.watch_expr = new_watch_expr
 
             elif result == "del":
                 for i, watch_expr in enumerate(fvi.watches):
@@ -1452,6 +1634,176 @@ class DebuggerUI(FrameVarInfoKeeper):
                 fvi.watches.append(we)
                 self.update_var_view()
 
+        def go_to_index(w, size, key):
+            var = cast("VariableWidget | None", self.var_list._w.focus)  # pyright: ignore[reportPrivateUsage]
+            if var is None:
+                return
+
+            container = var
+            if (var.var_label == ValueWalker.CONTINUATION_LABEL
+                    and var.parent is not None):
+                container = var.parent
+
+            iinfo = get_inspect_info(container.id_path)
+            index_edit = urwid.IntEdit([
+                ("label", "Go to index: ")
+                ], default=iinfo.page_start)
+
+            if self.dialog(
+                    urwid.ListBox(urwid.SimpleListWalker([
+                        urwid.AttrMap(index_edit, "input", "focused input")
+                        ])),
+                    [
+                        ("OK", True),
+                        ("Cancel", False),
+                        ], title="Go to Index"):
+                iinfo.page_start = index_edit.value() or 0
+                iinfo.show_detail = True
+
+                # Focus the entry at the index, after the item for the
+                # skipped ones.
+                focus_index = self.locals.index(container) + 1
+                if iinfo.page_start:
+                    focus_index += 1
+                self.update_var_view(focus_index=focus_index)
+
+        def search_vars(w, size, key):
+            self.var_search_controller.open_search_ui()
+
+        def search_vars_next(w, size, key):
+            self.var_search_controller.perform_search(dir=1)
+
+        def search_vars_previous(w, size, key):
+            self.var_search_controller.perform_search(dir=-1)
+
+        def show_references(w, size, key):
+            var = cast("VariableWidget | None", self.var_list._w.focus)  # pyright: ignore[reportPrivateUsage]
+            if var is None or var.value is VariableWidget.NO_VALUE:
+                return
+
+            from pudb.tracing import walk_references
+            from pudb.ui_tools import ReferenceNode
+
+            if key == "<":
+                graph = walk_references(var.value, "referrers")
+                title = "Referrers"
+            else:
+                graph = walk_references(var.value, "referents")
+                title = "Referents"
+
+            self.dialog(
+                    urwid.TreeListBox(urwid.TreeWalker(
+                        ReferenceNode(graph, graph.root))),
+                    [("Close", True)],
+                    title=f"{title} of {var.var_label}")
+
+        def export_var(w, size, key):
+            var = cast("VariableWidget | None", self.var_list._w.focus)  # pyright: ignore[reportPrivateUsage]
+            if var is None or var.value is VariableWidget.NO_VALUE:
+                return
+
+            import re
+            from os.path import expanduser
+
+            from pudb.tracing import format_size
+            from pudb.var_view import JSONExporter, export_value
+
+            file_stem = re.sub(r"\W+", "_", var.id_path).strip("_") or "value"
+            filename_edit = urwid.Edit([
+                ("label", "File name: ")
+                ], f"{file_stem}.json")
+            rb_grp_format = []
+            rb_json = urwid.RadioButton(rb_grp_format, "JSON (indented)")
+            rb_json_lines = urwid.RadioButton(
+                    rb_grp_format, "JSON Lines (one line per entry)")
+            max_depth_edit = urwid.IntEdit([
+                ("label", "Maximum depth: ")
+                ], default=10)
+            max_values_edit = urwid.IntEdit([
+                ("label", "Maximum number of values: ")
+                ], default=100_000)
+            max_mib_edit = urwid.IntEdit([
+                ("label", "Maximum size in MiB: ")
+                ], default=16)
+
+            def make_input(edit):
+                return urwid.AttrMap(edit, "input", "focused input")
+
+            if not self.dialog(
+                    urwid.ListBox(urwid.SimpleListWalker([
+                        make_input(filename_edit),
+                        urwid.Text(""),
+                        rb_json,
+                        rb_json_lines,
+                        urwid.Text(""),
+                        make_input(max_depth_edit),
+                        make_input(max_values_edit),
+                        make_input(max_mib_edit),
+                        urwid.Text(""),
+                        urwid.Text("Values JSON cannot represent are "
+                            "written as their repr()."),
+                        ])),
+                    [
+                        ("OK", True),
+                        ("Cancel", False),
+                        ], title=f"Export {var.var_label} as JSON"):
+                return
+
+            filename = expanduser(filename_edit.get_edit_text())
+            lines = bool_only(rb_json_lines.get_state())
+            try:
+                exporter = export_value(var.value, filename,
+                        lines=lines,
+                        indent=None if lines else 1,
+                        max_depth=max_depth_edit.value() or 0,
+                        max_values=max_values_edit.value() or 0,
+                        max_bytes=(max_mib_edit.value() or 0) * 1024**2)
+            except OSError as e:
+                self.message(f"Could not write '{filename}': {e}",
+                        title="Export Failed")
+                return
+
+            msg = (f"Wrote {format_size(exporter.nbytes)} "
+                    f"({exporter.value_count} values) to '{filename}'.")
+            if exporter.truncated:
+                msg += ("\n\nValues beyond these limits were left out: "
+                        + ", ".join(sorted(exporter.truncated)) + ". "
+                        f"They are marked '{JSONExporter.TRUNCATION_MARKER}' "
+                        "or written as their repr().")
+            self.message(msg, title="Export Complete")
+
+        def show_pager(w, size, key):
+            var = cast("VariableWidget | None", self.var_list._w.focus)  # pyright: ignore[reportPrivateUsage]
+            if var is None or var.value is VariableWidget.NO_VALUE:
+                return
+
+            from pudb.pager import HexView, Pager, TextView
+
+            if isinstance(var.value, str):
+                self.dialog(Pager(TextView(var.value)), [("Close", True)],
+                        title=f"Text of {var.var_label}")
+                return
+
+            try:
+                buffer = memoryview(var.value)  # pyright: ignore[reportArgumentType]
+            except TypeError:
+                self.message(
+                        f"There is no pager for values of type "
+                        f"'{type(var.value).__name__}'.", title="No Pager")
+                return
+
+            with buffer:
+                try:
+                    data = buffer.cast("B")
+                except TypeError:
+                    # Not contiguous
+                    data = memoryview(buffer.tobytes())
+
+                # Released before closing, or an mmap could not be closed.
+                with data:
+                    self.dialog(Pager(HexView(data)), [("Close", True)],
+                            title=f"Bytes of {var.var_label}")
+
         self.var_list.listen("\\", change_var_state)
         self.var_list.listen(" ", change_var_state)
         self.var_list.listen("h", change_var_state)
@@ -1467,11 +1819,20 @@ class DebuggerUI(FrameVarInfoKeeper):
         self.var_list.listen("*", change_var_state)
         self.var_list.listen("w", change_var_state)
         self.var_list.listen("m", change_var_state)
+        self.var_list.listen("R", change_var_state)
+        self.var_list.listen("#", go_to_index)
         self.var_list.listen("enter", change_var_state)
         self.var_list.listen("e", edit_inspector_detail)
         self.var_list.listen("n", insert_watch)
         self.var_list.listen("insert", insert_watch)
         self.var_list.listen("delete", change_var_state)
+        self.var_list.listen("<", show_references)
+        self.var_list.listen("/", search_vars)
+        self.var_list.listen(".", search_vars_next)
+        self.var_list.listen(",", search_vars_previous)
+        self.var_list.listen(">", show_references)
+        self.var_list.listen("x", export_var)
+        self.var_list.listen("p", show_pager)
 
         self.var_list.listen("[", partial(change_rhs_box, "variables", 0, -1))
         self.var_list.listen("]", partial(change_rhs_box, "variables", 0, 1))
@@ -2058,6 +2419,17 @@ Error with jump. Note that jumping only works on the topmost stack frame.
                 sys.stdout = prev_sys_stdout
                 sys.stderr = prev_sys_stderr
 
+            # The command may have changed values that the variables view
+            # has not produced rows for yet.
+            stringifier_cache.invalidate_unversioned()
+            type_attributes_cache.forget_checks()
+            deep_size_cache.clear()
+            try:
+                focus_index = self.var_list._w.focus_position
+            except IndexError:
+                focus_index = None
+            self.update_var_view(focus_index=focus_index)
+
         def cmdline_history_browse(direction):
             # Browsing the command line history can be illustrated by moving up/down
             # in the following table (no wrap-around).
@@ -2257,6 +2629,164 @@ Error with jump. Note that jumping only works on the topmost stack frame.
             else:
                 self.message("No exception available.")
 
+        def show_call_tree(w, size, key):
+            recorder = self.debugger.last_call_tree
+            if recorder is None:
+                self.message("No call tree was recorded before this stop.\n\n"
+                        "Enable call tree recording in the preferences "
+                        "(Ctrl-p) to record the calls made between stops.")
+                return
+
+            from pudb.ui_tools import CallTreeNode
+            self.dialog(
+                    urwid.TreeListBox(urwid.TreeWalker(CallTreeNode(recorder))),
+                    [("Close", True)],
+                    title="Call Tree")
+
+        def show_memory_info(w, size, key):
+            info = self.debugger.last_memory_info
+            if info is None:
+                self.message("No memory information was collected before "
+                        "this stop.\n\n"
+                        "Enable memory tracking in the preferences (Ctrl-p) "
+                        "to collect it between stops.")
+                return
+
+            from pudb.tracing import format_duration_ns, format_size
+
+            lines = [
+                    "Garbage collection:",
+                    (f"    {info.gc_collections} collections, "
+                        f"{format_duration_ns(info.gc_pause_ns)} total pause time"),
+                    ]
+            for gen, gen_delta in enumerate(info.gc_stats_delta):
+                lines.append(
+                        f"    generation {gen}: "
+                        + ", ".join(f"{value:+d} {key}"
+                            for key, value in gen_delta.items()))
+            lines.append("    allocation counts (per generation): "
+                    + ", ".join(str(n) for n in info.gc_count)
+                    + " (at resume: "
+                    + ", ".join(str(n) for n in info.resume_gc_count)
+                    + ")")
+
+            lines.extend([
+                "",
+                "Top allocation sites by size delta (user code only):",
+                ])
+            diffs = info.get_allocation_diffs()
+            if not diffs:
+                lines.append("    (none)")
+            for diff in diffs[:50]:
+                frame = diff.traceback[0]
+                lines.append(
+                        f"    {format_size(diff.size_diff, signed=True):>12} "
+                        f"({diff.count_diff:+d} blocks, "
+                        f"{format_size(diff.size)} total)  "
+                        f"{self._format_fname(frame.filename)}:{frame.lineno}")
+
+            self.message("\n".join(lines), title="Memory Since Last Stop")
+
+        def show_heap_histogram(w, size, key):
+            from pudb.tracing import find_instances, format_size, take_heap_histogram
+
+            def type_name(cls):
+                module = getattr(cls, "__module__", None)
+                if module in (None, "builtins"):
+                    return cls.__qualname__
+                return f"{module}.{cls.__qualname__}"
+
+            def format_row(row):
+                if row.count_delta is None:
+                    count_delta = nbytes_delta = ""
+                else:
+                    count_delta = f"{row.count_delta:+d}"
+                    nbytes_delta = format_size(row.nbytes_delta, signed=True)
+                return (f"{row.count:>9} {count_delta:>8} "
+                        f"{format_size(row.nbytes):>10} {nbytes_delta:>11}  "
+                        f"{type_name(row.cls)}")
+
+            def inspect_instances(cls):
+                instances = find_instances(cls)
+                if not instances:
+                    self.message(f"No instances of '{type_name(cls)}' "
+                            "are left.")
+                    return False
+
+                from pudb.var_view import default_stringifier
+                inst_lb = urwid.ListBox(urwid.SimpleListWalker([
+                    urwid.AttrMap(SelectableText(
+                        f"{id(obj):#x}  {default_stringifier(obj)[:200]}"),
+                        None, "focused selectable")
+                    for obj in instances]))
+                if not self.dialog(urwid.AttrMap(inst_lb, "selectable"),
+                        [("Inspect", True), ("Back", False)],
+                        title=f"Instances of {type_name(cls)}"):
+                    return False
+
+                obj = instances[inst_lb.focus_position]
+                del instances
+
+                label = f"{cls.__qualname__}@{id(obj):#x}"
+                self.inspected_objects[label] = obj
+                self.update_var_view()
+
+                focus_widget_in_container(self.columns, self.rhs_col_sigwrap)
+                self.rhs_col.focus_position = 0
+                for pos in self.locals.positions():
+                    var = self.locals[pos]
+                    if (isinstance(var, VariableWidget) and var.parent is None
+                            and var.id_path == label):
+                        self.locals.set_focus(pos)
+                        break
+                return True
+
+            previous = self.last_heap_histogram
+            histogram = take_heap_histogram()
+            self.last_heap_histogram = histogram
+
+            while True:
+                rows = histogram.get_rows(previous)
+                lb = urwid.ListBox(urwid.SimpleListWalker([
+                    urwid.AttrMap(SelectableText(format_row(row)),
+                        None, "focused selectable")
+                    for row in rows]))
+
+                header = (f"{histogram.object_count} objects tracked by the "
+                        "garbage collector (atomic objects such as numbers "
+                        "and strings are mostly untracked)")
+                if not histogram.complete:
+                    header += ", stopped early after running out of time"
+                if previous is None:
+                    header += ". Deltas are shown from the second snapshot on."
+                else:
+                    header += ". Deltas are against the previous snapshot."
+
+                result = self.dialog(
+                        urwid.Pile([
+                            (urwid.PACK, urwid.Text(header)),
+                            (urwid.PACK, urwid.AttrMap(urwid.Text(
+                                f"{'Count':>9} {'Delta':>8} {'Size':>10} "
+                                f"{'Delta':>11}  Type"), "group head")),
+                            urwid.AttrMap(lb, "selectable"),
+                            ]),
+                        [
+                            ("Show instances", True),
+                            ("Refresh", "refresh"),
+                            ("Close", False),
+                            ],
+                        title="Live Objects by Type")
+
+                if result == "refresh":
+                    previous = histogram
+                    histogram = take_heap_histogram()
+                    self.last_heap_histogram = histogram
+                elif result is True and rows:
+                    if inspect_instances(rows[lb.focus_position].cls):
+                        return
+                else:
+                    return
+
         def run_external_cmdline(w, size, key):
             with StoppedScreen(self.screen):
                 curframe = self.debugger.curframe
@@ -2307,6 +2837,9 @@ Error with jump. Note that jumping only works on the topmost stack frame.
 
                 runner(curframe.f_globals, curframe.f_locals)
 
+            stringifier_cache.invalidate_unversioned()
+            type_attributes_cache.forget_checks()
+            deep_size_cache.clear()
             self.update_var_view()
 
         def run_cmdline(w, size, key):
@@ -2361,6 +2894,9 @@ Error with jump. Note that jumping only works on the topmost stack frame.
                         lambda w, size, key: reload_breakpoints_and_redisplay())
         self.top.listen("!", run_cmdline)
         self.top.listen("e", show_traceback)
+        self.top.listen("T", show_call_tree)
+        self.top.listen("M", show_memory_info)
+        self.top.listen("O", show_heap_histogram)
 
         self.top.listen(CONFIG["hotkeys_code"], focus_code)
         self.top.listen(CONFIG["hotkeys_variables"], RHColumnFocuser(0))
@@ -2425,8 +2961,14 @@ Error with jump. Note that jumping only works on the topmost stack frame.
         self.setup_palette(self.screen)
 
         self.show_count = 0
+        self.stop_serial = 0
         self.source_code_provider = None
 
+        # Objects picked from the heap histogram, by label, shown in the
+        # variables view until the debuggee resumes.
+        self.inspected_objects: dict[str, object] = {}
+        self.last_heap_histogram = None
+
         self.current_line = None
 
         self.quit_event_loop = False
@@ -3022,9 +3564,27 @@ Error with jump. Note that jumping only works on the topmost stack frame.
             self.quit_event_loop = False
 
             while not self.quit_event_loop:
-                canvas = toplevel.render(self.size, focus=True)
+                # Variables view rows that take too long to produce are
+                # filled in between checks for input below.
+                self.locals.set_deadline(perf_counter_ns() + VarViewWalker.BATCH_NS)
+                try:
+                    canvas = toplevel.render(self.size, focus=True)
+                finally:
+                    self.locals.set_deadline(None)
                 self.screen.draw_screen(self.size, canvas)
-                keys = self.screen.get_input()
+
+                if (self.locals.has_pending_rows()
+                        or self.var_search_controller.has_pending_work()):
+                    self.screen.set_input_timeouts(max_wait=0)
+                    keys = self.screen.get_input()
+                    if not keys:
+                        if self.locals.has_pending_rows():
+                            self.locals.produce_pending_rows()
+                        else:
+                            self.var_search_controller.do_pending_work()
+                else:
+                    self.screen.set_input_timeouts(max_wait=None)
+                    keys = self.screen.get_input()
 
                 for k in keys:  # pylint: disable=not-an-iterable
                     if k == "window resize":
@@ -3065,9 +3625,30 @@ Error with jump. Note that jumping only works on the topmost stack frame.
                 ("header warning", "[PROCESSING EXCEPTION - hit 'e' to examine]")
                 ])
 
+        timing = self.debugger.last_step_timing
+        if timing is not None:
+            from pudb.tracing import format_duration_ns
+            caption.append((None, (
+                f"  [ran {format_duration_ns(timing.wall_ns)} wall, "
+                f"{format_duration_ns(timing.cpu_ns)} CPU]")))
+
         self.caption.set_text(caption)
         self.event_loop()
 
+        self.save_var_view_state()
+
+        # Do not keep the debuggee's objects alive while it runs.
+        self.inspected_objects.clear()
+        self.locals.detach()
+        self.locals.release_values()
+        self.release_var_view_values()
+        self.var_search_controller.reset()
+        stringifier_cache.invalidate_unversioned()
+        type_attributes_cache.forget_checks()
+        deep_size_cache.clear()
+        stringifier_budget.reset()
+        self.stop_serial += 1
+
     def set_source_code_provider(self,
                 source_code_provider: SourceCodeProvider,
                 force_update: bool = False):
@@ -3075,6 +3656,7 @@ Error with jump. Note that jumping only works on the topmost stack frame.
             self.source[:] = source_code_provider.get_lines(self)
             self.source_code_provider = source_code_provider
             self.current_line = None
+            self.update_hit_counts()
 
     def show_line(self, line, source_code_provider=None):
         """Updates the UI so that a certain line is currently in view."""
@@ -3103,16 +3685,40 @@ Error with jump. Note that jumping only works on the topmost stack frame.
             self.current_line = self.source[line]
             self.current_line.set_current(True)
 
+    def update_hit_counts(self):
+        if not CONFIG["show_hit_counts"] or self.source_code_provider is None:
+            return
+
+        filename = self.source_code_provider.get_source_identifier()
+        if filename is None:
+            hit_counts = {}
+        else:
+            hit_counts = self.debugger.last_line_hit_counter.get_file_hit_counts(
+                    self.debugger.canonic, filename)
+
+        # Lines without code are left without a count, rather than shown
+        # as never executed.
+        for i, sline in enumerate(self.source):
+            sline.set_hit_count(hit_counts.get(i+1))
+
     def update_var_view(self, locals=None, globals=None, focus_index=None):
         if locals is None:
             locals = self.debugger.curframe.f_locals
         if globals is None:
             globals = self.debugger.curframe.f_globals
 
-        from pudb.var_view import make_var_view
-        self.locals[:] = make_var_view(
-                self.get_frame_var_info(read_only=True),
-                locals, globals)
+        from pudb.var_view import iter_var_view
+        if CONFIG["highlight_changes"]:
+            fvi = self.get_tracking_frame_var_info()
+            stop_serial = self.stop_serial
+        else:
+            fvi = self.get_frame_var_info(read_only=True)
+            stop_serial = None
+        self.locals.set_rows(iter_var_view(
+                fvi, locals, globals, cache=self.get_var_view_cache(),
+                stop_serial=stop_serial, inspected=self.inspected_objects,
+                closure_names=self.debugger.curframe.f_code.co_freevars,
+                defer_watches=True))
         if focus_index is not None:
             # Have to set the focus _after_ updating the locals list, as there
             # appears to be a brief moment while resetting the list when the
@@ -3124,6 +3730,21 @@ Error with jump. Note that jumping only works on the topmost stack frame.
                 # sigh oh well we tried
                 pass
 
+    def show_var_search_entry(self, entry):
+        """Show the row for *entry*, a :class:`pudb.var_view.VarSearchEntry`
+        for the current frame, expanding the rows containing it as needed.
+        """
+        from pudb.var_view import reveal_search_entry
+        reveal_search_entry(self.get_frame_var_info(read_only=False), entry)
+        self.update_var_view()
+
+        for pos in self.locals.positions():
+            var = self.locals[pos]
+            if (isinstance(var, VariableWidget) and var.watch_expr is None
+                    and var.id_path == entry.id_path):
+                self.locals.set_focus(pos)
+                break
+
     def _get_bp_list(self):
         return [bp
                 for fn, bp_lst in self.debugger.get_all_breaks().items()
@@ -0,0 +1,761 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import ClassVar, Iterator, Literal
+
+import urwid
+from typing_extensions import override
+
+from pudb.ui_tools import UrwidSize, make_canvas, text_width
+
+
+# {{{ pager frame
+
+class PagerView(urwid.Widget, ABC):
+    """A scrollable box widget showing part of a large value, for
+    :class:`Pager`. Only the visible part of the value is rendered.
+    """
+
+    _sizing: ClassVar[frozenset[urwid.Sizing]] = frozenset([urwid.Sizing.BOX])
+    _selectable: ClassVar[bool] = True
+
+    # Label of the prompt for :meth:`go_to`
+    GO_TO_PROMPT: ClassVar[str]
+
+    @abstractmethod
+    def go_to(self, location: str) -> str | None:
+        """Move to *location*, as entered by the user.
+
+        :returns: an error message, or *None* on success
+        """
+
+    @abstractmethod
+    def search(self, query: str, dir: Literal[-1, 1]) -> str | None:
+        """Move to the next match of *query* after (*dir* = 1) or before
+        (*dir* = -1) the current one.
+
+        :returns: an error message, or *None* on success
+        """
+
+    @abstractmethod
+    def get_status(self) -> str:
+        """
+        :returns: a description of the current position
+        """
+
+
+class Pager(urwid.WidgetWrap[urwid.Frame]):
+    """A :class:`PagerView` with a status line, which doubles as the prompt
+    for going to a location ("#") and searching ("/", then "," and "." for
+    the previous and next match).
+    """
+
+    def __init__(self, view: PagerView):
+        self.view = view
+        self.status = urwid.Text("")
+        self.prompt: urwid.Edit | None = None
+        self.prompt_kind: Literal["go to", "search"] | None = None
+        self.last_query: str | None = None
+
+        super().__init__(urwid.Frame(
+            view,
+            footer=urwid.AttrMap(self.status, "pager status")))
+        self.update_status()
+
+    def update_status(self, message: str | None = None) -> None:
+        status = self.view.get_status()
+        if message is not None:
+            status = f"{status} - {message}"
+        self.status.set_text(status)
+
+    def _open_prompt(self, kind: Literal["go to", "search"], caption: str) -> None:
+        self.prompt = urwid.Edit([("label", caption)])
+        self.prompt_kind = kind
+        self._w.footer = urwid.AttrMap(self.prompt, "search box")
+        self._w.focus_position = "footer"
+
+    def _close_prompt(self) -> None:
+        self.prompt = None
+        self.prompt_kind = None
+        self._w.footer = urwid.AttrMap(self.status, "pager status")
+        self._w.focus_position = "body"
+
+    def _search(self, dir: Literal[-1, 1]) -> None:
+        if self.last_query is None:
+            self.update_status("no search yet, press '/' to search")
+        else:
+            self.update_status(self.view.search(self.last_query, dir))
+
+    @override
+    def keypress(self, size: UrwidSize, key: str) -> str | None:
+        if self.prompt is not None:
+            if key == "esc":
+                self._close_prompt()
+                self.update_status()
+            elif key == "enter":
+                text = self.prompt.get_edit_text()
+                kind = self.prompt_kind
+                self._close_prompt()
+                if kind == "go to":
+                    self.update_status(self.view.go_to(text))
+                elif text:
+                    self.last_query = text
+                    self._search(1)
+            else:
+                self.prompt.keypress((size[0],), key)
+            return None
+
+        if key == "#":
+            self._open_prompt("go to", self.view.GO_TO_PROMPT)
+        elif key == "/":
+            self._open_prompt("search", "Search: ")
+        elif key == ".":
+            self._search(1)
+        elif key == ",":
+            self._search(-1)
+        else:
+            result = self._w.keypress(size, key)
+            self.update_status()
+            return result
+
+        return None
+
+# }}}
+
+
+# {{{ hex view
+
+def find_bytes(data: memoryview, pattern: bytes, start: int,
+            dir: Literal[-1, 1] = 1, chunk_size: int = 1024**2) -> int | None:
+    """Find *pattern* in *data*, beginning at offset *start* and going
+    forward or, if *dir* is -1, backward from just before *start*. Only
+    *chunk_size* bytes of *data* are copied at a time.
+
+    :returns: the offset of the match, or *None*
+    """
+    if not pattern:
+        return None
+
+    overlap = len(pattern) - 1
+    if dir == 1:
+        pos = max(start, 0)
+        while pos < len(data):
+            chunk = bytes(data[pos:pos + chunk_size + overlap])
+            index = chunk.find(pattern)
+            if index >= 0:
+                return pos + index
+            pos += chunk_size
+    else:
+        end = min(start + overlap, len(data))
+        while end > overlap:
+            chunk_start = max(end - chunk_size - overlap, 0)
+            index = bytes(data[chunk_start:end]).rfind(pattern)
+            if index >= 0:
+                return chunk_start + index
+            end -= chunk_size
+
+    return None
+
+
+def parse_byte_pattern(query: str) -> bytes:
+    """
+    :returns: the bytes given in hexadecimal after a ``0x`` prefix, as in
+        ``0xdead beef``, or else the UTF-8 encoding of *query*.
+    :raises ValueError: for invalid hexadecimal digits
+    """
+    if query.startswith("0x"):
+        return bytes.fromhex(query[2:])
+    return query.encode("utf-8")
+
+
+class HexView(PagerView):
+    """Shows the bytes of *data* in rows of hexadecimal values and their
+    ASCII characters, like ``hexdump -C``.
+    """
+
+    BYTES_PER_ROW: ClassVar[int] = 16
+    GO_TO_PROMPT: ClassVar[str] = "Go to offset (0x for hex): "
+
+    def __init__(self, data: memoryview):
+        super().__init__()
+        assert data.format == "B" and data.ndim == 1
+
+        self.data = data
+        self.top_row = 0
+        self.cursor_row = 0
+        # Offsets of the start and end of the last search match
+        self.match: tuple[int, int] | None = None
+        self.offset_digits = max(8, len(f"{len(data):x}"))
+
+    @property
+    def row_count(self) -> int:
+        return max(-(-len(self.data) // self.BYTES_PER_ROW), 1)
+
+    def _move_cursor(self, row: int, page_rows: int | None = None) -> None:
+        self.cursor_row = max(min(row, self.row_count - 1), 0)
+        if page_rows is not None:
+            if self.cursor_row < self.top_row:
+                self.top_row = self.cursor_row
+            elif self.cursor_row >= self.top_row + page_rows:
+                self.top_row = self.cursor_row - page_rows + 1
+        self._invalidate()
+
+    def _center_cursor(self, row: int) -> None:
+        self.cursor_row = max(min(row, self.row_count - 1), 0)
+        # Centered at the next render, see _fix_top_row
+        self.top_row = -1
+        self._invalidate()
+
+    def _fix_top_row(self, maxrow: int) -> None:
+        if self.top_row < 0:
+            self.top_row = self.cursor_row - maxrow // 2
+        if not self.top_row <= self.cursor_row < self.top_row + maxrow:
+            self.top_row = self.cursor_row - maxrow + 1
+        self.top_row = max(min(self.top_row, self.row_count - maxrow), 0)
+
+    def _render_row(self, row: int, focus: bool
+            ) -> tuple[str, list[tuple[str | None, int]]]:
+        bpr = self.BYTES_PER_ROW
+        row_start = row * bpr
+        chunk = bytes(self.data[row_start:row_start + bpr])
+
+        body_attr = "focused pager" if focus and row == self.cursor_row else "pager"
+        offset_text = f"{row_start:0{self.offset_digits}x}  "
+        hex_text = " ".join(f"{byte:02x}" for byte in chunk).ljust(3 * bpr - 1)
+        ascii_text = "".join(
+                chr(byte) if 32 <= byte < 127 else "." for byte in chunk)
+
+        def byte_attrs(width: int, sep_width: int) -> list[tuple[str | None, int]]:
+            # Attributes for the bytes of chunk, each *width* columns wide
+            # plus *sep_width* columns between them
+            attrs: list[tuple[str | None, int]] = []
+            for i in range(len(chunk)):
+                is_match = (self.match is not None
+                        and self.match[0] <= row_start + i < self.match[1])
+                attr = "pager match" if is_match else body_attr
+                col_count = width + (sep_width if i + 1 < len(chunk) else 0)
+                if attrs and attrs[-1][0] == attr:
+                    attrs[-1] = (attr, attrs[-1][1] + col_count)
+                else:
+                    attrs.append((attr, col_count))
+            return attrs
+
+        hex_attrs = byte_attrs(2, 1)
+        hex_attrs.append(
+                (body_attr, len(hex_text) - max(3 * len(chunk) - 1, 0) + 2))
+        return (
+                f"{offset_text}{hex_text}  {ascii_text}",
+                [("pager offset", len(offset_text)),
+                    *hex_attrs,
+                    *byte_attrs(1, 0)])
+
+    @override
+    def render(self, size: tuple[int, int], focus: bool = False) -> urwid.Canvas:
+        maxcol, maxrow = size
+        self._fix_top_row(maxrow)
+
+        txt = []
+        attrs = []
+        for row in range(self.top_row, min(self.top_row + maxrow, self.row_count)):
+            line, line_attrs = self._render_row(row, focus)
+            txt.append(line)
+            attrs.append(line_attrs)
+
+        while len(txt) < maxrow:
+            txt.append("")
+            attrs.append([])
+
+        return make_canvas(txt, attrs, maxcol, fill_attr="pager")
+
+    @override
+    def keypress(self, size: tuple[int, int], key: str) -> str | None:
+        _maxcol, maxrow = size
+        self._fix_top_row(maxrow)
+
+        if key in ("down", "j"):
+            self._move_cursor(self.cursor_row + 1, maxrow)
+        elif key in ("up", "k"):
+            self._move_cursor(self.cursor_row - 1, maxrow)
+        elif key in ("page down", "ctrl f", "ctrl d"):
+            self.top_row = max(
+                    min(self.top_row + maxrow, self.row_count - maxrow), 0)
+            self._move_cursor(self.cursor_row + maxrow, maxrow)
+        elif key in ("page up", "ctrl b", "ctrl u"):
+            self.top_row = max(self.top_row - maxrow, 0)
+            self._move_cursor(self.cursor_row - maxrow, maxrow)
+        elif key in ("home", "g"):
+            self._move_cursor(0, maxrow)
+        elif key in ("end", "G"):
+            self._move_cursor(self.row_count - 1, maxrow)
+        else:
+            return key
+
+        return None
+
+    @override
+    def go_to(self, location: str) -> str | None:
+        try:
+            offset = int(location.strip(), 0)
+        except ValueError:
+            return f"invalid offset: {location!r}"
+
+        if not 0 <= offset < max(len(self.data), 1):
+            return f"offset {offset:#x} is out of range"
+
+        self._center_cursor(offset // self.BYTES_PER_ROW)
+        return None
+
+    @override
+    def search(self, query: str, dir: Literal[-1, 1]) -> str | None:
+        try:
+            pattern = parse_byte_pattern(query)
+        except ValueError:
+            return f"invalid hexadecimal pattern: {query!r}"
+
+        match_row = None
+        if self.match is not None:
+            match_row = self.match[0] // self.BYTES_PER_ROW
+        if match_row == self.cursor_row:
+            assert self.match is not None
+            start = self.match[0] + 1 if dir == 1 else self.match[0]
+        else:
+            start = self.cursor_row * self.BYTES_PER_ROW
+            if dir == -1:
+                start += self.BYTES_PER_ROW
+
+        offset = find_bytes(self.data, pattern, start, dir)
+        if offset is None:
+            return f"{query!r} not found"
+
+        self.match = (offset, offset + len(pattern))
+        self._center_cursor(offset // self.BYTES_PER_ROW)
+        return None
+
+    @override
+    def get_status(self) -> str:
+        offset = self.cursor_row * self.BYTES_PER_ROW
+        return (f"Offset {offset:#x} of {len(self.data):#x} ({len(self.data)} bytes)"
+                "  #: go to  /: search")
+
+# }}}
+
+
+# {{{ text view
+
+def iter_pretty_json(text: str) -> Iterator[str]:
+    """
+    :returns: an iterator over the indented JSON text for *text*, in chunks
+    :raises ValueError: if *text* is not valid JSON
+    """
+    import json
+    return json.JSONEncoder(indent=2, ensure_ascii=False).iterencode(
+            json.loads(text))
+
+
+class _XMLPrettyPrinter:
+    """Handlers for :mod:`xml.parsers.expat` that write each tag and each
+    piece of text on a line of its own, indented by nesting level. Elements
+    containing only text are written on one line.
+    """
+
+    def __init__(self, indent: str = "  "):
+        self.indent = indent
+        self.output: list[str] = []
+        self.depth = 0
+        self.started = False
+        # Character data since the last markup
+        self.text: list[str] = []
+        # Whether the last thing written is a start tag
+        self.in_start_tag = False
+
+    def _write_line(self, s: str) -> None:
+        if self.started:
+            self.output.append("\n")
+        self.started = True
+        self.output.append(self.indent * self.depth + s)
+        self.in_start_tag = False
+
+    def _flush_text(self) -> None:
+        from xml.sax.saxutils import escape
+
+        text = "".join(self.text).strip()
+        self.text.clear()
+        if text:
+            self._write_line(escape(text))
+
+    def xml_decl(self, version: str | None, encoding: str | None,
+                standalone: int) -> None:
+        decl = f'<?xml version="{version or "1.0"}"'
+        if encoding:
+            decl += f' encoding="{encoding}"'
+        if standalone != -1:
+            decl += f' standalone="{"yes" if standalone else "no"}"'
+        self._write_line(decl + "?>")
+
+    def start_element(self, name: str, attributes: list[str]) -> None:
+        from xml.sax.saxutils import quoteattr
+
+        self._flush_text()
+        attrs = "".join(
+                f" {attributes[i]}={quoteattr(attributes[i + 1])}"
+                for i in range(0, len(attributes), 2))
+        self._write_line(f"<{name}{attrs}>")
+        self.depth += 1
+        self.in_start_tag = True
+
+    def end_element(self, name: str) -> None:
+        from xml.sax.saxutils import escape
+
+        self.depth -= 1
+        if self.in_start_tag:
+            self.output.append(escape("".join(self.text).strip()) + f"</{name}>")
+            self.text.clear()
+            self.in_start_tag = False
+        else:
+            self._flush_text()
+            self._write_line(f"</{name}>")
+
+    def character_data(self, data: str) -> None:
+        self.text.append(data)
+
+    def comment(self, data: str) -> None:
+        self._flush_text()
+        self._write_line(f"<!--{data}-->")
+
+    def processing_instruction(self, target: str, data: str) -> None:
+        self._flush_text()
+        self._write_line(f"<?{target} {data}?>")
+
+
+def iter_pretty_xml(text: str, chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """Parse *text* as XML, *chunk_size* characters at a time.
+
+    :yields: the indented XML text, in chunks
+    :raises xml.parsers.expat.ExpatError: once an error is reached
+    """
+    from xml.parsers import expat
+
+    printer = _XMLPrettyPrinter()
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.ordered_attributes = True
+    parser.XmlDeclHandler = printer.xml_decl
+    parser.StartElementHandler = printer.start_element
+    parser.EndElementHandler = printer.end_element
+    parser.CharacterDataHandler = printer.character_data
+    parser.CommentHandler = printer.comment
+    parser.ProcessingInstructionHandler = printer.processing_instruction
+
+    for start in range(0, len(text) + 1, chunk_size):
+        is_final = start + chunk_size > len(text)
+        try:
+            parser.Parse(text[start:start + chunk_size], is_final)
+        finally:
+            # Also the output up to an error
+            yield "".join(printer.output)
+            printer.output.clear()
+
+
+# Shown in place of control characters, so that each character takes up
+# one column
+_CONTROL_CHAR_TABLE = {
+        **dict.fromkeys(range(32), "?"),
+        ord("\t"): " ",
+        0x7f: "?",
+        }
+
+
+class TextView(PagerView):
+    """Shows a string, wrapped at the width of the view. Only the rows in
+    view are sliced from the string.
+
+    With "f", JSON or XML in the string is shown indented instead. The
+    indented text is produced as far as it is needed.
+    """
+
+    GO_TO_PROMPT: ClassVar[str] = "Go to line (@offset for a character offset): "
+
+    # Minimum number of characters of indented text produced at a time
+    EXTEND_SIZE: ClassVar[int] = 64 * 1024
+    # Number of characters searched at a time when searching backward
+    BACKWARD_SEARCH_WINDOW: ClassVar[int] = 1024**2
+
+    def __init__(self, text: str):
+        super().__init__()
+        self.raw_text = text
+        # "JSON" or "XML" if showing indented text
+        self.format: str | None = None
+        self._set_text(text)
+        self._maxcol = 80
+        self._message: str | None = None
+
+    def _set_text(self, text: str, chunks: Iterator[str] | None = None) -> None:
+        self.text = text
+        # The rest of the text, *None* once it has been produced
+        self._chunks = chunks
+        self.top_offset = 0
+        # Whether to show some rows above top_offset at the next render
+        self._show_context = False
+        # Offsets of the start and end of the last search match
+        self.match: tuple[int, int] | None = None
+        self._extend(self.EXTEND_SIZE)
+
+    def _extend(self, min_length: int | None = None) -> None:
+        """Produce more of the text, at least up to *min_length* characters
+        or all of it if *min_length* is *None*.
+        """
+        if self._chunks is None:
+            return
+        if min_length is not None and len(self.text) >= min_length:
+            return
+
+        # Grow geometrically, so that producing all of the text takes
+        # linear time.
+        target_length = None
+        if min_length is not None:
+            target_length = max(min_length, 2 * len(self.text))
+
+        new_chunks = []
+        length = len(self.text)
+        try:
+            for chunk in self._chunks:
+                new_chunks.append(chunk)
+                length += len(chunk)
+                if target_length is not None and length >= target_length:
+                    break
+            else:
+                self._chunks = None
+        except Exception as error:
+            new_chunks.append(f"\n!! {self.format} error: {error} !!")
+            self._chunks = None
+
+        self.text += "".join(new_chunks)
+
+    def toggle_format(self) -> str | None:
+        """Switch between the string and its indented JSON or XML text.
+
+        :returns: an error message, or *None* on success
+        """
+        if self.format is not None:
+            self.format = None
+            self._set_text(self.raw_text)
+            return None
+
+        stripped = self.raw_text[:100].lstrip()
+        try:
+            if stripped.startswith("<"):
+                chunks = iter_pretty_xml(self.raw_text)
+                self.format = "XML"
+            else:
+                chunks = iter_pretty_json(self.raw_text)
+                self.format = "JSON"
+        except ValueError as error:
+            return f"not JSON or XML: {error}"
+
+        self._set_text("", chunks)
+        return None
+
+    # {{{ rows
+
+    def _get_row_end(self, pos: int, maxcol: int) -> tuple[int, int]:
+        """
+        :returns: the end of the row starting at *pos* and the start of the
+            next one
+        """
+        self._extend(pos + maxcol + 1)
+        newline_pos = self.text.find("\n", pos, pos + maxcol + 1)
+        if newline_pos >= 0:
+            return newline_pos, newline_pos + 1
+        end = min(pos + maxcol, len(self.text))
+        return end, end
+
+    def _get_row_start(self, pos: int, maxcol: int) -> int:
+        """
+        :returns: the start of the row containing the character at *pos*
+        """
+        line_start = self.text.rfind("\n", 0, pos) + 1
+        column = pos - line_start
+        if column and pos < len(self.text) and self.text[pos] == "\n":
+            # The newline ends the row of the character before it
+            column -= 1
+        return line_start + column // maxcol * maxcol
+
+    def _get_previous_row_start(self, pos: int, maxcol: int) -> int:
+        if pos == 0:
+            return 0
+        return self._get_row_start(pos - 1, maxcol)
+
+    def _fix_top_offset(self, maxcol: int, maxrow: int) -> None:
+        self._maxcol = maxcol
+        self._extend(self.top_offset + 1)
+        self.top_offset = self._get_row_start(
+                min(self.top_offset, len(self.text)), maxcol)
+        if self._show_context:
+            self._show_context = False
+            for _ in range(maxrow // 3):
+                self.top_offset = self._get_previous_row_start(
+                        self.top_offset, maxcol)
+
+    def _render_row(self, start: int, end: int) -> tuple[str, list[tuple[str, int]]]:
+        text = self.text[start:end].translate(_CONTROL_CHAR_TABLE)
+        if self.match is None or self.match[1] <= start or end <= self.match[0]:
+            return text, [("pager", text_width(text))]
+
+        match_start = max(self.match[0] - start, 0)
+        match_end = min(self.match[1] - start, len(text))
+        return text, [
+                ("pager", text_width(text[:match_start])),
+                ("pager match", text_width(text[match_start:match_end])),
+                ("pager", text_width(text[match_end:])),
+                ]
+
+    @override
+    def render(self, size: tuple[int, int], focus: bool = False) -> urwid.Canvas:
+        maxcol, maxrow = size
+        self._fix_top_offset(maxcol, maxrow)
+
+        txt = []
+        attrs = []
+        pos = self.top_offset
+        while len(txt) < maxrow and pos < len(self.text):
+            end, next_pos = self._get_row_end(pos, maxcol)
+            line, line_attrs = self._render_row(pos, end)
+            pos = next_pos
+            txt.append(line)
+            attrs.append(line_attrs)
+
+        while len(txt) < maxrow:
+            txt.append("")
+            attrs.append([])
+
+        return make_canvas(txt, attrs, maxcol, fill_attr="pager")
+
+    # }}}
+
+    @override
+    def keypress(self, size: tuple[int, int], key: str) -> str | None:
+        maxcol, maxrow = size
+        self._fix_top_offset(maxcol, maxrow)
+        self._message = None
+
+        if key in ("down", "j"):
+            row_count = 1
+        elif key in ("up", "k"):
+            row_count = -1
+        elif key in ("page down", "ctrl f", "ctrl d"):
+            row_count = maxrow
+        elif key in ("page up", "ctrl b", "ctrl u"):
+            row_count = -maxrow
+        elif key in ("home", "g"):
+            self.top_offset = 0
+            row_count = 0
+        elif key in ("end", "G"):
+            self._extend()
+            self.top_offset = len(self.text)
+            row_count = -maxrow
+        elif key == "f":
+            self._message = self.toggle_format()
+            row_count = 0
+        else:
+            return key
+
+        for _ in range(row_count):
+            _end, next_start = self._get_row_end(self.top_offset, maxcol)
+            if next_start >= len(self.text):
+                break
+            self.top_offset = next_start
+        for _ in range(-row_count):
+            self.top_offset = self._get_previous_row_start(self.top_offset, maxcol)
+
+        self._invalidate()
+        return None
+
+    @override
+    def go_to(self, location: str) -> str | None:
+        location = location.strip()
+        try:
+            if location.startswith("@"):
+                offset = int(location[1:])
+                self._extend(offset + 1)
+                if not 0 <= offset < max(len(self.text), 1):
+                    return f"offset {offset} is out of range"
+            else:
+                line = int(location)
+                offset = 0
+                for _ in range(line - 1):
+                    newline_pos = self.text.find("\n", offset)
+                    while newline_pos < 0 and self._chunks is not None:
+                        self._extend(2 * len(self.text) + self.EXTEND_SIZE)
+                        newline_pos = self.text.find("\n", offset)
+                    if newline_pos < 0:
+                        return f"line {line} is out of range"
+                    offset = newline_pos + 1
+        except ValueError:
+            return f"invalid line or offset: {location!r}"
+
+        self.top_offset = offset
+        self._invalidate()
+        return None
+
+    @override
+    def search(self, query: str, dir: Literal[-1, 1]) -> str | None:
+        import re
+
+        # Case-sensitive only if the query has upper-case letters, like the
+        # other searches
+        flags = 0 if query.lower() != query else re.IGNORECASE
+        pattern = re.compile(re.escape(query), flags)
+
+        if self.match is not None:
+            start = self.match[0] + 1 if dir == 1 else self.match[0]
+        else:
+            start = self.top_offset
+
+        match = None
+        if dir == 1:
+            match = pattern.search(self.text, start)
+            while match is None and self._chunks is not None:
+                searched_length = len(self.text)
+                self._extend(2 * len(self.text) + self.EXTEND_SIZE)
+                match = pattern.search(self.text,
+                        max(start, searched_length - len(query)))
+        else:
+            # Look for the last match in windows of the text, going back
+            window_size = max(self.BACKWARD_SEARCH_WINDOW, 2 * len(query))
+            window_end = start + len(query) - 1
+            while match is None and window_end > 0:
+                window_start = max(window_end - window_size, 0)
+                for window_match in pattern.finditer(
+                        self.text, window_start, window_end):
+                    if window_match.start() >= start:
+                        break
+                    match = window_match
+                window_end = window_start + len(query) - 1 if window_start else 0
+
+        if match is None:
+            return f"{query!r} not found"
+
+        self.match = match.span()
+        self.top_offset = match.start()
+        self._show_context = True
+        self._invalidate()
+        return None
+
+    @override
+    def get_status(self) -> str:
+        more = "" if self._chunks is None else "+"
+        line = self.text.count("\n", 0, self.top_offset) + 1
+        line_count = self.text.count("\n") + 1
+        status = (f"Line {line} of {line_count}{more}, "
+                f"offset {self.top_offset} of {len(self.text)}{more}")
+        if self.format is not None:
+            status += f" ({self.format})"
+        status += "  #: go to  /: search  f: format"
+        if self._message is not None:
+            status += f" - {self._message}"
+        return status
+
+# }}}
+
+
+# vim: foldmethod=marker
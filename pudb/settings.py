@@ -30,7 +30,7 @@ import os
 import sys
 from configparser import ConfigParser
 from functools import partial
-from typing import TYPE_CHECKING, Literal, TypedDict, cast
+from typing import TYPE_CHECKING, Any, Literal, TypedDict, cast
 
 from pudb.lowlevel import get_breakpoint_invalid_reason, lookup_module, settings_log
 
@@ -49,6 +49,11 @@ class ConfDict(TypedDict):
     shell: str
     theme: str
     line_numbers: bool
+    show_hit_counts: bool
+    record_call_tree: bool
+    call_tree_module_roots: str
+    call_tree_max_edges: int
+    track_memory: bool
     seen_welcome: str
     sidebar_width: float
     variables_weight: float
@@ -58,8 +63,17 @@ class ConfDict(TypedDict):
     stringifier: Stringifier
     custom_theme: str
     custom_stringifier: str
+    stringifier_cache_kb: int
+    stringifier_value_budget_ms: int
+    stringifier_stop_budget_ms: int
     custom_shell: str
     wrap_variables: bool
+    highlight_changes: bool
+    show_variable_sizes: bool
+    sort_variables_by_size: bool
+    persist_var_view_state: bool
+    container_page_size: int
+    watch_budget_ms: int
     default_variables_access_level: VarAccessLevel
     display: str
     prompt_on_quit: bool
@@ -104,6 +118,8 @@ CONF_FILE_NAME = "pudb.cfg"
 
 SAVED_BREAKPOINTS_FILE_NAME = "saved-breakpoints-%d.%d" % sys.version_info[:2]  # noqa: UP031
 BREAKPOINTS_FILE_NAME = "breakpoints-%d.%d" % sys.version_info[:2]  # noqa: UP031
+VAR_VIEW_STATE_FILE_NAME = "var-view-state.json"
+VAR_VIEW_STATE_VERSION = 1
 
 
 _config_: list[ConfDict | None] = [None]
@@ -135,6 +151,11 @@ def load_config():
     conf_dict.setdefault("shell", "internal")
     conf_dict.setdefault("theme", "classic")
     conf_dict.setdefault("line_numbers", False)
+    conf_dict.setdefault("show_hit_counts", False)
+    conf_dict.setdefault("record_call_tree", False)
+    conf_dict.setdefault("call_tree_module_roots", "")
+    conf_dict.setdefault("call_tree_max_edges", 10000)
+    conf_dict.setdefault("track_memory", False)
     conf_dict.setdefault("seen_welcome", "a")
 
     conf_dict.setdefault("sidebar_width", 0.5)
@@ -150,7 +171,17 @@ def load_config():
     conf_dict.setdefault("custom_stringifier", "")
     conf_dict.setdefault("custom_shell", "")
 
+    conf_dict.setdefault("stringifier_cache_kb", 4096)
+    conf_dict.setdefault("stringifier_value_budget_ms", 50)
+    conf_dict.setdefault("stringifier_stop_budget_ms", 500)
+
     conf_dict.setdefault("wrap_variables", True)
+    conf_dict.setdefault("highlight_changes", True)
+    conf_dict.setdefault("show_variable_sizes", False)
+    conf_dict.setdefault("sort_variables_by_size", False)
+    conf_dict.setdefault("persist_var_view_state", False)
+    conf_dict.setdefault("container_page_size", 10)
+    conf_dict.setdefault("watch_budget_ms", 100)
     conf_dict.setdefault("default_variables_access_level", "public")
 
     conf_dict.setdefault("display", "auto")
@@ -179,7 +210,28 @@ def load_config():
             settings_log.exception("Failed to process config")
 
     normalize_bool_inplace("line_numbers")
+    normalize_bool_inplace("show_hit_counts")
+    normalize_bool_inplace("record_call_tree")
+    normalize_bool_inplace("track_memory")
+
+    def normalize_int_inplace(name, default):
+        try:
+            conf_dict[name] = int(conf_dict[name])
+        except ValueError:
+            settings_log.exception("Failed to process config")
+            conf_dict[name] = default
+
+    normalize_int_inplace("call_tree_max_edges", 10000)
+    normalize_int_inplace("stringifier_cache_kb", 4096)
+    normalize_int_inplace("stringifier_value_budget_ms", 50)
+    normalize_int_inplace("stringifier_stop_budget_ms", 500)
+    normalize_int_inplace("container_page_size", 10)
+    normalize_int_inplace("watch_budget_ms", 100)
     normalize_bool_inplace("wrap_variables")
+    normalize_bool_inplace("highlight_changes")
+    normalize_bool_inplace("show_variable_sizes")
+    normalize_bool_inplace("sort_variables_by_size")
+    normalize_bool_inplace("persist_var_view_state")
     normalize_bool_inplace("prompt_on_quit")
     normalize_bool_inplace("hide_cmdline_win")
 
@@ -221,6 +273,11 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
         for sl in ui.source:
             sl._invalidate()  # pyright: ignore[reportPrivateUsage]
 
+    def _update_show_hit_counts():
+        ui.update_hit_counts()
+        for sl in ui.source:
+            sl._invalidate()  # pyright: ignore[reportPrivateUsage]
+
     def _update_prompt_on_quit():
         pass
 
@@ -233,6 +290,7 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
     def _update_stringifier():
         import pudb.var_view
         pudb.var_view.custom_stringifier_dict = {}
+        pudb.var_view.stringifier_cache.clear()
         ui.update_var_view()
 
     def _update_default_variables_access_level():
@@ -241,6 +299,12 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
     def _update_wrap_variables():
         ui.update_var_view()
 
+    def _update_highlight_changes():
+        ui.update_var_view()
+
+    def _update_variable_sizes():
+        ui.update_var_view()
+
     def _update_config(
                 check_box: CheckBox,
                 new_state: bool,
@@ -264,6 +328,19 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
             conf_dict.update(new_conf_dict)
             _update_line_numbers()
 
+        elif option == "show_hit_counts":
+            new_conf_dict["show_hit_counts"] = not check_box.get_state()
+            conf_dict.update(new_conf_dict)
+            _update_show_hit_counts()
+
+        elif option == "record_call_tree":
+            new_conf_dict["record_call_tree"] = not check_box.get_state()
+            conf_dict.update(new_conf_dict)
+
+        elif option == "track_memory":
+            new_conf_dict["track_memory"] = not check_box.get_state()
+            conf_dict.update(new_conf_dict)
+
         elif option == "prompt_on_quit":
             new_conf_dict["prompt_on_quit"] = not check_box.get_state()
             conf_dict.update(new_conf_dict)
@@ -302,6 +379,25 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
             conf_dict.update(new_conf_dict)
             _update_wrap_variables()
 
+        elif option == "highlight_changes":
+            new_conf_dict["highlight_changes"] = not check_box.get_state()
+            conf_dict.update(new_conf_dict)
+            _update_highlight_changes()
+
+        elif option == "show_variable_sizes":
+            new_conf_dict["show_variable_sizes"] = not check_box.get_state()
+            conf_dict.update(new_conf_dict)
+            _update_variable_sizes()
+
+        elif option == "sort_variables_by_size":
+            new_conf_dict["sort_variables_by_size"] = not check_box.get_state()
+            conf_dict.update(new_conf_dict)
+            _update_variable_sizes()
+
+        elif option == "persist_var_view_state":
+            new_conf_dict["persist_var_view_state"] = not check_box.get_state()
+            conf_dict.update(new_conf_dict)
+
     heading = urwid.Text("This is the preferences screen for PuDB. "
         "Hit Ctrl-P at any time to get back to it.\n\n"
         "Configuration settings are saved in "
@@ -314,6 +410,20 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
             on_state_change=partial(
                 _update_config, option_newvalue=("line_numbers", None)))
 
+    cb_show_hit_counts = urwid.CheckBox(
+            "Show how often each line ran since the last stop "
+            "(keeps tracing active while continuing)",
+            bool(conf_dict["show_hit_counts"]),
+            on_state_change=partial(
+                _update_config, option_newvalue=("show_hit_counts", None)))
+
+    cb_track_memory = urwid.CheckBox(
+            "Track memory allocations and garbage collections between stops "
+            "(press 'M' to view them, slows down the debuggee)",
+            bool(conf_dict["track_memory"]),
+            on_state_change=partial(
+                _update_config, option_newvalue=("track_memory", None)))
+
     cb_prompt_on_quit = urwid.CheckBox("Prompt before quitting",
             bool(conf_dict["prompt_on_quit"]),
             on_state_change=partial(
@@ -414,6 +524,15 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
         "selecting a variable and typing 'e' to edit the variable's display "
         "settings, or by typing one of d/t/r/s/i/c. Note that str and repr will "
         "be slower than the default, type, or id stringifiers.\n")
+    stringifier_cache_kb_edit = urwid.IntEdit(
+            "Result cache size in KiB (0 to disable): ",
+            default=conf_dict["stringifier_cache_kb"])
+    stringifier_value_budget_ms_edit = urwid.IntEdit(
+            "Time budget per value in ms (0 for none): ",
+            default=conf_dict["stringifier_value_budget_ms"])
+    stringifier_stop_budget_ms_edit = urwid.IntEdit(
+            "Time budget per stop in ms (0 for none): ",
+            default=conf_dict["stringifier_stop_budget_ms"])
     stringifier_edit_list_item = urwid.AttrMap(stringifier_edit,
                                                "input", "focused input")
     stringifier_rbs = [
@@ -438,6 +557,15 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
                     "Note that if you choose a custom stringifier, the variables "
                     "view will not be updated until you close this dialog."),
             ]
+    stringifier_cache_info = urwid.Text("\nStringified values are cached "
+            "while the debuggee is stopped. Across stops, only immutable "
+            "values reuse their cached strings, as do objects of types that "
+            "define a 'pudb_mutation_count' attribute, incremented on every "
+            "change, if it is unchanged.\n\n"
+            "Values whose stringifier takes longer than the time budget per "
+            "value are shown by type from then on. Once the time budget per "
+            "stop is used up, no more values are stringified until the next "
+            "stop. Press 'R' on a variable to retry without a time budget.")
 
     # }}}
 
@@ -462,6 +590,29 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
 
     # }}}
 
+    # {{{ call tree
+
+    cb_record_call_tree = urwid.CheckBox(
+            "Record the calls made between stops (press 'T' to view them)",
+            bool(conf_dict["record_call_tree"]),
+            on_state_change=partial(
+                _update_config, option_newvalue=("record_call_tree", None)))
+
+    call_tree_module_roots_edit = urwid.Edit(
+            "Module roots: ", edit_text=conf_dict["call_tree_module_roots"])
+    call_tree_max_edges_edit = urwid.IntEdit(
+            "Maximum number of caller/callee pairs: ",
+            default=conf_dict["call_tree_max_edges"])
+
+    call_tree_info = urwid.Text("\nOnly calls into modules under the "
+            "comma-separated module roots (e.g. 'mypkg, __main__') are "
+            "recorded. If none are given, all code outside the standard "
+            "library is recorded. Recording slows down the debuggee. "
+            "Once the maximum number of caller/callee pairs is reached, "
+            "the call tree is truncated.")
+
+    # }}}
+
     # {{{ wrap variables
 
     cb_wrap_variables = urwid.CheckBox("Wrap variables",
@@ -475,6 +626,81 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
 
     # }}}
 
+    # {{{ highlight changes
+
+    cb_highlight_changes = urwid.CheckBox(
+            "Highlight variables that changed since the previous stop",
+            bool(conf_dict["highlight_changes"]),
+            on_state_change=partial(
+                _update_config, option_newvalue=("highlight_changes", None)))
+
+    highlight_changes_info = urwid.Text("\nA variable counts as changed if "
+            "it is new, refers to a different object, or its length or "
+            "displayed value differ.")
+
+    # }}}
+
+    # {{{ variable sizes
+
+    cb_show_variable_sizes = urwid.CheckBox(
+            "Show the memory size of each variable",
+            bool(conf_dict["show_variable_sizes"]),
+            on_state_change=partial(
+                _update_config, option_newvalue=("show_variable_sizes", None)))
+
+    cb_sort_variables_by_size = urwid.CheckBox(
+            "Sort variables by size, largest first",
+            bool(conf_dict["sort_variables_by_size"]),
+            on_state_change=partial(
+                _update_config, option_newvalue=("sort_variables_by_size", None)))
+
+    variable_sizes_info = urwid.Text("\nThe size includes all objects "
+            "reachable from the variable, counted once each. Sizes marked "
+            "with '>' are lower bounds, the count was stopped early to keep "
+            "the debugger responsive. Once the time for counting at a stop "
+            "is used up, further sizes are shown as '?'.")
+
+    # }}}
+
+    # {{{ persist variable view state
+
+    cb_persist_var_view_state = urwid.CheckBox(
+            "Remember expanded variables and watches across sessions",
+            bool(conf_dict["persist_var_view_state"]),
+            on_state_change=partial(
+                _update_config, option_newvalue=("persist_var_view_state", None)))
+
+    persist_var_view_state_info = urwid.Text("\nThe state is kept per "
+            "function and saved in the configuration directory.")
+
+    # }}}
+
+    # {{{ container paging
+
+    container_page_size_edit = urwid.IntEdit(
+            "Number of entries per page: ",
+            default=conf_dict["container_page_size"])
+
+    container_page_size_info = urwid.Text("\nExpanded containers show this "
+            "many entries at a time, expand the '[...]' entry to see more. "
+            "Press '#' on a container to go to an index.")
+
+    # }}}
+
+    # {{{ watch expressions
+
+    watch_budget_ms_edit = urwid.IntEdit(
+            "Time budget per watch in ms (0 for none): ",
+            default=conf_dict["watch_budget_ms"])
+
+    watch_budget_info = urwid.Text("\nA watch expression that takes longer "
+            "than this to evaluate is not evaluated again at later stops, "
+            "its last value is shown instead. Press 'R' on the watch to "
+            "evaluate it once more, or pin it in its options ('e') to "
+            "evaluate it at every stop.")
+
+    # }}}
+
     # {{{ display
 
     display_info = urwid.Text("What driver is used to talk to your terminal. "
@@ -503,6 +729,8 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
                               urwid.Text("General:\n"),
                               "group head"),
                 cb_line_numbers,
+                cb_show_hit_counts,
+                cb_track_memory,
                 cb_prompt_on_quit,
                 hide_cmdline_win,
                 urwid.AttrMap(
@@ -524,16 +752,60 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
                               "group head"),
                 stringifier_info,
                 *stringifier_rbs,
+                urwid.AttrMap(stringifier_cache_kb_edit,
+                              "input", "focused input"),
+                urwid.AttrMap(stringifier_value_budget_ms_edit,
+                              "input", "focused input"),
+                urwid.AttrMap(stringifier_stop_budget_ms_edit,
+                              "input", "focused input"),
+                stringifier_cache_info,
                 urwid.AttrMap(
                               urwid.Text("\nVariables Attribute Visibility:\n"),
                               "group head"),
                 default_variables_access_level_info,
                 *default_variables_access_level_rbs,
+                urwid.AttrMap(
+                              urwid.Text("\nCall Tree:\n"),
+                              "group head"),
+                cb_record_call_tree,
+                urwid.AttrMap(call_tree_module_roots_edit,
+                              "input", "focused input"),
+                urwid.AttrMap(call_tree_max_edges_edit,
+                              "input", "focused input"),
+                call_tree_info,
                 urwid.AttrMap(
                               urwid.Text("\nWrap Variables:\n"),
                               "group head"),
                 cb_wrap_variables,
                 wrap_variables_info,
+                urwid.AttrMap(
+                              urwid.Text("\nChanged Variables:\n"),
+                              "group head"),
+                cb_highlight_changes,
+                highlight_changes_info,
+                urwid.AttrMap(
+                              urwid.Text("\nVariable Sizes:\n"),
+                              "group head"),
+                cb_show_variable_sizes,
+                cb_sort_variables_by_size,
+                variable_sizes_info,
+                urwid.AttrMap(
+                              urwid.Text("\nSaved Variable State:\n"),
+                              "group head"),
+                cb_persist_var_view_state,
+                persist_var_view_state_info,
+                urwid.AttrMap(
+                              urwid.Text("\nContainer Paging:\n"),
+                              "group head"),
+                urwid.AttrMap(container_page_size_edit,
+                              "input", "focused input"),
+                container_page_size_info,
+                urwid.AttrMap(
+                              urwid.Text("\nWatch Expressions:\n"),
+                              "group head"),
+                urwid.AttrMap(watch_budget_ms_edit,
+                              "input", "focused input"),
+                watch_budget_info,
                 urwid.AttrMap(
                               urwid.Text("\nDisplay driver:\n"),
                               "group head"),
@@ -573,6 +845,23 @@ def edit_config(ui: DebuggerUI, conf_dict: ConfDict):
                 if shell_rb.get_state():
                     conf_dict["shell"] = shell
 
+        conf_dict["call_tree_module_roots"] = \
+                call_tree_module_roots_edit.get_edit_text()
+        if call_tree_max_edges_edit.get_edit_text():
+            conf_dict["call_tree_max_edges"] = call_tree_max_edges_edit.value()
+        if stringifier_cache_kb_edit.get_edit_text():
+            conf_dict["stringifier_cache_kb"] = stringifier_cache_kb_edit.value()
+        if stringifier_value_budget_ms_edit.get_edit_text():
+            conf_dict["stringifier_value_budget_ms"] = \
+                    stringifier_value_budget_ms_edit.value()
+        if container_page_size_edit.get_edit_text():
+            conf_dict["container_page_size"] = container_page_size_edit.value()
+        if watch_budget_ms_edit.get_edit_text():
+            conf_dict["watch_budget_ms"] = watch_budget_ms_edit.value()
+        if stringifier_stop_budget_ms_edit.get_edit_text():
+            conf_dict["stringifier_stop_budget_ms"] = \
+                    stringifier_stop_budget_ms_edit.value()
+
         for display, display_rb in zip(displays, display_rbs):
             if display_rb.get_state():
                 conf_dict["display"] = display
@@ -685,4 +974,54 @@ def save_breakpoints(bp_list: Sequence[Breakpoint]):
 
 # }}}
 
+
+# {{{ variable view state
+
+def load_var_view_state() -> list[dict[str, Any]]:
+    """
+    :returns: the per-frame entries saved by :func:`save_var_view_state`.
+    """
+    import json
+    from os.path import join
+
+    save_path = get_save_config_path()
+    if not save_path:
+        return []
+
+    try:
+        with open(join(save_path, VAR_VIEW_STATE_FILE_NAME)) as inf:
+            state = json.load(inf)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError):
+        settings_log.exception("Failed to load variable view state")
+        return []
+
+    if (not isinstance(state, dict)
+            or state.get("version") != VAR_VIEW_STATE_VERSION
+            or not isinstance(state.get("frames"), list)):
+        return []
+
+    return [entry for entry in state["frames"] if isinstance(entry, dict)]
+
+
+def save_var_view_state(frames: Sequence[dict[str, Any]]) -> None:
+    import json
+    from os.path import join
+
+    save_path = get_save_config_path()
+    if not save_path:
+        return
+
+    try:
+        with open(join(save_path, VAR_VIEW_STATE_FILE_NAME), "w") as outf:
+            json.dump({
+                "version": VAR_VIEW_STATE_VERSION,
+                "frames": list(frames),
+                }, outf)
+    except OSError:
+        settings_log.exception("Failed to save variable view state")
+
+# }}}
+
 # vim:foldmethod=marker
@@ -42,6 +42,15 @@ if TYPE_CHECKING:
 TABSTOP = 8
 
 
+def format_hit_count(hit_count: int | None) -> str:
+    if not hit_count:
+        return " "*6
+    elif hit_count < 100000:
+        return f"{hit_count:5d} "
+    else:
+        return f"{min(hit_count // 1000, 9999):4d}k "
+
+
 @dataclass(eq=False)
 class SourceLine(urwid.Widget):
     _sizing: ClassVar[frozenset[urwid.Sizing]] = frozenset([urwid.Sizing.FLOW])
@@ -53,6 +62,7 @@ class SourceLine(urwid.Widget):
     has_breakpoint: bool = False
     is_current: bool = False
     highlight: bool = False
+    hit_count: int | None = None
 
     @override
     def selectable(self):
@@ -70,6 +80,16 @@ class SourceLine(urwid.Widget):
         self.has_breakpoint = has_breakpoint
         self._invalidate()
 
+    def set_hit_count(self, hit_count: int | None):
+        """
+        :arg hit_count: the number of times this line was reached since the
+            previous stop, or *None* if no counts were collected for this file
+            or the line holds no code.
+        """
+        if hit_count != self.hit_count:
+            self.hit_count = hit_count
+            self._invalidate()
+
     @override
     def rows(self, size, focus=False):
         return 1
@@ -78,6 +98,7 @@ class SourceLine(urwid.Widget):
     def render(self, size: tuple[int, int], focus: bool = False):
         from pudb.debugger import CONFIG
         render_line_nr = CONFIG["line_numbers"]
+        render_hit_count = CONFIG["show_hit_counts"]
 
         maxcol = size[0]
         hscroll = self.dbg_ui.source_hscroll_start
@@ -103,7 +124,9 @@ class SourceLine(urwid.Widget):
             attrs.append("highlighted")
 
         text = self.text
-        if not attrs and self.attr is not None:
+        if not attrs and render_hit_count and self.hit_count == 0:
+            attr = [("unexecuted source", None)]
+        elif not attrs and self.attr is not None:
             attr = [*self.attr, ("source", None)]
         else:
             attr = [(" ".join([*attrs, "source"]), None)]
@@ -118,6 +141,11 @@ class SourceLine(urwid.Widget):
             line_prefix_attr = [("line number", len(self.line_nr))]
             line_prefix = self.line_nr
 
+        if render_hit_count:
+            hit_count_text = format_hit_count(self.hit_count)
+            line_prefix_attr.append(("hit count", len(hit_count_text)))
+            line_prefix += hit_count_text
+
         line_prefix = crnt+bp+line_prefix
         line_prefix_attr = [
             ("current line marker", 1),
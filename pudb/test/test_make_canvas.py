@@ -48,6 +48,33 @@ def test_byte_boundary():
     assert list(canvas.content()) == [[("var value", None, b"aaaaaa\xc3\xa9")]]
 
 
+def test_truncate():
+    for text in ["aaaaaa", "aaaaaé"]:
+        canvas = make_canvas(
+            txt=[text, ""],
+            attr=[[("var label", 3), ("var value", 4)], []],
+            maxcol=4,
+            fill_attr="fill",
+        )
+        assert list(canvas.content()) == [
+            [("var label", None, b"aaa"), ("var value", None, b"a")],
+            [("fill", None, b" " * 4)],
+            ]
+
+
+def test_attr_beyond_text():
+    canvas = make_canvas(
+        txt=["abc"],
+        attr=[[("var label", 2), ("var value", 2)]],
+        maxcol=5,
+    )
+    assert list(canvas.content()) == [[
+        ("var label", None, b"ab"),
+        ("var value", None, b"c"),
+        (None, None, b"  "),
+        ]]
+
+
 def test_wide_chars():
     text = "data: '中文'"
     canvas = make_canvas(
@@ -0,0 +1,151 @@
+import pytest
+
+from pudb.pager import (
+    HexView,
+    Pager,
+    TextView,
+    find_bytes,
+    iter_pretty_xml,
+    parse_byte_pattern,
+)
+
+
+def test_find_bytes():
+    data = memoryview(b"abcXYZabcXYZ" * 10)
+
+    # Matches across chunk boundaries are found
+    assert find_bytes(data, b"XYZa", 0, chunk_size=4) == 3
+    assert find_bytes(data, b"XYZa", 4, chunk_size=4) == 9
+    assert find_bytes(data, b"XYZa", 4, dir=-1, chunk_size=4) == 3
+    assert find_bytes(data, b"XYZa", 3, dir=-1, chunk_size=4) is None
+    assert find_bytes(data, b"bcX", len(data), dir=-1, chunk_size=5) \
+            == len(data) - 5
+    assert find_bytes(data, b"XYZ!", 0, chunk_size=4) is None
+    assert find_bytes(data, b"", 0) is None
+
+    assert parse_byte_pattern("0xde ad") == b"\xde\xad"
+    assert parse_byte_pattern("abé") == "abé".encode()
+    with pytest.raises(ValueError):
+        parse_byte_pattern("0xzz")
+
+
+def _render_text(widget, size):
+    return [line.decode() for line in widget.render(size).text]
+
+
+def test_hex_view():
+    data = bytes(range(256)) * 4 + b"NEEDLE"
+    view = HexView(memoryview(data))
+    assert view.row_count == 65
+
+    first, second = _render_text(view, (80, 2))
+    assert first.rstrip() == (
+            "00000000  00 01 02 03 04 05 06 07 08 09 0a 0b 0c 0d 0e 0f  "
+            "................")
+    assert second.startswith("00000010  10 11")
+
+    pager = Pager(view)
+    for key in "/NEEDLE":
+        pager.keypress((80, 5), key)
+    pager.keypress((80, 5), "enter")
+    assert view.match == (1024, 1030)
+    assert view.cursor_row == 64
+    last_line = _render_text(view, (80, 4))[-1]
+    assert last_line.rstrip() == "00000400  4e 45 45 44 4c 45" + " " * 32 + "NEEDLE"
+
+    assert view.search("0x0f10", -1) is None
+    assert view.match == (0x30f, 0x311)
+    assert view.search("0x0f10", -1) is None
+    assert view.match == (0x20f, 0x211)
+    assert view.search("missing", 1) is not None
+
+    assert view.go_to("0x25") is None
+    assert view.cursor_row == 2
+    assert view.go_to("5000") is not None
+
+    view.keypress((80, 4), "end")
+    assert view.cursor_row == 64
+    view.keypress((80, 4), "page up")
+    assert view.cursor_row == 60
+
+
+def test_hex_view_releases_mmap():
+    import mmap
+
+    mm = mmap.mmap(-1, 100)
+    mm[10:13] = b"abc"
+    with memoryview(mm) as buffer, buffer.cast("B") as data:
+        assert HexView(data).search("abc", 1) is None
+
+    mm.close()
+
+
+def test_text_view():
+    text = "ab\n\ncdef\n" + "x" * 25 + "\nEnd"
+    view = TextView(text)
+
+    # Wrapped at the width of the view
+    assert [line.rstrip() for line in _render_text(view, (10, 5))] == [
+            "ab", "", "cdef", "x" * 10, "x" * 10]
+
+    view.keypress((10, 3), "down")
+    view.keypress((10, 3), "down")
+    assert view.top_offset == text.index("c")
+    view.keypress((10, 3), "up")
+    assert view.top_offset == 3
+    view.keypress((10, 3), "end")
+    assert [line.rstrip() for line in _render_text(view, (10, 3))] == [
+            "x" * 10, "x" * 5, "End"]
+
+    assert view.go_to("3") is None
+    assert view.top_offset == text.index("c")
+    assert view.go_to("@8") is None
+    assert view.go_to("9") is not None
+
+    # Case-insensitive unless the query has upper case
+    assert view.search("end", 1) is None
+    assert view.match == (len(text) - 3, len(text))
+    assert view.search("CD", -1) is not None
+    assert view.search("b", -1) is None
+    assert view.match == (1, 2)
+
+
+def test_text_view_format():
+    import json
+
+    data = {"items": [{"id": i, "name": f"item{i}"} for i in range(10000)]}
+    view = TextView(json.dumps(data))
+    assert view.toggle_format() is None
+    assert view.format == "JSON"
+
+    # Only produced as far as needed
+    assert len(view.text) < len(json.dumps(data, indent=2))
+    assert view.search("item9999", 1) is None
+    assert view.text == json.dumps(data, indent=2, ensure_ascii=False)
+    assert view.text[view.match[0] - 1:view.match[1] + 1] == '"item9999"'
+
+    assert view.toggle_format() is None
+    assert view.text == json.dumps(data)
+
+    assert TextView("not JSON").toggle_format() is not None
+
+
+def test_pretty_xml():
+    xml = ('<?xml version="1.0"?><!-- c --><a x="1"><b>hi &amp; there</b>'
+            "<c><d/></c>tail<e/></a>")
+    assert "".join(iter_pretty_xml(xml, chunk_size=7)).split("\n") == [
+            '<?xml version="1.0"?>',
+            "<!-- c -->",
+            '<a x="1">',
+            "  <b>hi &amp; there</b>",
+            "  <c>",
+            "    <d></d>",
+            "  </c>",
+            "  tail",
+            "  <e></e>",
+            "</a>",
+            ]
+
+    view = TextView("<a><b>text</a>")
+    assert view.toggle_format() is None
+    assert view.text.startswith("<a>\n  <b>\n!! XML error: mismatched tag")
@@ -0,0 +1,344 @@
+import sys
+
+from pudb.tracing import (
+    CallTreeRecorder,
+    DeepSizeCache,
+    LineHitCounter,
+    MemoryTracker,
+    StepTimer,
+    describe_reference,
+    find_instances,
+    format_size,
+    get_deep_size,
+    take_heap_histogram,
+    walk_references,
+)
+
+
+def _count_lines(counter, func, *args):
+    code = func.__code__
+
+    def tracer(frame, event, arg):
+        if frame.f_code is not code:
+            return None
+        if event == "line":
+            counter.count(frame)
+        return tracer
+
+    old_trace = sys.gettrace()
+    sys.settrace(tracer)
+    try:
+        func(*args)
+    finally:
+        sys.settrace(old_trace)
+
+
+def loop_with_branch(n):
+    total = 0
+    for i in range(n):
+        if i % 2:
+            total += i
+    return total
+
+
+def test_line_hit_counts():
+    counter = LineHitCounter()
+    _count_lines(counter, loop_with_branch, 5)
+
+    code = loop_with_branch.__code__
+    hit_counts = counter.get_file_hit_counts(
+            lambda fn: fn, code.co_filename)
+
+    first = code.co_firstlineno
+    assert hit_counts[first + 1] == 1       # total = 0
+    assert hit_counts[first + 3] == 5       # if i % 2
+    assert hit_counts[first + 4] == 2       # total += i
+    assert hit_counts[first + 5] == 1       # return total
+    assert first not in hit_counts          # def line never runs
+
+
+def branch_with_comment(flag):
+    # a comment
+
+    if flag:
+        return 1
+    return 0
+
+
+def test_line_hit_counts_only_cover_code():
+    counter = LineHitCounter()
+    _count_lines(counter, branch_with_comment, False)
+
+    code = branch_with_comment.__code__
+    hit_counts = counter.get_file_hit_counts(
+            lambda fn: fn, code.co_filename)
+
+    first = code.co_firstlineno
+    assert hit_counts[first + 3] == 1       # if flag
+    assert hit_counts[first + 4] == 0       # return 1, never executed
+    assert hit_counts[first + 5] == 1       # return 0
+    # The comment, blank and def lines hold no code of their own.
+    assert first + 1 not in hit_counts
+    assert first + 2 not in hit_counts
+    assert first not in hit_counts
+
+
+def test_line_hit_counts_other_file():
+    counter = LineHitCounter()
+    _count_lines(counter, loop_with_branch, 3)
+
+    assert counter.get_file_hit_counts(lambda fn: fn, "<nonexistent>") == {}
+
+
+def _leaf(n):
+    return n * 2
+
+
+def _middle(n):
+    return sum(_leaf(i) for i in range(n))
+
+
+def _top():
+    return _middle(3) + _middle(2)
+
+
+def _record_calls(recorder, func):
+    recorder.start()
+    try:
+        func()
+    finally:
+        recorder.stop()
+
+
+def test_call_tree_recorder():
+    recorder = CallTreeRecorder(module_roots=[__name__])
+    _record_calls(recorder, _top)
+
+    (top_code, top_edge), = recorder.get_callees(None)
+    assert top_code is _top.__code__
+    assert top_edge.count == 1
+
+    (middle_code, middle_edge), = recorder.get_callees(top_code)
+    assert middle_code is _middle.__code__
+    assert middle_edge.count == 2
+    assert middle_edge.inclusive_ns <= top_edge.inclusive_ns
+
+    # The generator expression in _middle is recorded too, _leaf is called
+    # from there.
+    callees = dict(recorder.get_callees(middle_code))
+    genexpr_code, = [code for code in callees if code is not _leaf.__code__]
+    leaf_edge, = [edge for code, edge in recorder.get_callees(genexpr_code)
+            if code is _leaf.__code__]
+    assert leaf_edge.count == 5
+
+    assert not recorder.truncated
+
+
+def test_call_tree_recorder_filter_and_truncation():
+    recorder = CallTreeRecorder(module_roots=["nonexistent_module"])
+    _record_calls(recorder, _top)
+    assert recorder.edges == {}
+
+    recorder = CallTreeRecorder(module_roots=[__name__], max_edges=2)
+    _record_calls(recorder, _top)
+    assert len(recorder.edges) == 2
+    assert recorder.truncated
+    assert len(recorder._code_is_recorded) <= 2
+
+
+def _countdown(n):
+    return _countdown(n - 1) if n else 0
+
+
+def test_call_tree_recursion():
+    from pudb.ui_tools import CallTreeLeafNode, CallTreeNode
+
+    recorder = CallTreeRecorder(module_roots=[__name__])
+    _record_calls(recorder, lambda: _countdown(3))
+
+    root = CallTreeNode(recorder)
+    lambda_node = root.get_child_node(0)
+    countdown_node = lambda_node.get_child_node(0)
+    assert countdown_node.get_value()[0] is _countdown.__code__
+    assert isinstance(countdown_node, CallTreeNode)
+
+    # The recursive call is not expanded again.
+    recursive_node = countdown_node.get_child_node(0)
+    assert isinstance(recursive_node, CallTreeLeafNode)
+    assert ("warning", " (recursive)") in recursive_node.get_label()
+    assert ("warning", " (recursive)") not in countdown_node.get_label()
+
+
+def test_step_timer():
+    timer = StepTimer(history_length=2)
+    assert timer.stop() is None
+
+    for _ in range(3):
+        timer.resume()
+        sum(i*i for i in range(10000))
+        timing = timer.stop()
+        assert timing is not None
+        assert timing.wall_ns > 0
+        assert timing.cpu_ns >= 0
+
+    assert len(timer.history) == 2
+    assert timer.history[-1] is timing
+
+    # Only one measurement per resume
+    assert timer.stop() is None
+
+
+def test_memory_tracker():
+    import gc
+    import tracemalloc
+
+    was_tracing = tracemalloc.is_tracing()
+
+    tracker = MemoryTracker()
+    assert tracker.stop() is None
+
+    tracker.enable()
+    try:
+        tracker.resume()
+        data = [str(i) for i in range(1000)]
+        gc.collect()
+        info = tracker.stop()
+    finally:
+        tracker.disable()
+
+    assert tracemalloc.is_tracing() == was_tracing
+    assert gc.callbacks.count(tracker._gc_callback) == 0
+
+    assert info is not None
+    assert info.gc_collections >= 1
+    assert info.gc_stats_delta[2]["collections"] >= 1
+    assert sum(stat.size for stat in info.snapshot.statistics("lineno")) \
+            >= sum(len(s) for s in data)
+    assert isinstance(info.get_allocation_diffs(), list)
+
+
+def test_memory_tracker_ignores_stopped_time():
+    # Allocations in PuDB's own files are not reported.
+    namespace = {}
+    exec(compile("def allocate(): return [str(i) * 10 for i in range(1000)]",
+            "<user code>", "exec"), namespace)
+
+    def get_user_diffs(info):
+        return [diff for diff in info.get_allocation_diffs()
+                if diff.traceback[0].filename == "<user code>"]
+
+    tracker = MemoryTracker()
+    tracker.enable()
+    try:
+        tracker.resume()
+        kept = namespace["allocate"]()
+        info = tracker.stop()
+        assert info is not None
+        assert get_user_diffs(info)
+
+        # As if done while stopped, e.g. by a __repr__ called by the UI
+        kept.extend(namespace["allocate"]())
+        tracker.resume()
+        info = tracker.stop()
+    finally:
+        tracker.disable()
+
+    assert info is not None
+    assert not get_user_diffs(info)
+    assert len(kept) == 2000
+
+
+def test_format_size():
+    assert format_size(12) == "12 B"
+    assert format_size(2048, signed=True) == "+2.0 KiB"
+    assert format_size(-3 * 1024**2, signed=True) == "-3.0 MiB"
+    assert format_size(5 * 1024**3) == "5.0 GiB"
+
+
+def test_deep_size():
+    class Node:
+        def __init__(self, payload):
+            self.payload = payload
+            self.next = self
+
+    payload = "x" * 10000
+    node = Node(payload)
+    size = get_deep_size(node)
+    assert size.complete
+    assert sys.getsizeof(payload) < size.nbytes < 2 * sys.getsizeof(payload)
+
+    # Shared objects count once
+    assert get_deep_size([payload, payload]).nbytes \
+            < get_deep_size([payload, "y" * 10000]).nbytes
+
+    size = get_deep_size([[i] for i in range(1000)], max_objects=100)
+    assert not size.complete
+    assert size.format().startswith(">")
+
+
+def test_heap_histogram():
+    class Leaky:
+        pass
+
+    before = take_heap_histogram()
+    assert before.complete
+    assert Leaky not in before.stats
+
+    leaked = [Leaky() for _ in range(50)]
+    after = take_heap_histogram()
+    assert after.stats[Leaky].count == 50
+    assert after.stats[Leaky].nbytes >= 50 * sys.getsizeof(leaked[0])
+
+    row, = [row for row in after.get_rows(before) if row.cls is Leaky]
+    assert row.count_delta == 50
+    assert row.nbytes_delta == row.nbytes
+
+    rows = after.get_rows()
+    assert rows[0].count_delta is None
+    assert [row.nbytes for row in rows] == sorted(
+            (row.nbytes for row in rows), reverse=True)
+
+    found = find_instances(Leaky, max_count=10)
+    assert len(found) == 10
+    assert all(obj in leaked for obj in found)
+
+    del leaked, found, row
+    row, = [row for row in take_heap_histogram().get_rows(after)
+            if row.cls is Leaky]
+    assert row.count == 0
+    assert row.count_delta == -50
+
+
+def test_walk_references():
+    from types import SimpleNamespace
+
+    from pudb.var_view import VariableWidget
+
+    target = SimpleNamespace()
+    holder = SimpleNamespace(target=target)
+    registry = {"target": target}
+    expected_ids = {id(vars(holder)), id(registry)}
+
+    # The debugger's own references are left out.
+    widget = VariableWidget(None, "target", "namespace", "target")
+    widget.value = target
+    size_cache = DeepSizeCache()
+    size_cache.get(target)
+
+    graph = walk_references(target, "referrers")
+    assert graph.complete
+    referrers = graph.get_neighbors(target)
+    assert referrers is not None
+    assert {id(obj) for obj in referrers} == expected_ids
+
+    assert describe_reference(holder, vars(holder)) == ".__dict__"
+    assert describe_reference(registry, target) == "['target']"
+    assert describe_reference(target, SimpleNamespace) == ".__class__"
+
+    graph = walk_references(holder, "referents")
+    referents = graph.get_neighbors(vars(holder))
+    assert referents is not None
+    assert id(target) in {id(obj) for obj in referents}
+
+    graph = walk_references(target, "referrers", max_objects=2)
+    assert not graph.complete
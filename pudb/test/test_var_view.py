@@ -2,17 +2,33 @@ import contextlib
 import itertools
 import string
 import unittest
+from typing import ClassVar
 
 from pudb.var_view import (
+    SEPARATOR,
     STRINGIFIERS,
     BasicValueWalker,
     FrameVarInfo,
+    FrameVarInfoKeeper,
     InspectInfo,
     PudbCollection,
     PudbMapping,
     PudbSequence,
+    StringifierCache,
     ValueWalker,
+    VariableWidget,
+    VarSearch,
+    VarSearchIndex,
+    VarViewCache,
+    VarViewWalker,
+    WatchExpression,
+    export_value,
     get_stringifier,
+    get_type_attributes,
+    iter_var_view,
+    make_var_view,
+    reveal_search_entry,
+    stringifier_budget,
     ui_log,
 )
 
@@ -53,6 +69,968 @@ def test_get_stringifier():
             assert isinstance(s, str)
 
 
+def test_make_var_view_reuses_unchanged_widgets():
+    fvi = FrameVarInfo()
+    cache = VarViewCache()
+
+    def widgets_by_label(widgets):
+        return {w.var_label: w for w in widgets}
+
+    local_vars = {"a": 1, "s": "some string", "lst": [1, 2]}
+    first = widgets_by_label(make_var_view(fvi, local_vars, {}, cache=cache))
+
+    local_vars["a"] = 2
+    local_vars["lst"].append(3)
+    second = widgets_by_label(make_var_view(fvi, local_vars, {}, cache=cache))
+
+    assert second["s"] is first["s"]
+    assert second["a"] is not first["a"]
+    assert second["a"].value_str == "2"
+    # Mutable values are re-stringified even if they are the same object.
+    assert second["lst"].value_str == "list (3)"
+
+    # Changing inspection state invalidates the cache.
+    fvi.get_inspect_info("s", read_only=False).display_type = "type"
+    third = widgets_by_label(make_var_view(fvi, local_vars, {}, cache=cache))
+    assert third["s"].value_str == "str"
+
+
+def test_make_var_view_reuses_unchanged_expanded_widgets(monkeypatch):
+    import pudb.var_view
+    from pudb.var_view import stringifier_cache
+
+    calls = []
+    get_stringifier = pudb.var_view.get_stringifier
+
+    def counting_get_stringifier(iinfo):
+        stringifier = get_stringifier(iinfo)
+
+        def counting_stringifier(value):
+            calls.append(value)
+            return stringifier(value)
+
+        return counting_stringifier
+
+    monkeypatch.setattr(pudb.var_view, "get_stringifier",
+            counting_get_stringifier)
+
+    fvi = FrameVarInfo()
+    cache = VarViewCache()
+    for var in ["d", "nested"]:
+        fvi.get_inspect_info(var, read_only=False).show_detail = True
+    d = {"a": 1, "b": "two"}
+    nested = {"lst": [1]}
+    local_vars = {"d": d, "nested": nested}
+
+    def stop():
+        # As on resuming the debuggee
+        cache.release_values()
+        stringifier_cache.invalidate_unversioned()
+        calls.clear()
+        return [(w.var_label, w.value_str)
+                for w in make_var_view(fvi, local_vars, {}, cache=cache)]
+
+    first = stop()
+    assert set(cache.entries) == {"d"}
+
+    # Nothing in the unchanged dict is stringified again.
+    assert stop() == first
+    assert not any(value is d for value in calls)
+    assert any(value is nested for value in calls)
+
+    d["a"] = 3
+    rows = stop()
+    assert ("['a']", "3") in rows
+    assert any(value is d for value in calls)
+
+
+def test_var_view_cache_releases_values():
+    import gc
+    import weakref
+
+    fvi = FrameVarInfo()
+    cache = VarViewCache()
+    obj = A()
+    obj_ref = weakref.ref(obj)
+    fvi.get_inspect_info("obj", read_only=False).display_type = "type"
+    local_vars = {"obj": obj, "s": "short", "big": "x" * 10000, "lst": [1]}
+
+    widgets = {w.var_label: w
+            for w in make_var_view(fvi, local_vars, {}, cache=cache)}
+    assert set(cache.entries) == {"obj", "s", "big"}
+
+    # While the debuggee runs
+    cache.release_values()
+    assert all(widgets[var].value is VariableWidget.NO_VALUE
+            for var in ["obj", "s", "big"])
+    assert set(cache.entries) == {"obj", "s"}
+
+    # Reused widgets get their values back.
+    reused = {w.var_label: w
+            for w in make_var_view(fvi, local_vars, {}, cache=cache)}
+    assert reused["obj"] is widgets["obj"]
+    assert reused["obj"].value is obj
+    assert reused["s"].value == "short"
+
+    cache.release_values()
+    del obj, local_vars["obj"], widgets, reused
+    gc.collect()
+    assert obj_ref() is None
+
+    # A dead reference does not match a variable that is now None.
+    local_vars["obj"] = None
+    widget, = [w for w in make_var_view(fvi, local_vars, {}, cache=cache)
+            if w.var_label == "obj"]
+    assert widget.value_str == "NoneType"
+
+
+def test_make_var_view_highlights_changes():
+    fvi = FrameVarInfo()
+    cache = VarViewCache()
+
+    def changed_labels(local_vars, stop_serial):
+        return {w.var_label
+                for w in make_var_view(fvi, local_vars, {}, cache=cache,
+                    stop_serial=stop_serial)
+                if w.attr_prefix == "changed var"}
+
+    lst = [1, 2]
+    local_vars = {"a": 1, "s": "unchanged", "lst": lst}
+    assert changed_labels(local_vars, 0) == set()
+
+    local_vars["a"] = 2
+    lst.append(3)
+    local_vars["new"] = None
+    assert changed_labels(local_vars, 1) == {"a", "lst", "new"}
+
+    # Repeated updates within a stop compare against the previous stop.
+    assert changed_labels(local_vars, 1) == {"a", "lst", "new"}
+    assert changed_labels(local_vars, 2) == set()
+
+    # Not tracking changes
+    local_vars["a"] = 3
+    assert changed_labels(local_vars, None) == set()
+
+
+def test_make_var_view_highlights_nested_changes():
+    from pudb.var_view import stringifier_cache
+
+    class Job:
+        def __init__(self):
+            self.items = []
+
+        def __repr__(self):
+            return f"Job({self.items!r})"
+
+    fvi = FrameVarInfo()
+    fvi.get_inspect_info("job", read_only=False).display_type = "repr"
+    job = Job()
+    local_vars = {"job": job}
+
+    def get_job_widget(stop_serial):
+        widget, = make_var_view(fvi, local_vars, {}, stop_serial=stop_serial)
+        return widget
+
+    assert get_job_widget(0).attr_prefix != "changed var"
+
+    # As on resuming the debuggee
+    stringifier_cache.invalidate_unversioned()
+    job.items.append(1)
+    widget = get_job_widget(1)
+    assert widget.value_str == "Job([1])"
+    assert widget.attr_prefix == "changed var"
+
+
+def test_repeated_at_top():
+    fvi = FrameVarInfo()
+    fvi.get_inspect_info("d", read_only=False).show_detail = True
+    iinfo = fvi.get_inspect_info("d['a']", read_only=False)
+    iinfo.show_detail = True
+    iinfo.repeated_at_top = True
+
+    widgets = make_var_view(
+            fvi, {"d": {"a": [1, 2], "b": 3}, "e": [4]}, {})
+    top = widgets[:widgets.index(SEPARATOR)]
+    assert [w.id_path for w in top] == ["d['a']", "d['a'][0]", "d['a'][1]"]
+
+
+def test_repeated_at_top_in_sections():
+    fvi = FrameVarInfo()
+    local_vars = {"x": 1, "cell": [5, 6]}
+    global_vars = {"g": {"k": "v"}, "h": 2}
+
+    def get_top(**kwargs):
+        widgets = list(iter_var_view(fvi, local_vars, global_vars,
+                closure_names=("cell",), **kwargs))
+        if SEPARATOR not in widgets:
+            return []
+        return [w.id_path for w in widgets[:widgets.index(SEPARATOR)]]
+
+    assert get_top() == []
+
+    # Repeated globals are found while their section is collapsed.
+    fvi.get_inspect_info("<globals>.g", read_only=False) \
+            .repeated_at_top = True
+    fvi.get_inspect_info("<globals>.g", read_only=False).show_detail = True
+    assert get_top() == ["<globals>.g", "<globals>.g['k']"]
+
+    fvi.get_inspect_info("cell", read_only=False).repeated_at_top = True
+    assert get_top() == ["cell", "<globals>.g", "<globals>.g['k']"]
+
+    # Repeating a section header repeats the section.
+    fvi.get_inspect_info("<globals>.g", read_only=False) \
+            .repeated_at_top = False
+    fvi.get_inspect_info("cell", read_only=False).repeated_at_top = False
+    iinfo = fvi.get_inspect_info("<closure>", read_only=False)
+    iinfo.repeated_at_top = True
+    assert get_top() == ["<closure>", "cell"]
+
+
+def test_inspect_info_defaults():
+    from pudb.debugger import CONFIG
+
+    iinfo = InspectInfo()
+    assert not hasattr(iinfo, "__dict__")
+    assert iinfo.show_detail is False
+    assert iinfo.page_start == 0
+
+    old_stringifier = CONFIG["stringifier"]
+    try:
+        CONFIG["stringifier"] = "repr"
+        assert iinfo.display_type == "repr"
+        iinfo.display_type = "str"
+        CONFIG["stringifier"] = "type"
+        assert iinfo.display_type == "str"
+    finally:
+        CONFIG["stringifier"] = old_stringifier
+
+
+def test_frame_var_info_keeper_persistence(monkeypatch, tmp_path):
+    from pudb import settings
+    from pudb.debugger import CONFIG
+
+    monkeypatch.setattr(settings, "get_save_config_path", lambda: str(tmp_path))
+    monkeypatch.setitem(CONFIG, "persist_var_view_state", True)
+
+    keeper = FrameVarInfoKeeper()
+    keeper.MAX_FRAME_VAR_INFOS = 2
+    keys = [("file.py", f"f{i}", i) for i in range(3)]
+    for key in keys:
+        fvi = keeper.get_frame_var_info(read_only=False, ssid=key)
+        iinfo = fvi.get_inspect_info("x", read_only=False)
+        iinfo.show_detail = True
+        iinfo.ignore_time_budget = True
+        fvi.watches.append(WatchExpression(f"y + {key[2]}"))
+    keeper.get_frame_var_info(read_only=False, ssid=keys[1]) \
+            .get_inspect_info("z", read_only=False).show_detail = False
+
+    assert list(keeper.frame_var_info) == [keys[2], keys[1]]
+    keeper.save_var_view_state()
+
+    keeper = FrameVarInfoKeeper()
+    for key in keys:
+        fvi = keeper.get_frame_var_info(read_only=True, ssid=key)
+        iinfo = fvi.get_inspect_info("x", read_only=True)
+        assert iinfo.show_detail
+        assert not iinfo.ignore_time_budget
+        assert fvi.watches == [WatchExpression(f"y + {key[2]}")]
+        assert "z" not in fvi.id_path_to_iinfo
+
+    assert not keeper.get_frame_var_info(read_only=True, ssid=("file.py", "g", 0)) \
+            .id_path_to_iinfo
+
+
+def test_watch_evaluation(monkeypatch):
+    import time
+
+    from pudb.debugger import CONFIG
+
+    monkeypatch.setitem(CONFIG, "watch_budget_ms", 1)
+
+    calls = []
+
+    def slow(x):
+        calls.append(x)
+        time.sleep(0.005)
+        return x
+
+    fvi = FrameVarInfo()
+    fvi.watches = [
+            WatchExpression("slow('a')"),
+            WatchExpression("slow('b')", pinned=True),
+            WatchExpression("1 +"),
+            ]
+    local_vars = {"slow": slow}
+
+    def watch_values():
+        return {w.var_label: w.value_str
+                for w in iter_var_view(fvi, local_vars, {})
+                if isinstance(w, VariableWidget) and w.watch_expr is not None}
+
+    # Only pinned watches are evaluated before their rows are requested.
+    rows = iter_var_view(fvi, local_vars, {})
+    assert calls == ["b"]
+    list(rows)
+    assert calls == ["b", "a"]
+    assert fvi.watches[0].code is fvi.watches[0].code
+
+    calls.clear()
+    values = watch_values()
+    assert calls == ["b"]
+    assert values["slow('a')"].startswith("'a' (slow: >1ms, from ")
+    assert values["slow('b')"] == "'b'"
+    assert values["1 +"] == "<error>"
+
+    calls.clear()
+    fvi.watch_states["slow('a')"].force_evaluation = True
+    assert watch_values()["slow('a')"] == "'a'"
+    assert calls == ["b", "a"]
+
+
+def test_watch_shows_last_value_on_error():
+    fvi = FrameVarInfo()
+    fvi.watches.append(WatchExpression("x"))
+
+    def watch_value(local_vars):
+        widget, = (w for w in make_var_view(fvi, local_vars, {})
+            if isinstance(w, VariableWidget) and w.watch_expr is not None)
+        return widget.value_str
+
+    assert watch_value({}) == "<error>"
+    assert watch_value({"x": 1}) == "1"
+    assert watch_value({}).startswith("1 (<error> now, from ")
+
+    fvi.watches.clear()
+    make_var_view(fvi, {}, {})
+    assert not fvi.watch_states
+
+
+def test_deferred_watches():
+    import urwid
+
+    calls = []
+
+    def watched(i):
+        calls.append(i)
+        return i
+
+    fvi = FrameVarInfo()
+    fvi.watches = [WatchExpression(f"watched({i})") for i in range(20)]
+    fvi.watches.append(WatchExpression("watched(-1)", pinned=True))
+    local_vars = {"watched": watched}
+    local_vars.update((f"v{i:02}", i) for i in range(20))
+
+    walker = VarViewWalker()
+    walker.set_rows(iter_var_view(fvi, local_vars, {}, defer_watches=True))
+    assert calls == [-1]
+
+    # Watches above the shown rows are not evaluated...
+    walker.set_focus(35)
+    listbox = urwid.ListBox(walker)
+    listbox.render((30, 5), focus=True)
+    assert calls == [-1]
+
+    # ...until they are scrolled into view.
+    while listbox.focus_position > 18:
+        listbox.keypress((30, 5), "up")
+        listbox.render((30, 5), focus=True)
+    assert calls == [-1, 19, 18]
+    assert walker.rows[19].value_str == "19"
+
+
+def test_variable_sizes(monkeypatch):
+    from pudb.debugger import CONFIG
+
+    monkeypatch.setitem(CONFIG, "show_variable_sizes", True)
+    monkeypatch.setitem(CONFIG, "sort_variables_by_size", True)
+
+    widgets = make_var_view(FrameVarInfo(),
+            {"a": 1, "b": list(range(1000)), "c": "c"}, {})
+    assert [w.var_label for w in widgets] == ["b", "c", "a"]
+    assert widgets[0].size_str.endswith("KiB")
+
+    canvas = widgets[0].render((40,))
+    assert canvas.cols() == 40
+    assert next(iter(canvas.text)).rstrip().endswith(b"KiB")
+
+    # Out of time for computing sizes, only those already known are sorted.
+    import pudb.var_view
+    from pudb.tracing import deep_size_cache
+
+    monkeypatch.setattr(pudb.var_view, "SIZE_SORT_TIME_LIMIT_NS", 0)
+    local_vars = {"a": 1, "b": list(range(1000)), "c": "c", "d": [0] * 10}
+    deep_size_cache.clear()
+    deep_size_cache.get(local_vars["d"])
+    widgets = make_var_view(FrameVarInfo(), local_vars, {})
+    assert [w.var_label for w in widgets] == ["d", "a", "b", "c"]
+    deep_size_cache.clear()
+
+    # Once the time for sizes at this stop is used up, they are not shown.
+    import pudb.tracing
+
+    monkeypatch.setitem(CONFIG, "sort_variables_by_size", False)
+    monkeypatch.setattr(pudb.tracing, "DEEP_SIZE_STOP_BUDGET_NS", 0)
+    widgets = make_var_view(FrameVarInfo(), local_vars, {})
+    assert widgets[0].size_str != "?"
+    assert [w.size_str for w in widgets[1:]] == ["?", "?", "?"]
+    deep_size_cache.clear()
+
+
+def test_inspected_objects():
+    fvi = FrameVarInfo()
+    fvi.watches = [WatchExpression("x + 1")]
+    rows = list(iter_var_view(fvi, {"x": 1}, {},
+            inspected={"list@0x1": [1, 2]}))
+    labels = [w.var_label if isinstance(w, VariableWidget) else None
+            for w in rows]
+    assert labels == ["x + 1", None, "list@0x1", None, "x"]
+    assert rows[2].parent is None
+    assert rows[2].id_path == "list@0x1"
+
+
+def test_globals_and_closure_sections(monkeypatch):
+    import os
+
+    from pudb.debugger import CONFIG
+
+    monkeypatch.setitem(CONFIG, "default_variables_access_level", "public")
+    monkeypatch.setitem(CONFIG, "container_page_size", 2)
+    monkeypatch.setitem(CONFIG, "stringifier", "repr")
+
+    class Tracked:
+        stringified = False
+
+        def __repr__(self):
+            Tracked.stringified = True
+            return "Tracked()"
+
+    global_vars = {
+            "b": 2, "a": 1, "_private": 3, "os": os, "A": A, "f": len,
+            "c": Tracked()}
+    local_vars = {"x": 1, "cell": [1]}
+
+    def get_rows(fvi):
+        return [(w.nesting_level, w.var_label)
+                for w in make_var_view(fvi, local_vars, global_vars)]
+
+    # Closure variables are shown in their own section, the globals are
+    # not enumerated while collapsed.
+    fvi = FrameVarInfo()
+    widgets = list(iter_var_view(fvi, local_vars, global_vars,
+            closure_names=("cell", "missing")))
+    assert [(w.nesting_level, w.var_label) for w in widgets] == [
+            (0, "x"), (0, "Closure"), (1, "cell"), (0, "Globals")]
+    assert widgets[2].id_path == "cell"
+    assert widgets[3].value_str == "<7 names, expand to see>"
+    assert not Tracked.stringified
+
+    fvi.get_inspect_info("<globals>", read_only=False).show_detail = True
+    assert get_rows(fvi) == [
+            (0, "cell"), (0, "x"), (0, "Globals"),
+            (1, "a"), (1, "b"), (1, "[...]")]
+
+    fvi.get_inspect_info("<globals>.cont-2", read_only=False) \
+            .show_detail = True
+    assert get_rows(fvi)[3:] == [(1, "a"), (1, "b"), (1, "c")]
+    assert Tracked.stringified
+
+    # Modules, classes and functions are shown along with methods
+    monkeypatch.setitem(CONFIG, "container_page_size", 10)
+    iinfo = fvi.get_inspect_info("<globals>", read_only=False)
+    iinfo.show_methods = True
+    iinfo.access_level = "private"
+    assert [label for _, label in get_rows(fvi)[3:]] == [
+            "_private", "a", "A", "b", "c", "f", "os"]
+
+    # At module level, the locals are the globals.
+    assert [w.var_label for w in make_var_view(fvi, local_vars, local_vars)] \
+            == ["cell", "x"]
+
+
+def test_var_search(monkeypatch):
+    from time import perf_counter_ns
+
+    from pudb.debugger import CONFIG
+
+    monkeypatch.setitem(CONFIG, "container_page_size", 10)
+
+    user = A()
+    user.user_id = 7
+    user._token = "secret-token"
+    local_vars = {"config": {"users": [A() for _ in range(20)] + [user]}}
+
+    fvi = FrameVarInfo()
+    index = VarSearchIndex(fvi, local_vars)
+    assert index.complete
+
+    search = VarSearch(index, "user_id")
+    entry, = [index.entries[i] for i in search.matches]
+    assert entry.get_path_label() == "config['users'][20].user_id"
+    assert search.matches == [index.entries.index(entry)]
+
+    # Values are only matched as they are stringified.
+    search = VarSearch(index, "secret")
+    assert search.matches == []
+    assert search.update(perf_counter_ns() + 10**9)
+    assert search.is_complete()
+    entry, = [index.entries[i] for i in search.matches]
+    assert entry.id_path == "config['users'][20]._token"
+
+    reveal_search_entry(fvi, entry)
+    assert fvi.get_inspect_info("config", read_only=True).show_detail
+    users_iinfo = fvi.get_inspect_info("config['users']", read_only=True)
+    assert users_iinfo.page_start == 20
+    assert fvi.get_inspect_info("config['users'][20]",
+            read_only=True).access_level == "private"
+    assert entry.id_path in [w.id_path for w in make_var_view(fvi, local_vars, {})]
+
+    index = VarSearchIndex(fvi, local_vars, max_entries=5)
+    assert not index.complete
+    assert len(index.entries) == 5
+
+
+def test_var_search_sections(monkeypatch):
+    from time import perf_counter_ns
+
+    from pudb.debugger import CONFIG
+
+    monkeypatch.setitem(CONFIG, "container_page_size", 2)
+    monkeypatch.setitem(CONFIG, "default_variables_access_level", "public")
+    monkeypatch.setitem(CONFIG, "stringifier_value_budget_ms", 1)
+    monkeypatch.setitem(CONFIG, "stringifier_stop_budget_ms", 0)
+
+    local_vars = {"x": 1, "cell": {"inner_key": 2}}
+    global_vars = {"a": 1, "b": 2, "c": 3, "_target": 4, "slow": SlowRepr(),
+            "__name__": "mod"}
+
+    fvi = FrameVarInfo()
+    fvi.get_inspect_info("<globals>.slow", read_only=False).display_type = "repr"
+    index = VarSearchIndex(fvi, local_vars, global_vars, ("cell",))
+    assert [entry.id_path for entry in index.entries] == [
+            "x", "cell", "<globals>._target", "<globals>.a", "<globals>.b",
+            "<globals>.c", "<globals>.slow", "cell['inner_key']"]
+
+    # Slow values are subject to the time budget, as in the view.
+    stringifier_budget.reset()
+    try:
+        index.stringify_values(perf_counter_ns() + 10**9)
+    finally:
+        stringifier_budget.reset()
+    assert index.value_strs[6] == "SlowRepr (slow: >1ms)"
+    assert fvi.get_inspect_info("<globals>.slow",
+            read_only=True).display_type == "type"
+
+    entry, = [index.entries[i] for i in VarSearch(index, "inner_key").matches]
+    fvi.get_inspect_info("<closure>", read_only=False).show_detail = False
+    reveal_search_entry(fvi, entry)
+
+    entry, = [index.entries[i] for i in VarSearch(index, "_target").matches]
+    reveal_search_entry(fvi, entry)
+    assert fvi.get_inspect_info("<globals>", read_only=True) \
+            .access_level == "private"
+
+    def get_shown():
+        return [w.id_path for w in iter_var_view(
+                fvi, local_vars, global_vars, closure_names=("cell",))]
+
+    shown = get_shown()
+    assert "cell['inner_key']" in shown
+    assert "<globals>._target" in shown
+
+    # Beyond the first page
+    entry, = [index.entries[i] for i in VarSearch(index, "slow").matches]
+    reveal_search_entry(fvi, entry)
+    assert "<globals>.slow" in get_shown()
+
+
+def test_large_str_cut_short():
+    from pudb.var_view import LARGE_STR_LENGTH, LARGE_STR_SHOWN_LENGTH
+
+    walker = BasicValueWalker(FrameVarInfo())
+    large_str = "x" * (LARGE_STR_LENGTH + 1)
+    walker.walk_value(None, "large_str", large_str)
+    walker.walk_value(None, "small_str", "x" * LARGE_STR_LENGTH)
+    large_widget, small_widget = walker.widget_list
+
+    assert large_widget.value_str == (
+            repr("x" * LARGE_STR_SHOWN_LENGTH)
+            + f"... ({LARGE_STR_LENGTH + 1} characters)")
+    assert small_widget.value_str == repr("x" * LARGE_STR_LENGTH)
+
+
+def test_export_value(tmp_path):
+    import json
+    import math
+    from types import SimpleNamespace
+
+    node = SimpleNamespace(name="root", values=[1, 2.5, None, True, "\u00e9"])
+    node.parent = node
+    value = {"node": node, 3: (math.inf, b"raw", {"x"})}
+
+    path = tmp_path / "value.json"
+    exporter = export_value(value, str(path), indent=2)
+    text = path.read_text()
+    assert exporter.nbytes == len(text) - 1
+    assert not exporter.truncated
+    assert json.loads(text) == {
+            "node": {
+                "__type__": "types.SimpleNamespace",
+                "name": "root",
+                "values": [1, 2.5, None, True, "\u00e9"],
+                "parent": repr(node),
+                },
+            "3": ["inf", "b'raw'", ["x"]],
+            }
+
+    exporter = export_value(list(range(100)), str(path), max_values=11)
+    assert json.loads(path.read_text()) == [*range(10), "..."]
+    assert exporter.truncated == {"values"}
+
+    exporter = export_value({"a": [[1]]}, str(path), max_depth=2)
+    assert json.loads(path.read_text()) == {"a": ["[1]"]}
+    assert exporter.truncated == {"depth"}
+
+    exporter = export_value(["x" * 1000, "y"], str(path), max_bytes=100)
+    data = json.loads(path.read_text())
+    assert data[-1] == "..."
+    assert len(data[0]) < 1000
+    assert exporter.truncated == {"bytes"}
+
+    # The limit applies to the escaped text.
+    exporter = export_value(["\u00e9" * 1000, "\U0001f600" * 10], str(path),
+            max_bytes=100)
+    text = path.read_text()
+    assert len(text) <= 100 + 20
+    data = json.loads(text)
+    assert data[0] == "\u00e9" * 16 + "..."
+    assert exporter.truncated == {"bytes"}
+
+    export_value({"a": 1, "b": [2]}, str(path), lines=True)
+    assert [json.loads(line) for line in path.read_text().splitlines()] \
+            == [{"a": 1}, {"b": [2]}]
+
+
+def test_container_paging():
+    class CountingSequence:
+        def __init__(self, n):
+            self.items = list(range(n))
+            self.accessed = 0
+
+        def __len__(self):
+            return len(self.items)
+
+        def __iter__(self):
+            for item in self.items:
+                self.accessed += 1
+                yield item
+
+        def __getitem__(self, index):
+            result = self.items[index]
+            self.accessed += len(result) if isinstance(index, slice) else 1
+            return result
+
+    seq = CountingSequence(1000)
+    mapping = {f"k{i}": i for i in range(1000)}
+
+    fvi = FrameVarInfo()
+    for name in ["seq", "mapping"]:
+        iinfo = fvi.get_inspect_info(name, read_only=False)
+        iinfo.show_detail = True
+        iinfo.page_start = 900
+        iinfo.access_level = "private"
+
+    widgets = make_var_view(fvi, {"seq": seq, "mapping": mapping}, {})
+    labels = [w.var_label for w in widgets]
+
+    seq_index = labels.index("seq")
+    assert labels[seq_index+1:seq_index+13] == [
+            "[...]", *[f"[{i}]" for i in range(900, 910)], "[...]"]
+    assert seq.accessed < 200
+
+    mapping_index = labels.index("mapping")
+    assert labels[mapping_index+1:mapping_index+4] == [
+            "[...]", "['k900']", "['k901']"]
+
+
+def test_attributes_from_type_schema():
+    import dataclasses
+    from collections import namedtuple
+
+    evaluated = []
+
+    @dataclasses.dataclass
+    class Model:
+        x: int
+        y: int = 0
+        kind: ClassVar[str] = "class attribute"
+
+        @property
+        def expensive(self):
+            evaluated.append(self)
+            return 42
+
+        def method(self):
+            pass
+
+    class Slotted:
+        __slots__ = ("a", "b")
+
+        def __init__(self):
+            self.a = 1
+
+    Point = namedtuple("Point", "px py")
+
+    fvi = FrameVarInfo()
+    local_vars = {"m": Model(1), "s": Slotted(), "p": Point(1, 2)}
+    for name in local_vars:
+        iinfo = fvi.get_inspect_info(name, read_only=False)
+        iinfo.show_detail = True
+        iinfo.access_level = "private"
+
+    def attrs(name):
+        widgets = make_var_view(fvi, local_vars, {})
+        start = next(i for i, w in enumerate(widgets) if w.var_label == name)
+        return {w.var_label: w.value_str
+                for w in widgets[start+1:]
+                if w.var_label.startswith(".") and w.parent is widgets[start]}
+
+    assert attrs("m") == {
+            ".x": "1", ".y": "0",
+            ".expensive": "<property, press enter to evaluate>"}
+    assert attrs("s") == {".a": "1", ".b": "<error>"}
+    assert attrs("p") == {".px": "1", ".py": "2"}
+    assert not evaluated
+
+    # Evaluating a property does not expand its value.
+    fvi.get_inspect_info("m.expensive", read_only=False) \
+            .evaluate_property = True
+    assert attrs("m")[".expensive"] == "42"
+    assert evaluated
+
+    fvi.get_inspect_info("m.expensive", read_only=False).show_detail = True
+    assert attrs("m")[".expensive"] == "42 [pub]"
+    fvi.get_inspect_info("m.expensive", read_only=False).show_detail = False
+    assert attrs("m")[".expensive"] == "42"
+
+    # Listings are cached per type, but follow changes to the class once
+    # the debuggee has run.
+    from pudb.var_view import type_attributes_cache
+
+    assert get_type_attributes(Model) is get_type_attributes(Model)
+    Model.other = property(lambda self: 0)
+    assert "other" not in get_type_attributes(Model).names
+    type_attributes_cache.forget_checks()
+    assert "other" in get_type_attributes(Model).names
+    assert get_type_attributes(Model).kinds["method"] == "routine"
+    Model.method = property(lambda self: 0)
+    type_attributes_cache.forget_checks()
+    assert get_type_attributes(Model).kinds["method"] == "property"
+
+
+def test_var_view_walker_is_lazy():
+    import urwid
+
+    produced = []
+
+    def rows():
+        for i in range(1000):
+            produced.append(i)
+            yield urwid.Text(str(i))
+
+    walker = VarViewWalker()
+    walker.set_rows(rows())
+    urwid.ListBox(walker).render((20, 5))
+    assert len(produced) < 20
+
+    assert walker.index(walker[3]) == 3
+    assert next(iter(walker.positions(reverse=True))) == 999
+    assert len(produced) == 1000
+
+
+def test_variable_widget_caches_canvas():
+    widget = VariableWidget(None, "x", "1" * 30, "x")
+    widget.wrap = True
+    canvas = widget.render((20,))
+    assert widget.rows((20,)) == 2
+    assert widget.render((20,)) is canvas
+    assert widget.render((20,), focus=True) is not canvas
+    assert widget.render((30,)) is not canvas
+
+    widget.value_str = "2"
+    new_canvas = widget.render((20,))
+    assert new_canvas is not canvas
+    assert widget.rows((20,)) == 1
+    assert list(new_canvas.text) == [b"x: 2" + b" " * 16]
+
+
+def test_stringifier_cache():
+    import weakref
+
+    class Unversioned:
+        __slots__ = ("__weakref__",)
+
+    class Versioned:
+        pudb_mutation_count = 0
+
+    cache = StringifierCache()
+    unversioned = Unversioned()
+    versioned = Versioned()
+    plain = A()
+    lst = [1, 2]
+    immutables = ["x" * 100, (1, "a", None), 12345678]
+
+    for value in [unversioned, versioned, plain, lst, *immutables]:
+        assert cache.get(value, "repr") is None
+        cache.put(value, "repr", repr(value))
+        assert cache.get(value, "repr") == repr(value)
+        assert cache.get(value, "str") is None
+
+    lst.append(3)
+    assert cache.get(lst, "repr") is None
+    cache.put(lst, "repr", repr(lst))
+
+    # Once the debuggee has run, the results are only kept for immutable
+    # values and objects with a mutation count, which are only weakly
+    # referenced from then on.
+    assert weakref.getweakrefcount(versioned) == 0
+    cache.invalidate_unversioned()
+    assert weakref.getweakrefcount(versioned) == 1
+    assert cache.get(unversioned, "repr") is None
+    assert cache.get(lst, "repr") is None
+    assert cache.get(plain, "repr") is None
+    assert cache.get(versioned, "repr") == repr(versioned)
+    for value in immutables:
+        assert cache.get(value, "repr") == repr(value)
+
+    versioned.pudb_mutation_count += 1
+    assert cache.get(versioned, "repr") is None
+
+    # Nested changes, or ones that keep the length, are not missed.
+    job = A()
+    job.items = []
+    numbers = {1}
+    for value in [job, numbers]:
+        cache.put(value, "repr", repr(value))
+    cache.invalidate_unversioned()
+    job.items.append(1)
+    numbers.clear()
+    numbers.add(2)
+    assert cache.get(job, "repr") is None
+    assert cache.get(numbers, "repr") is None
+
+    # Dropped once the objects are gone
+    versioned.pudb_mutation_count -= 1
+    cache.put(versioned, "repr", repr(versioned))
+    cache.invalidate_unversioned()
+    del versioned
+    cache.invalidate_unversioned()
+    assert len(cache.entries) == len(immutables)
+
+    # Immutable values are held on to, so large ones are not cached.
+    large = "x" * 10**7
+    cache.put(large, "repr", "'xxx...'")
+    assert cache.get(large, "repr") is None
+
+
+def test_stringifier_cache_size_bound():
+    from pudb.debugger import CONFIG
+
+    cache = StringifierCache()
+    values = [A() for _ in range(100)]
+    prev_cache_kb = CONFIG["stringifier_cache_kb"]
+    CONFIG["stringifier_cache_kb"] = 10
+    try:
+        for value in values:
+            cache.put(value, "repr", "x" * 1000)
+    finally:
+        CONFIG["stringifier_cache_kb"] = prev_cache_kb
+
+    assert 0 < cache.total_size <= 10 * 1024
+    assert len(cache.entries) < len(values)
+    # Least recently used entries are evicted first.
+    assert cache.get(values[0], "repr") is None
+    assert cache.get(values[-1], "repr") is not None
+
+
+def test_var_view_walker_produces_rows_in_batches():
+    import urwid
+
+    def rows():
+        for i in range(100):
+            yield urwid.Text(str(i))
+
+    walker = VarViewWalker()
+    walker.set_rows(rows())
+    walker.set_focus(2)
+
+    # Keeps the focus position across updates
+    walker.set_rows(rows())
+    assert walker.get_focus()[1] == 2
+
+    # Past the deadline, rows after the focus are stood in for.
+    walker.set_deadline(0)
+    try:
+        canvas = urwid.ListBox(walker).render((20, 10), focus=True)
+    finally:
+        walker.set_deadline(None)
+    assert b"computing" in b"".join(canvas.text)
+    assert walker.has_pending_rows()
+
+    walker.produce_pending_rows()
+    assert not walker.has_pending_rows()
+    assert len(walker.rows) > 3
+
+    # Replacing the rows drops pending work.
+    walker.set_deadline(0)
+    walker.set_rows(rows())
+    assert walker[0] is walker.PLACEHOLDER
+    assert walker.has_pending_rows()
+    walker.set_rows(rows())
+    walker.set_deadline(None)
+    assert not walker.has_pending_rows()
+
+
+class SlowRepr:
+    def __repr__(self):
+        import time
+        time.sleep(0.005)
+        return "SlowRepr()"
+
+
+def test_stringifier_time_budget():
+    from pudb.debugger import CONFIG
+
+    fvi = FrameVarInfo()
+    fvi.get_inspect_info("slow", read_only=False).display_type = "repr"
+    fvi.get_inspect_info("other", read_only=False).display_type = "repr"
+    local_vars = {"slow": SlowRepr()}
+
+    prev_config = CONFIG.copy()
+    CONFIG.update(stringifier_value_budget_ms=1, stringifier_stop_budget_ms=2)
+    try:
+        stringifier_budget.reset()
+        widget, = make_var_view(fvi, local_vars, {})
+        assert widget.value_str == "SlowRepr (slow: >1ms)"
+
+        iinfo = fvi.get_inspect_info("slow", read_only=True)
+        assert iinfo.display_type == "type"
+        assert iinfo.slow_display_type == "repr"
+
+        # The time for this stop is used up.
+        local_vars = {"other": SlowRepr()}
+        widget, = make_var_view(fvi, local_vars, {})
+        assert widget.value_str == \
+                "SlowRepr (slow: time for this stop used up)"
+
+        fvi.get_inspect_info("other", read_only=False).ignore_time_budget = True
+        widget, = make_var_view(fvi, local_vars, {})
+        assert widget.value_str == "SlowRepr()"
+    finally:
+        CONFIG.clear()
+        CONFIG.update(prev_config)
+        stringifier_budget.reset()
+
+
 class FrameVarInfoForTesting(FrameVarInfo):
     def __init__(self, paths_to_expand=None):
         super().__init__()
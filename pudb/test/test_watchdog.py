@@ -0,0 +1,33 @@
+import signal
+import threading
+import time
+
+import pytest
+
+from pudb import _Watchdog
+
+
+class _Fired(Exception):
+    pass
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="needs SIGUSR1")
+def test_watchdog_fires_once_on_stall():
+    fired_lines = []
+
+    def handler(signum, frame):
+        fired_lines.append(frame.f_lineno)
+        raise _Fired
+
+    old_handler = signal.signal(signal.SIGUSR1, handler)
+    watchdog = _Watchdog(threading.main_thread().ident, signal.SIGUSR1, 0.2)
+    watchdog.start()
+    try:
+        with pytest.raises(_Fired):
+            time.sleep(5)
+    finally:
+        watchdog.stop()
+        watchdog.thread.join()
+        signal.signal(signal.SIGUSR1, old_handler)
+
+    assert len(fired_lines) == 1
@@ -125,6 +125,8 @@ INHERITANCE_MAP = {
     "current breakpoint focused source": "current focused source",
 
     "line number": "source",
+    "hit count": "line number",
+    "unexecuted source": "comment",
     "breakpoint marker": "line number",
     "current line marker": "breakpoint marker",
     # }}}
@@ -153,6 +155,11 @@ INHERITANCE_MAP = {
     "focused highlighted var label": "focused var label",
     "focused highlighted var value": "focused var value",
 
+    "changed var label": "var label",
+    "changed var value": "highlighted",
+    "focused changed var label": "focused var label",
+    "focused changed var value": "focused highlighted var value",
+
     "return label": "var label",
     "return value": "var value",
     "focused return label": "focused var label",
@@ -206,6 +213,14 @@ INHERITANCE_MAP = {
     "command line focused button": "focused button",
     # }}}
 
+    # {{{ pager
+    "pager": "source",
+    "focused pager": "focused source",
+    "pager offset": "line number",
+    "pager match": "highlighted source",
+    "pager status": "header",
+    # }}}
+
     # {{{ Code syntax
     "comment":      "source",
     "keyword":      "source",
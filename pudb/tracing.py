@@ -0,0 +1,1016 @@
+from __future__ import annotations
+
+
+__copyright__ = """
+Copyright (C) 2009-2017 Andreas Kloeckner
+"""
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import sys
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from time import perf_counter_ns, process_time_ns
+from typing import TYPE_CHECKING, Any, Callable, Literal
+
+
+if TYPE_CHECKING:
+    import tracemalloc
+    from collections.abc import Sequence
+    from types import CodeType, FrameType
+
+
+# {{{ line hit counts
+
+class LineHitCounter:
+    """Counts line events per code object between two stops of the debugger.
+
+    Each code object gets a flat array of counters, one per source line
+    spanned by the code object, so that counting a line event amounts to one
+    dictionary lookup and one array increment.
+    """
+
+    code_to_counts: dict[CodeType, tuple[int, array[int]]]
+
+    def __init__(self):
+        self.code_to_counts = {}
+
+    def _make_counts(self, code: CodeType) -> tuple[int, array[int]]:
+        from pudb.lowlevel import generate_executable_lines_for_code
+
+        first_lineno = code.co_firstlineno
+        last_lineno = max(
+                generate_executable_lines_for_code(code), default=first_lineno)
+        nlines = max(last_lineno, first_lineno) - first_lineno + 1
+        return first_lineno, array("L", [0]) * nlines
+
+    def count(self, frame: FrameType) -> None:
+        code = frame.f_code
+        try:
+            first_lineno, counts = self.code_to_counts[code]
+        except KeyError:
+            first_lineno, counts = self.code_to_counts[code] = \
+                    self._make_counts(code)
+
+        idx = frame.f_lineno - first_lineno
+        if idx < 0:
+            return
+        if idx >= len(counts):
+            counts.extend(array("L", [0]) * (idx - len(counts) + 1))
+        counts[idx] += 1
+
+    def uncount(self, frame: FrameType) -> None:
+        try:
+            first_lineno, counts = self.code_to_counts[frame.f_code]
+        except KeyError:
+            return
+
+        idx = frame.f_lineno - first_lineno
+        if 0 <= idx < len(counts) and counts[idx]:
+            counts[idx] -= 1
+
+    def get_file_hit_counts(self,
+                canonic: Callable[[str], str],
+                filename: str) -> dict[int, int]:
+        """
+        :arg canonic: a function turning a code object's file name into the
+            canonical form used by the debugger, e.g. :meth:`bdb.Bdb.canonic`.
+        :returns: a mapping from one-based line numbers in *filename* to the
+            number of times they were reached. Lines that hold code, i.e.
+            that appear in ``co_lines()`` of the counted code objects or of
+            those nested in them, are included with a count of 0 if they
+            were never reached. Other lines, e.g. blank lines and comments,
+            are not included.
+        """
+        from types import CodeType
+
+        from pudb.lowlevel import generate_executable_lines_for_code
+
+        file_codes = [code for code in self.code_to_counts
+                if canonic(code.co_filename) == filename]
+
+        result: dict[int, int] = {}
+        codes = list(file_codes)
+        while codes:
+            code = codes.pop()
+            # The first line of a function or class body's code object, its
+            # "def" or "class" line or first decorator, runs as part of the
+            # enclosing code.
+            first_lineno = (
+                    None if code.co_name == "<module>" else code.co_firstlineno)
+            for lineno in generate_executable_lines_for_code(code):
+                if lineno != first_lineno:
+                    result.setdefault(lineno, 0)
+            codes.extend(const
+                    for const in code.co_consts  # pyright: ignore[reportAny]
+                    if isinstance(const, CodeType))
+
+        for code in file_codes:
+            first_lineno, counts = self.code_to_counts[code]
+            for idx, line_count in enumerate(counts):
+                if line_count:
+                    lineno = first_lineno + idx
+                    result[lineno] = result.get(lineno, 0) + line_count
+
+        return result
+
+# }}}
+
+
+# {{{ call tree recording
+
+class CallEdge:
+    """Call count and inclusive time (in nanoseconds) of one caller/callee
+    pair of code objects.
+
+    Recursive calls are counted with their full time at every level, so
+    inclusive times of recursive functions may add up to more than the
+    wall time spent.
+    """
+
+    __slots__ = ("count", "inclusive_ns")
+
+    def __init__(self):
+        self.count = 0
+        self.inclusive_ns = 0
+
+
+def _get_excluded_path_prefixes() -> tuple[str, ...]:
+    import os
+    import sysconfig
+
+    import urwid
+
+    paths = sysconfig.get_paths()
+    prefixes = {
+            paths[name] for name in ("stdlib", "platstdlib")
+            if name in paths}
+    prefixes.add(os.path.dirname(os.path.abspath(__file__)))
+    prefixes.add(os.path.dirname(urwid.__file__))
+
+    return tuple(os.path.join(prefix, "") for prefix in sorted(prefixes))
+
+
+class CallTreeRecorder:
+    """Records caller/callee edges between code objects, with call counts and
+    inclusive times, using :func:`sys.setprofile`.
+
+    Only calls into code that passes the module filter are recorded. Calls
+    made from unrecorded code are attributed to the nearest recorded caller,
+    or to the root (a caller of *None*) if there is none.
+
+    .. attribute:: edges
+
+        A mapping from ``(caller_code, callee_code)`` to :class:`CallEdge`.
+
+    .. attribute:: truncated
+
+        *True* if calls were dropped because *max_edges* was reached.
+    """
+
+    edges: dict[tuple[CodeType | None, CodeType], CallEdge]
+
+    def __init__(self, module_roots: Sequence[str] = (), max_edges: int = 10000):
+        """
+        :arg module_roots: dotted module name prefixes, such as ``"mypkg"``.
+            Only calls into functions whose module is one of these (or a
+            submodule of one of them) are recorded. If empty, everything but
+            the standard library, PuDB, and urwid is recorded.
+        :arg max_edges: the maximum number of caller/callee pairs to keep.
+        """
+        self.module_roots = tuple(root for root in module_roots if root)
+        self.max_edges = max_edges
+
+        self.edges = {}
+        self.truncated = False
+
+        # Cleared once it holds max_edges entries, see _profile.
+        self._code_is_recorded: dict[CodeType, bool] = {}
+        self._callee_index: dict[
+                CodeType | None, list[tuple[CodeType, CallEdge]]] | None = None
+        self._excluded_prefixes: tuple[str, ...] | None = None
+
+        # entries: (frame, code, start time)
+        self._stack: list[tuple[FrameType, CodeType, int]] = []
+        self._prev_profile: Any = None
+        self.active = False
+
+    def _is_recorded(self, frame: FrameType) -> bool:
+        if self.module_roots:
+            modname = frame.f_globals.get("__name__")
+            if not isinstance(modname, str):
+                return False
+            return any(
+                    modname == root or modname.startswith(root + ".")
+                    for root in self.module_roots)
+
+        filename = frame.f_code.co_filename
+        if filename.startswith("<frozen "):
+            return False
+
+        if self._excluded_prefixes is None:
+            self._excluded_prefixes = _get_excluded_path_prefixes()
+        return not filename.startswith(self._excluded_prefixes)
+
+    def _profile(self, frame: FrameType, event: str, arg: Any) -> None:
+        if event == "call":
+            code = frame.f_code
+            try:
+                recorded = self._code_is_recorded[code]
+            except KeyError:
+                # Bounded like the edges, e.g. for code objects made by
+                # exec() in a loop
+                if len(self._code_is_recorded) >= self.max_edges:
+                    self._code_is_recorded.clear()
+                recorded = self._code_is_recorded[code] = \
+                        self._is_recorded(frame)
+
+            if recorded:
+                self._stack.append((frame, code, perf_counter_ns()))
+
+        elif event == "return":
+            stack = self._stack
+            if not stack or stack[-1][0] is not frame:
+                return
+
+            _, code, start_ns = stack.pop()
+            key = (stack[-1][1] if stack else None, code)
+            try:
+                edge = self.edges[key]
+            except KeyError:
+                if len(self.edges) >= self.max_edges:
+                    self.truncated = True
+                    return
+                edge = self.edges[key] = CallEdge()
+
+            edge.count += 1
+            edge.inclusive_ns += perf_counter_ns() - start_ns
+
+    def start(self) -> None:
+        if self.active:
+            return
+        self._callee_index = None
+        self._prev_profile = sys.getprofile()
+        sys.setprofile(self._profile)
+        self.active = True
+
+    def stop(self) -> None:
+        """Stop recording. Calls that have not returned yet are not
+        included in :attr:`edges`.
+        """
+        if not self.active:
+            return
+        sys.setprofile(self._prev_profile)
+        self._prev_profile = None
+        self._stack.clear()
+        self.active = False
+
+    def get_callees(self, caller: CodeType | None
+            ) -> list[tuple[CodeType, CallEdge]]:
+        """
+        :returns: a list of ``(callee_code, edge)`` tuples for *caller*,
+            sorted by decreasing inclusive time. Pass *None* to obtain the
+            outermost recorded calls. Only meaningful once recording has
+            stopped.
+        """
+        if self._callee_index is None:
+            index: dict[CodeType | None, list[tuple[CodeType, CallEdge]]] = {}
+            for (edge_caller, callee), edge in self.edges.items():
+                index.setdefault(edge_caller, []).append((callee, edge))
+            for callees in index.values():
+                callees.sort(key=lambda item: item[1].inclusive_ns, reverse=True)
+            self._callee_index = index
+
+        return self._callee_index.get(caller, [])
+
+# }}}
+
+
+# {{{ step timing
+
+@dataclass(frozen=True)
+class StepTiming:
+    """Wall-clock and process CPU time, in nanoseconds, that the debuggee
+    ran for between two stops.
+    """
+
+    wall_ns: int
+    cpu_ns: int
+
+
+def format_duration_ns(ns: int) -> str:
+    if ns < 1_000_000:
+        return f"{ns / 1e3:.0f} us"
+    elif ns < 1_000_000_000:
+        return f"{ns / 1e6:.1f} ms"
+    else:
+        return f"{ns / 1e9:.2f} s"
+
+
+class StepTimer:
+    """Measures the time the debuggee runs between two stops, i.e. the time
+    from :meth:`resume` to the following :meth:`stop`, so that time spent
+    in the debugger UI is not included.
+
+    .. attribute:: history
+
+        A :class:`collections.deque` of the most recent :class:`StepTiming`
+        instances, newest last.
+    """
+
+    def __init__(self, history_length: int = 100):
+        self.history: deque[StepTiming] = deque(maxlen=history_length)
+        self._resume_ns: tuple[int, int] | None = None
+
+    def resume(self) -> None:
+        self._resume_ns = (perf_counter_ns(), process_time_ns())
+
+    def stop(self) -> StepTiming | None:
+        """
+        :returns: the time elapsed since the last call to :meth:`resume`,
+            or *None* if the debuggee was not resumed since the last stop.
+        """
+        stop_wall_ns = perf_counter_ns()
+        stop_cpu_ns = process_time_ns()
+
+        if self._resume_ns is None:
+            return None
+
+        resume_wall_ns, resume_cpu_ns = self._resume_ns
+        self._resume_ns = None
+
+        timing = StepTiming(
+                wall_ns=stop_wall_ns - resume_wall_ns,
+                cpu_ns=stop_cpu_ns - resume_cpu_ns)
+        self.history.append(timing)
+        return timing
+
+# }}}
+
+
+# {{{ memory tracking
+
+def format_size(nbytes: int, signed: bool = False) -> str:
+    sign = "+" if signed and nbytes > 0 else ""
+    if abs(nbytes) < 1024:
+        return f"{sign}{nbytes} B"
+
+    size = nbytes / 1024
+    for unit in ["KiB", "MiB"]:
+        if abs(size) < 1024:
+            return f"{sign}{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{sign}{size:.1f} GiB"
+
+
+@dataclass
+class MemoryStopInfo:
+    """Memory behavior of the debuggee between two stops, as collected by
+    :class:`MemoryTracker`.
+
+    .. attribute:: gc_stats_delta
+
+        The difference of :func:`gc.get_stats` between resuming and stopping.
+
+    .. attribute:: gc_collections
+
+        The number of garbage collections run while the debuggee ran.
+
+    .. attribute:: gc_pause_ns
+
+        The total time spent in these garbage collections.
+    """
+
+    prev_snapshot: tracemalloc.Snapshot
+    snapshot: tracemalloc.Snapshot
+    resume_gc_count: tuple[int, int, int]
+    gc_count: tuple[int, int, int]
+    gc_stats_delta: list[dict[str, int]]
+    gc_collections: int
+    gc_pause_ns: int
+
+    _allocation_diffs: list[tracemalloc.StatisticDiff] | None = field(
+            default=None, repr=False)
+
+    def get_allocation_diffs(self) -> list[tracemalloc.StatisticDiff]:
+        """
+        :returns: allocation sites in user code (i.e. not in the standard
+            library, PuDB, or urwid) sorted by decreasing absolute size
+            difference. Computed on first use.
+        """
+        if self._allocation_diffs is None:
+            import tracemalloc
+
+            filters = [
+                    tracemalloc.Filter(False, f"{prefix}*")
+                    for prefix in _get_excluded_path_prefixes()]
+            filters.extend([
+                tracemalloc.Filter(False, "<frozen *>"),
+                tracemalloc.Filter(False, "<unknown>"),
+                ])
+
+            self._allocation_diffs = [
+                    diff
+                    for diff in self.snapshot.filter_traces(filters).compare_to(
+                        self.prev_snapshot.filter_traces(filters), "lineno")
+                    if diff.size_diff or diff.count_diff]
+
+        return self._allocation_diffs
+
+
+class MemoryTracker:
+    """Tracks allocations with :mod:`tracemalloc` and garbage collections
+    through :data:`gc.callbacks` while the debuggee runs.
+
+    :mod:`tracemalloc` snapshots are taken on :meth:`resume` and
+    :meth:`stop`, so that, like the garbage collector figures, allocations
+    only cover the time the debuggee ran, not those made while it was
+    stopped, e.g. by ``__repr__`` methods called to show its variables.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._started_tracemalloc = False
+        self._last_snapshot: tracemalloc.Snapshot | None = None
+
+        self._resume_gc_count = (0, 0, 0)
+        self._resume_gc_stats: list[dict[str, int]] = []
+        self._gc_collections = 0
+        self._gc_pause_ns = 0
+        self._gc_start_ns: int | None = None
+
+    def _gc_callback(self, phase: str, info: dict[str, int]) -> None:
+        if phase == "start":
+            self._gc_start_ns = perf_counter_ns()
+        elif phase == "stop" and self._gc_start_ns is not None:
+            self._gc_collections += 1
+            self._gc_pause_ns += perf_counter_ns() - self._gc_start_ns
+            self._gc_start_ns = None
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+
+        import gc
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        gc.callbacks.append(self._gc_callback)
+        self.enabled = True
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+
+        import gc
+        import tracemalloc
+
+        gc.callbacks.remove(self._gc_callback)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        self._last_snapshot = None
+        self.enabled = False
+
+    def resume(self) -> None:
+        """Start measuring, right before the debuggee runs again."""
+        import gc
+
+        if self.enabled:
+            import tracemalloc
+
+            self._last_snapshot = tracemalloc.take_snapshot()
+
+        self._resume_gc_count = gc.get_count()
+        self._resume_gc_stats = gc.get_stats()
+        self._gc_collections = 0
+        self._gc_pause_ns = 0
+
+    def stop(self) -> MemoryStopInfo | None:
+        """
+        :returns: the memory behavior since :meth:`resume`, or *None* if
+            tracking is not enabled or was enabled after resuming.
+        """
+        if not self.enabled or self._last_snapshot is None:
+            return None
+
+        import gc
+        import tracemalloc
+
+        gc_collections = self._gc_collections
+        gc_pause_ns = self._gc_pause_ns
+        gc_stats = gc.get_stats()
+        gc_count = gc.get_count()
+
+        snapshot = tracemalloc.take_snapshot()
+        prev_snapshot = self._last_snapshot
+        self._last_snapshot = None
+
+        return MemoryStopInfo(
+                prev_snapshot=prev_snapshot,
+                snapshot=snapshot,
+                resume_gc_count=self._resume_gc_count,
+                gc_count=gc_count,
+                gc_stats_delta=[
+                    {key: value - prev_gen_stats.get(key, 0)
+                        for key, value in gen_stats.items()}
+                    for gen_stats, prev_gen_stats in zip(
+                        gc_stats, self._resume_gc_stats)],
+                gc_collections=gc_collections,
+                gc_pause_ns=gc_pause_ns)
+
+# }}}
+
+
+# {{{ deep object sizes
+
+@dataclass(frozen=True)
+class DeepSize:
+    nbytes: int
+    object_count: int
+    # False if the walk was cut short, *nbytes* is then a lower bound.
+    complete: bool
+
+    def format(self) -> str:
+        prefix = "" if self.complete else ">"
+        return prefix + format_size(self.nbytes)
+
+
+def _get_shared_types() -> tuple[type, ...]:
+    import types
+
+    # Objects of these types are shared by many others rather than owned by
+    # them, so they are neither counted nor walked into.
+    return (
+            type,
+            types.ModuleType,
+            types.FunctionType,
+            types.BuiltinFunctionType,
+            types.MethodType,
+            types.CodeType,
+            types.FrameType,
+            )
+
+
+# Types whose instances refer to no other objects, counted without pushing
+# them onto the stack.
+ATOMIC_TYPES = frozenset([int, float, complex, bool, str, bytes])
+
+
+def _is_numpy_array(obj: object) -> bool:
+    cls = type(obj)
+    return (cls.__module__ == "numpy"
+            and cls.__name__ in ("ndarray", "memmap", "matrix"))
+
+
+def get_deep_size(
+            obj: object,
+            max_objects: int = 100_000,
+            time_limit_ns: int = 50 * 10**6,
+        ) -> DeepSize:
+    """Estimate the memory retained by *obj*, as the sum of
+    :func:`sys.getsizeof` over the objects reachable from it, each counted
+    once. NumPy arrays count their data buffer, including that of the array
+    they are a view of.
+
+    The walk stops after *max_objects* objects or *time_limit_ns*
+    nanoseconds.
+    """
+    import gc
+
+    getsizeof = sys.getsizeof
+    shared_types = _get_shared_types()
+    deadline_ns = perf_counter_ns() + time_limit_ns
+
+    seen = {id(obj)}
+    stack = [obj]
+    nbytes = 0
+    while stack:
+        if perf_counter_ns() > deadline_ns:
+            return DeepSize(nbytes, len(seen) - len(stack), complete=False)
+
+        current = stack.pop()
+        nbytes += getsizeof(current, 0)
+
+        if _is_numpy_array(current):
+            # Only an array that owns its data counts the buffer in its
+            # getsizeof, a view's buffer is counted through its base.
+            referents = [current.base]  # pyright: ignore[reportAttributeAccessIssue]
+        else:
+            referents = gc.get_referents(current)
+
+        for referent in referents:
+            if id(referent) in seen or referent is None:
+                continue
+            if len(seen) >= max_objects:
+                return DeepSize(nbytes, len(seen) - len(stack), complete=False)
+            seen.add(id(referent))
+            if type(referent) in ATOMIC_TYPES:
+                nbytes += getsizeof(referent)
+            elif not isinstance(referent, shared_types):
+                stack.append(referent)
+
+    return DeepSize(nbytes, len(seen), complete=True)
+
+
+# Time to spend in :meth:`DeepSizeCache.get` until the next
+# :meth:`DeepSizeCache.clear`, e.g. per stop of the debuggee.
+DEEP_SIZE_STOP_BUDGET_NS = 300 * 10**6
+
+
+class DeepSizeCache:
+    """Caches :func:`get_deep_size` results by object until :meth:`clear`
+    is called, e.g. before the debuggee runs again.
+
+    Sizes are computed for at most :data:`DEEP_SIZE_STOP_BUDGET_NS` in
+    between, see :meth:`is_exhausted`. The budget may be overshot by the
+    time limit of one :func:`get_deep_size` call.
+    """
+
+    def __init__(self):
+        # id -> (object, size). The object is kept so that its id is not
+        # reused while the entry exists.
+        self._entries: dict[int, tuple[object, DeepSize]] = {}
+        self.spent_ns = 0
+
+    def get(self, obj: object) -> DeepSize:
+        entry = self._entries.get(id(obj))
+        if entry is not None and entry[0] is obj:
+            return entry[1]
+
+        start_ns = perf_counter_ns()
+        size = get_deep_size(obj)
+        self.spent_ns += perf_counter_ns() - start_ns
+        self._entries[id(obj)] = (obj, size)
+        return size
+
+    def get_within_budget(self, obj: object) -> DeepSize | None:
+        """
+        :returns: the size of *obj*, or *None* if it is not cached and the
+            time budget is used up.
+        """
+        size = self.peek(obj)
+        if size is None and not self.is_exhausted():
+            size = self.get(obj)
+        return size
+
+    def is_exhausted(self) -> bool:
+        return self.spent_ns > DEEP_SIZE_STOP_BUDGET_NS
+
+    def peek(self, obj: object) -> DeepSize | None:
+        """
+        :returns: the size of *obj* if it is cached, else *None*.
+        """
+        entry = self._entries.get(id(obj))
+        if entry is not None and entry[0] is obj:
+            return entry[1]
+        return None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.spent_ns = 0
+
+
+deep_size_cache = DeepSizeCache()
+
+# }}}
+
+
+# {{{ heap histogram
+
+@dataclass(frozen=True)
+class HeapTypeStats:
+    count: int
+    nbytes: int
+
+
+@dataclass(frozen=True)
+class HeapHistogramRow:
+    cls: type
+    count: int
+    nbytes: int
+    # Relative to the previous histogram, *None* if there is none.
+    count_delta: int | None
+    nbytes_delta: int | None
+
+
+@dataclass(frozen=True)
+class HeapHistogram:
+    """Number and total :func:`sys.getsizeof` of the objects tracked by the
+    garbage collector, by type. See :func:`take_heap_histogram`.
+    """
+
+    stats: dict[type, HeapTypeStats]
+    object_count: int
+    # False if the time budget ran out before all objects were counted.
+    complete: bool
+
+    def get_rows(self, previous: HeapHistogram | None = None
+            ) -> list[HeapHistogramRow]:
+        """
+        :returns: a row for each type in this histogram, or, with a delta
+            of zero, in *previous*, largest total size first.
+        """
+        rows = []
+        for cls, stats in self.stats.items():
+            prev_stats = None if previous is None else previous.stats.get(cls)
+            if previous is None:
+                count_delta = nbytes_delta = None
+            elif prev_stats is None:
+                count_delta, nbytes_delta = stats.count, stats.nbytes
+            else:
+                count_delta = stats.count - prev_stats.count
+                nbytes_delta = stats.nbytes - prev_stats.nbytes
+            rows.append(HeapHistogramRow(
+                cls, stats.count, stats.nbytes, count_delta, nbytes_delta))
+
+        if previous is not None:
+            for cls, prev_stats in previous.stats.items():
+                if cls not in self.stats:
+                    rows.append(HeapHistogramRow(
+                        cls, 0, 0, -prev_stats.count, -prev_stats.nbytes))
+
+        rows.sort(key=lambda row: row.nbytes, reverse=True)
+        return rows
+
+
+def take_heap_histogram(time_limit_ns: int = 10**9) -> HeapHistogram:
+    """Count the objects tracked by the garbage collector by type, in a
+    single pass that stops after *time_limit_ns* nanoseconds.
+    """
+    import gc
+    from collections import Counter
+
+    getsizeof = sys.getsizeof
+    deadline_ns = perf_counter_ns() + time_limit_ns
+
+    counts: Counter[type] = Counter()
+    sizes: Counter[type] = Counter()
+    object_count = 0
+    complete = True
+    for obj in gc.get_objects():
+        if object_count % 4096 == 0 and perf_counter_ns() > deadline_ns:
+            complete = False
+            break
+
+        cls = type(obj)
+        counts[cls] += 1
+        sizes[cls] += getsizeof(obj, 0)
+        object_count += 1
+
+    return HeapHistogram(
+            stats={cls: HeapTypeStats(count, sizes[cls])
+                for cls, count in counts.items()},
+            object_count=object_count,
+            complete=complete)
+
+
+def find_instances(cls: type, max_count: int = 100) -> list[object]:
+    """
+    :returns: up to *max_count* objects tracked by the garbage collector
+        whose type is exactly *cls*.
+    """
+    import gc
+    from itertools import islice
+
+    return list(islice(
+        (obj for obj in gc.get_objects() if type(obj) is cls), max_count))
+
+# }}}
+
+
+# {{{ reference graph
+
+def _is_debugger_object(obj: object) -> bool:
+    module = getattr(type(obj), "__module__", None)
+    return (isinstance(module, str)
+            and module.partition(".")[0] in ("pudb", "urwid"))
+
+
+class ReferenceGraph:
+    """The objects referring to an object (:attr:`direction`
+    ``"referrers"``) or referred to by it (``"referents"``), and so on, as
+    found by :func:`walk_references`.
+    """
+
+    root: object
+
+    def __init__(self,
+                direction: Literal["referrers", "referents"],
+                max_objects: int):
+        self.direction = direction
+        self.max_objects = max_objects
+        # False if the walk was cut short by the object or time limit.
+        self.complete = True
+
+        # id -> neighbors, for the objects whose neighbors were found
+        self._neighbors: dict[int, list[object]] = {}
+        # Keeps the objects found alive, so that their ids stay unique.
+        self._objects: dict[int, object] = {}
+
+    def _walk(self, root: object, max_depth: int, deadline_ns: int) -> None:
+        import gc
+        from types import FrameType
+
+        self.root = root
+
+        # The walk's own containers, which refer to the objects found.
+        own = [self._neighbors, self._objects]
+        own_ids = {id(own), id(self._neighbors), id(self._objects)}
+
+        # ids of the objects that had neighbors belonging to the debugger,
+        # or more neighbors than are kept
+        had_hidden = set()
+        truncated = set()
+        walked = []
+
+        self._objects[id(root)] = root
+        frontier = (root,)
+        for _depth in range(max_depth):
+            if not frontier:
+                break
+            if perf_counter_ns() > deadline_ns:
+                self.complete = False
+                break
+
+            found: dict[int, list[object]] = {id(obj): [] for obj in frontier}
+            level_own = [frontier, found, *found.values()]
+            own.extend(level_own)
+            own_ids.update(id(obj) for obj in level_own)
+
+            if self.direction == "referrers":
+                # Passing the whole level at once walks the heap only once.
+                # The argument tuple is *frontier* itself.
+                candidates = gc.get_referrers(*frontier)
+                own.append(candidates)
+                own_ids.add(id(candidates))
+                for i, candidate in enumerate(candidates):
+                    if i % 256 == 0 and perf_counter_ns() > deadline_ns:
+                        # Partial referrer lists would be misleading.
+                        self.complete = False
+                        found = {}
+                        break
+                    if id(candidate) in own_ids:
+                        continue
+                    for referent in gc.get_referents(candidate):
+                        neighbors = found.get(id(referent))
+                        if neighbors is not None and not (
+                                neighbors and neighbors[-1] is candidate):
+                            neighbors.append(candidate)
+            else:
+                for obj in frontier:
+                    if perf_counter_ns() > deadline_ns:
+                        self.complete = False
+                        break
+                    found[id(obj)].extend(gc.get_referents(obj))
+
+            next_frontier = []
+            own.append(next_frontier)
+            own_ids.add(id(next_frontier))
+            for obj in frontier:
+                neighbors = found.get(id(obj))
+                if neighbors is None:
+                    continue
+
+                visible = [neighbor for neighbor in neighbors
+                        if not isinstance(neighbor, FrameType)
+                        and not _is_debugger_object(neighbor)]
+                if any(_is_debugger_object(neighbor) for neighbor in neighbors):
+                    had_hidden.add(id(obj))
+                if len(visible) > self.max_objects:
+                    del visible[self.max_objects:]
+                    truncated.add(id(obj))
+                    self.complete = False
+                own.append(visible)
+                own_ids.add(id(visible))
+
+                self._neighbors[id(obj)] = visible
+                walked.append(id(obj))
+
+                for neighbor in visible:
+                    if id(neighbor) in self._objects:
+                        continue
+                    if len(self._objects) >= self.max_objects:
+                        self.complete = False
+                        break
+                    self._objects[id(neighbor)] = neighbor
+                    next_frontier.append(neighbor)
+
+            frontier = tuple(next_frontier)
+
+        # Hide the objects whose neighbors are all hidden, deepest first.
+        hidden = set()
+        for obj_id in reversed(walked):
+            neighbors = self._neighbors[obj_id]
+            visible = [neighbor for neighbor in neighbors
+                    if id(neighbor) not in hidden]
+            if (obj_id != id(root) and not visible
+                    and obj_id not in truncated
+                    and (neighbors or obj_id in had_hidden)):
+                hidden.add(obj_id)
+            self._neighbors[obj_id] = visible
+
+    def get_neighbors(self, obj: object) -> list[object] | None:
+        """
+        :returns: the objects referring to *obj*, or referred to by it,
+            depending on :attr:`direction`. *None* if the walk did not get
+            to *obj*.
+        """
+        if self._objects.get(id(obj)) is not obj:
+            return None
+        return self._neighbors.get(id(obj))
+
+
+def walk_references(
+            root: object,
+            direction: Literal["referrers", "referents"],
+            max_depth: int = 6,
+            max_objects: int = 2000,
+            time_limit_ns: int = 2 * 10**9,
+        ) -> ReferenceGraph:
+    """Find the objects referring to *root* or referred to by it, depending
+    on *direction*, and so on, by a breadth-first walk of at most
+    *max_depth* levels. The walk stops once *max_objects* objects were
+    found or after *time_limit_ns* nanoseconds.
+
+    Frames and the debugger's own objects are left out, as are objects
+    that only lead to the latter, such as the dictionaries and tuples
+    through which the debugger refers to the values it shows.
+
+    Finding referrers takes a pass over all objects tracked by the garbage
+    collector, which is done once per level. Containers holding only
+    untracked objects, such as a dictionary of strings, cannot be found.
+    """
+    graph = ReferenceGraph(direction, max_objects)
+    # Passed as positional arguments to a method, *root* is not put into
+    # an argument tuple that would show up as a referrer.
+    graph._walk(root, max_depth, perf_counter_ns() + time_limit_ns)
+    return graph
+
+
+def describe_reference(referrer: object, referent: object) -> str | None:
+    """
+    :returns: how *referrer* refers to *referent*, e.g. ``"['key']"`` or
+        ``".attr"``, if that can be told cheaply, or *None*.
+    """
+    from itertools import islice
+    from types import FunctionType
+
+    max_entries = 10_000
+    try:
+        if isinstance(referrer, dict):
+            for key, value in islice(referrer.items(), max_entries):
+                if value is referent:
+                    return f"[{key!r:.60}]"
+                if key is referent:
+                    return "key"
+        elif isinstance(referrer, (list, tuple)):
+            for i, item in enumerate(islice(referrer, max_entries)):
+                if item is referent:
+                    return f"[{i}]"
+        elif isinstance(referrer, (set, frozenset)):
+            return "member"
+        elif referent is type(referrer):
+            return ".__class__"
+        elif isinstance(referrer, FunctionType) and referrer.__globals__ is referent:
+            return ".__globals__"
+        else:
+            instance_dict = getattr(referrer, "__dict__", None)
+            if instance_dict is referent:
+                return ".__dict__"
+            if isinstance(instance_dict, dict):
+                for key, value in islice(instance_dict.items(), max_entries):
+                    if value is referent:
+                        return f".{key}"
+    except Exception:
+        return None
+
+    return None
+
+# }}}
+
+# vim: foldmethod=marker
@@ -1,10 +1,25 @@
 from __future__ import annotations
 
-from typing import Callable, ClassVar, Hashable, Literal, Sequence, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    ClassVar,
+    Hashable,
+    Literal,
+    Sequence,
+    TypeVar,
+)
 
 import urwid
 from typing_extensions import TypeAlias, override
 from urwid import Widget, calc_text_pos, calc_width
+from urwid.util import apply_target_encoding, rle_subseg
+
+
+if TYPE_CHECKING:
+    from types import CodeType
+
+    from pudb.tracing import CallTreeRecorder, ReferenceGraph
 
 
 # generic urwid helpers -------------------------------------------------------
@@ -46,16 +61,32 @@ def make_canvas(
         # filter out zero-length attrs
         line_attr = [(aname, la) for aname, la in line_attr if la > 0]
 
+        if line.isascii() and line.isprintable():
+            # Fast path: one column per character and one byte per column,
+            # so neither the text nor the attributes need re-measuring.
+            # Attributes running past the end of the text are clipped, like
+            # the byte count computation below does.
+            line_attr = rle_subseg(line_attr, 0, min(len(line), maxcol))
+            if len(line) < maxcol:
+                line_attr.append((fill_attr, maxcol - len(line)))
+                line += " "*(maxcol - len(line))
+            else:
+                line = line[:maxcol]
+
+            encoded_line = line.encode("ascii")
+            processed_txt.append(encoded_line)
+            processed_attr.append(line_attr)
+            processed_cs.append([(None, len(encoded_line))] if encoded_line else [])
+            continue
+
         diff = maxcol - text_width(line)
         if diff > 0:
             line += " "*diff
             line_attr.append((fill_attr, diff))
         else:
-            from urwid.util import rle_subseg
             line = line[:calc_text_pos(line, 0, len(line), maxcol)[0]]
             line_attr = rle_subseg(line_attr, 0, maxcol)
 
-        from urwid.util import apply_target_encoding
         encoded_line, line_cs = apply_target_encoding(line)
 
         # line_cs contains byte counts as requested by TextCanvas, but
@@ -393,4 +424,370 @@ class SearchBox(urwid.Edit):
 
         return result
 
+
+class VarSearchController:
+    """Searches the variables view by label and stringified value, using a
+    :class:`pudb.var_view.VarSearchIndex` built once per stop and frame.
+    Provides the interface :class:`SearchBox` expects.
+
+    Values are matched between keystrokes, see :meth:`do_pending_work`.
+    """
+
+    # Time to spend matching values per batch, in nanoseconds.
+    BATCH_NS: ClassVar[int] = 20 * 10**6
+
+    def __init__(self, ui):
+        self.ui = ui
+
+        self.index = None
+        # (stop serial, frame) the index was built for
+        self.index_key = None
+        self.search = None
+        # position in self.index.entries of the match shown
+        self.match_index = None
+
+        self.search_box = None
+        self.search_start = None
+
+    def reset(self):
+        """Drop the index and search results, e.g. before the debuggee
+        runs again.
+        """
+        self.index = None
+        self.index_key = None
+        self.search = None
+        self.match_index = None
+
+    def _get_index(self):
+        from pudb.var_view import VarSearchIndex
+
+        frame = self.ui.debugger.curframe
+        key = (self.ui.stop_serial, frame)
+        if self.index is None or self.index_key != key:
+            self.index = VarSearchIndex(
+                    self.ui.get_frame_var_info(read_only=True),
+                    frame.f_locals, frame.f_globals, frame.f_code.co_freevars)
+            self.index_key = key
+            self.search = None
+            self.match_index = None
+        return self.index
+
+    def open_search_ui(self):
+        var_pile = self.ui.var_pile
+
+        if self.search_box is None:
+            self._get_index()
+            try:
+                self.search_start = self.ui.var_list._w.focus_position
+            except IndexError:
+                self.search_start = None
+
+            self.search_box = SearchBox(self)
+            self.search_AttrMap = urwid.AttrMap(self.search_box, "search box")
+            var_pile.contents.insert(
+                    1, (self.search_AttrMap, var_pile.options(urwid.PACK)))
+
+        focus_widget_in_container(self.ui.columns, self.ui.rhs_col_sigwrap)
+        self.ui.rhs_col.focus_position = 0
+        var_pile.focus_position = 1
+        self._update_caption()
+
+    def hide_search_ui(self):
+        self.search_box = None
+        del self.ui.var_pile.contents[1]
+        self.ui.var_pile.focus_position = 1
+
+    def cancel_search(self):
+        self.hide_search_ui()
+        self.search = None
+        self.match_index = None
+        if self.search_start is not None:
+            self.ui.update_var_view(focus_index=self.search_start)
+
+    def _update_caption(self):
+        if self.search_box is None:
+            return
+
+        status = ""
+        if self.search is not None:
+            status = f"{len(self.search.matches)}"
+            if not self.search.is_complete():
+                status += "+"
+            status = f" ({status} found)"
+        if self.index is not None and not self.index.complete:
+            status += " [not all values indexed]"
+
+        self.search_box.set_caption([("label", f"Search variables{status}: ")])
+
+    def _show_match(self, match_index):
+        self.match_index = match_index
+        self.ui.show_var_search_entry(self.index.entries[match_index])
+
+    def perform_search(self, dir, s=None, start=None, update_search_start=False):
+        from bisect import bisect_left, bisect_right
+
+        from pudb.var_view import VarSearch
+
+        if s is not None and (self.search is None or s != self.search.query):
+            self.search = VarSearch(self._get_index(), s) if s else None
+            self.match_index = None
+        elif s is None and self.search is None:
+            self.ui.message("No previous search term.")
+            return False
+
+        if self.search is not None and self.search.matches:
+            matches = self.search.matches
+            if self.match_index is None:
+                self._show_match(matches[0])
+            elif s is None:
+                if dir > 0:
+                    pos = bisect_right(matches, self.match_index)
+                else:
+                    pos = bisect_left(matches, self.match_index) - 1
+                self._show_match(matches[pos % len(matches)])
+
+        self._update_caption()
+        return self.search is not None and bool(self.search.matches)
+
+    def has_pending_work(self):
+        return self.search is not None and not self.search.is_complete()
+
+    def do_pending_work(self):
+        """Match values for up to :attr:`BATCH_NS`, showing the first match
+        if there was none before.
+        """
+        from time import perf_counter_ns
+
+        assert self.search is not None
+        found = self.search.update(perf_counter_ns() + self.BATCH_NS)
+        if found and self.match_index is None:
+            self._show_match(self.search.matches[0])
+            if self.search_box is not None:
+                self.search_AttrMap.set_attr_map({None: "search box"})
+        self._update_caption()
+
+# }}}
+
+
+# {{{ tree panels
+
+class TreePanelWidget(urwid.TreeWidget):
+    """A row in a collapsible tree panel. Rows start out collapsed, except
+    for the root. The node is expected to provide a ``get_label`` method
+    returning urwid text markup.
+    """
+
+    def __init__(self, node: urwid.TreeNode):
+        super().__init__(node)
+        if not self.is_leaf and node.get_depth() > 0:
+            self.expanded = False
+            self.update_expanded_icon()
+
+    @override
+    def get_display_text(self):
+        return self.get_node().get_label()
+
+    @override
+    def get_indented_widget(self):
+        return urwid.AttrMap(
+                super().get_indented_widget(), None, "focused selectable")
+
+    @override
+    def keypress(self, size, key):
+        if key in ["enter", " ", "\\"]:
+            if not self.is_leaf:
+                self.expanded = not self.expanded
+                self.update_expanded_icon()
+            return None
+        elif key == "l":
+            key = "+"
+        elif key == "h":
+            if self.is_leaf or not self.expanded:
+                key = "left"
+            else:
+                key = "-"
+
+        return super().keypress(size, key)
+
+
+class CallTreeNodeMixin:
+    recorder: CallTreeRecorder
+
+    def _is_on_path(self, code: CodeType) -> bool:
+        """
+        :returns: whether *code* is the callee of this node or an ancestor
+        """
+        node = self
+        while node is not None:
+            if node.get_value()[0] is code:
+                return True
+            node = node.get_parent()
+        return False
+
+    def _is_recursive(self) -> bool:
+        parent = self.get_parent()
+        return parent is not None and parent._is_on_path(self.get_value()[0])
+
+    def get_label(self):
+        code, edge = self.get_value()
+
+        if code is None:
+            label = "Calls since the last stop"
+            if self.recorder.truncated:
+                return [label, " ", ("warning", (
+                    f"(truncated: limit of {self.recorder.max_edges} "
+                    "caller/callee pairs reached)"))]
+            return label
+
+        from os.path import basename
+        name = getattr(code, "co_qualname", code.co_name)
+        label = [
+                name,
+                f"  {edge.count}x {edge.inclusive_ns / 1e6:.3f} ms  ",
+                ("line number",
+                    f"{basename(code.co_filename)}:{code.co_firstlineno}"),
+                ]
+        if self._is_recursive():
+            label.append(("warning", " (recursive)"))
+        return label
+
+    def load_widget(self):
+        return TreePanelWidget(self)
+
+
+class CallTreeLeafNode(CallTreeNodeMixin, urwid.TreeNode):
+    def __init__(self, recorder, value, parent=None, key=None, depth=None):
+        self.recorder = recorder
+        super().__init__(value, parent=parent, key=key, depth=depth)
+
+
+class CallTreeNode(CallTreeNodeMixin, urwid.ParentNode):
+    """A node of the tree of calls recorded by a
+    :class:`pudb.tracing.CallTreeRecorder`. Its value is a tuple
+    ``(code, edge)``, where *code* is *None* for the root.
+    """
+
+    def __init__(self, recorder, value=(None, None),
+            parent=None, key=None, depth=None):
+        self.recorder = recorder
+        super().__init__(value, parent=parent, key=key, depth=depth)
+
+    def load_child_keys(self):
+        code, _edge = self.get_value()
+        return list(range(len(self.recorder.get_callees(code))))
+
+    def load_child_node(self, key):
+        code, _edge = self.get_value()
+        child_value = self.recorder.get_callees(code)[key]
+        child_code, _edge = child_value
+
+        if (self.recorder.get_callees(child_code)
+                and not self._is_on_path(child_code)):
+            node_cls = CallTreeNode
+        else:
+            node_cls = CallTreeLeafNode
+
+        return node_cls(self.recorder, child_value,
+                parent=self, key=key, depth=self.get_depth() + 1)
+
+
+def _describe_object(obj: object) -> str:
+    # Do not globalize: cyclic import
+    from pudb.var_view import default_stringifier
+
+    try:
+        result = default_stringifier(obj)
+    except Exception:
+        result = type(obj).__name__
+
+    name = getattr(obj, "__qualname__", None) or getattr(obj, "__name__", None)
+    if isinstance(name, str) and result == type(obj).__name__:
+        result = f"{result} {name}"
+
+    return result[:100]
+
+
+class ReferenceNodeMixin:
+    graph: ReferenceGraph
+
+    def _is_on_path(self, obj: object) -> bool:
+        """
+        :returns: whether *obj* is the value of this node or an ancestor
+        """
+        node = self
+        while node is not None:
+            if node.get_value() is obj:
+                return True
+            node = node.get_parent()
+        return False
+
+    def _is_cycle(self) -> bool:
+        parent = self.get_parent()
+        return parent is not None and parent._is_on_path(self.get_value())
+
+    def get_label(self):
+        obj = self.get_value()
+        parent = self.get_parent()
+
+        label: list[str | tuple[str, str]] = []
+        if parent is None:
+            if self.graph.direction == "referrers":
+                label.append("Referrers of ")
+            else:
+                label.append("Referents of ")
+        else:
+            from pudb.tracing import describe_reference
+            if self.graph.direction == "referrers":
+                relation = describe_reference(obj, parent.get_value())
+            else:
+                relation = describe_reference(parent.get_value(), obj)
+            if relation is not None:
+                label.append(("line number", f"{relation} "))
+
+        label.append(_describe_object(obj))
+
+        if parent is None:
+            if not self.graph.complete:
+                label.append(("warning", (
+                    " (truncated: object or time limit reached)")))
+        elif self._is_cycle():
+            label.append(("warning", " (cycle)"))
+        elif self.graph.get_neighbors(obj) is None:
+            label.append(("warning", " (not walked: limit reached)"))
+
+        return label
+
+    def load_widget(self):
+        return TreePanelWidget(self)
+
+
+class ReferenceLeafNode(ReferenceNodeMixin, urwid.TreeNode):
+    def __init__(self, graph, value, parent=None, key=None, depth=None):
+        self.graph = graph
+        super().__init__(value, parent=parent, key=key, depth=depth)
+
+
+class ReferenceNode(ReferenceNodeMixin, urwid.ParentNode):
+    """A node of a tree of objects referring to, or referred to by, the
+    root of a :class:`pudb.tracing.ReferenceGraph`. Its value is the object.
+    """
+
+    def __init__(self, graph, value, parent=None, key=None, depth=None):
+        self.graph = graph
+        super().__init__(value, parent=parent, key=key, depth=depth)
+
+    def load_child_keys(self):
+        return list(range(len(self.graph.get_neighbors(self.get_value()) or [])))
+
+    def load_child_node(self, key):
+        child = self.graph.get_neighbors(self.get_value())[key]
+
+        if self.graph.get_neighbors(child) and not self._is_on_path(child):
+            node_cls = ReferenceNode
+        else:
+            node_cls = ReferenceLeafNode
+
+        return node_cls(self.graph, child,
+                parent=self, key=key, depth=self.get_depth() + 1)
+
 # }}}
@@ -28,17 +28,27 @@ THE SOFTWARE.
 
 # {{{ constants and imports
 
+import dataclasses
 import inspect
+import json
+import sys
+import types
 import warnings
+import weakref
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Sized
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sized
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, ClassVar, Iterator, Literal, cast
+from functools import cached_property
+from itertools import islice
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, ClassVar, Iterator, Literal, cast
 
 import urwid
 from typing_extensions import TypeAlias, override
 
 from pudb.lowlevel import ui_log
+from pudb.tracing import deep_size_cache
 from pudb.ui_tools import text_width
 
 
@@ -75,14 +85,14 @@ class PudbCollection(ABC):  # noqa: B024
         return NotImplemented
 
     @classmethod
-    def entries(cls, collection, label: str | None):
+    def entries(cls, collection, label: str | None, start: int = 0):
         """
         :yield: ``(label, entry, id_path_ext)`` tuples for each entry in the
-        collection.
+        collection, beginning with the one at position *start*.
         """
         assert isinstance(collection, cls)
         try:
-            for count, entry in enumerate(collection):
+            for count, entry in islice(enumerate(collection), start, None):
                 yield None, entry, f"[{count:d}]"
         except Exception as error:
             ui_log.error(f"Object {label!r} appears to be a collection, but does "
@@ -106,15 +116,39 @@ class PudbSequence(ABC):  # noqa: B024
                 pass
         return NotImplemented
 
+    # Number of entries obtained per slice when starting past the beginning
+    SLICE_SIZE: ClassVar[int] = 100
+
+    @classmethod
+    def _entries_from(cls, sequence, start: int) -> Iterator[tuple[int, object]]:
+        try:
+            chunk = sequence[start:start + cls.SLICE_SIZE]
+            len(chunk)
+        except Exception:
+            # Does not support slicing, skip ahead by iterating instead.
+            yield from islice(enumerate(sequence), start, None)
+            return
+
+        count = start
+        while len(chunk):
+            for entry in chunk:
+                yield count, entry
+                count += 1
+            chunk = sequence[count:count + cls.SLICE_SIZE]
+
     @classmethod
-    def entries(cls, sequence, label: str | None):
+    def entries(cls, sequence, label: str | None, start: int = 0):
         """
         :yield: ``(label, entry, id_path_ext)`` tuples for each entry in the
-        sequence.
+        sequence, beginning with the one at index *start*.
         """
         assert isinstance(sequence, cls)
         try:
-            for count, entry in enumerate(sequence):
+            if start:
+                indexed_entries = cls._entries_from(sequence, start)
+            else:
+                indexed_entries = enumerate(sequence)
+            for count, entry in indexed_entries:
                 yield str(count), entry, f"[{count:d}]"
         except Exception as error:
             ui_log.error(f"Object {label!r} appears to be a sequence, but does "
@@ -150,14 +184,14 @@ class PudbMapping(ABC):  # noqa: B024
             return f"!! repr error on key with id: {id(key):#x} !!"
 
     @classmethod
-    def entries(cls, mapping, label: str | None):
+    def entries(cls, mapping, label: str | None, start: int = 0):
         """
         :yield: ``(label, entry, id_path_ext)`` tuples for each entry in the
-        mapping.
+        mapping, beginning with the one at position *start*.
         """
         assert isinstance(mapping, cls)
         try:
-            for key in mapping:
+            for key in islice(mapping, start, None):
                 key_repr = cls._safe_key_repr(key)
                 yield (key_repr, mapping[key], f"[{key_repr}]")
         except Exception as error:
@@ -185,18 +219,155 @@ CONTAINER_CLASSES = (
 class FrameVarInfo:
     id_path_to_iinfo: dict[IdPath, InspectInfo]
     watches: list[WatchExpression]
+    # by expression. Like the rest of this, kept per function (see
+    # :data:`FrameKey`): frames cannot be weakly referenced, and their ids
+    # are reused once they are gone.
+    watch_states: dict[str, WatchState]
+
+    # Incremented whenever inspection state may be about to change, so that
+    # cached widgets built from an older state are not reused.
+    state_version: int
+
+    # For highlighting changes between stops: hashes of what was shown for
+    # each id path at the current stop and, for earlier stops, the most
+    # recent one. See :meth:`record_fingerprint`.
+    stop_serial: int | None
+    fingerprints: dict[str, int]
+    prev_fingerprints: dict[str, int]
+    var_names: frozenset[str]
+    prev_var_names: frozenset[str] | None
+
+    # See :meth:`get_repeated_roots`, computed at :attr:`state_version`.
+    _repeated_roots: set[RowRoot]
+    _repeated_roots_version: int | None
 
     def __init__(self):
         self.id_path_to_iinfo = {}
         self.watches = []
+        self.watch_states = {}
+        self.state_version = 0
+        self._repeated_roots = set()
+        self._repeated_roots_version = None
+
+        self.stop_serial = None
+        self.fingerprints = {}
+        self.prev_fingerprints = {}
+        self.var_names = frozenset()
+        self.prev_var_names = None
+
+    def set_stop(self, stop_serial: int | None, var_names: Iterable[str]) -> None:
+        """Start recording fingerprints for the stop numbered *stop_serial*,
+        to be compared against those recorded at earlier stops. If
+        *stop_serial* is *None*, stop tracking changes.
+
+        :arg var_names: the names of the variables in the frame.
+        """
+        if stop_serial == self.stop_serial:
+            return
+
+        if stop_serial is None:
+            self.prev_fingerprints = {}
+            self.prev_var_names = None
+        elif self.stop_serial is not None:
+            self.prev_fingerprints.update(self.fingerprints)
+            self.prev_var_names = self.var_names
+
+        self.stop_serial = stop_serial
+        self.fingerprints = {}
+        self.var_names = frozenset(var_names)
+
+    def record_fingerprint(self, id_path: str, fingerprint: int) -> bool:
+        """
+        :returns: whether *fingerprint* differs from the one last recorded
+            for *id_path* at an earlier stop, or *id_path* names a variable
+            that did not exist at the previous stop.
+        """
+        if self.stop_serial is None:
+            return False
+
+        self.fingerprints[id_path] = fingerprint
+
+        prev_fingerprint = self.prev_fingerprints.get(id_path)
+        if prev_fingerprint is None:
+            return (self.prev_var_names is not None
+                    and id_path in self.var_names
+                    and id_path not in self.prev_var_names)
+
+        return prev_fingerprint != fingerprint
+
+    def get_saved_state(self) -> dict[str, object]:
+        """
+        :returns: the inspection state and watches, suitable for JSON and
+            for :meth:`from_saved_state`. Empty if there is nothing to keep.
+        """
+        result: dict[str, object] = {}
+
+        inspect_info = {}
+        for id_path, iinfo in self.id_path_to_iinfo.items():
+            iinfo_state = iinfo.get_saved_state()
+            if iinfo_state:
+                inspect_info[id_path] = iinfo_state
+        if inspect_info:
+            result["inspect_info"] = inspect_info
+
+        if self.watches:
+            result["watches"] = [
+                    {"expression": watch.expression, "pinned": watch.pinned}
+                    for watch in self.watches]
+
+        return result
+
+    @classmethod
+    def from_saved_state(cls, state: dict[str, object]) -> FrameVarInfo:
+        fvi = cls()
+
+        inspect_info = state.get("inspect_info")
+        if isinstance(inspect_info, dict):
+            for id_path, iinfo_state in inspect_info.items():
+                if isinstance(id_path, str) and isinstance(iinfo_state, dict):
+                    fvi.get_inspect_info(id_path, read_only=False) \
+                            .set_saved_state(iinfo_state)
+
+        watches = state.get("watches")
+        if isinstance(watches, list):
+            fvi.watches = [
+                    WatchExpression(watch["expression"], bool(watch.get("pinned")))
+                    for watch in watches
+                    if isinstance(watch, dict)
+                    and isinstance(watch.get("expression"), str)]
+
+        return fvi
+
+    def get_repeated_roots(self) -> set[RowRoot]:
+        """
+        :returns: the roots (see :func:`get_id_path_root`) of the paths that
+            are repeated at the top. Only recomputed once inspection state
+            may have changed.
+        """
+        if self._repeated_roots_version != self.state_version:
+            self._repeated_roots = {
+                    get_id_path_root(id_path)
+                    for id_path, iinfo in self.id_path_to_iinfo.items()
+                    if iinfo.repeated_at_top}
+            self._repeated_roots_version = self.state_version
+
+        return self._repeated_roots
 
     def get_inspect_info(self, id_path, read_only):
-        if read_only:
-            return self.id_path_to_iinfo.get(
-                    id_path, InspectInfo())
-        else:
-            return self.id_path_to_iinfo.setdefault(
-                    id_path, InspectInfo())
+        iinfo = self.id_path_to_iinfo.get(id_path)
+        if iinfo is None:
+            iinfo = InspectInfo()
+            if id_path == CLOSURE_ID_PATH:
+                # Closure variables used to be listed with the locals, so
+                # keep them in view unless collapsed.
+                iinfo.show_detail = True
+            if read_only:
+                return iinfo
+            self.id_path_to_iinfo[id_path] = iinfo
+
+        if not read_only:
+            self.state_version += 1
+        return iinfo
 
 
 VarAccessLevel: TypeAlias = Literal["private", "public", "all"]
@@ -210,8 +381,38 @@ Stringifier: TypeAlias = Literal[
 
 IdPath: TypeAlias = "tuple[str, ...]"
 
+# The top-level row an id path belongs to: (section, name). The section is
+# GLOBALS_ID_PATH for the globals and None for the other rows, the name is
+# None for a section's header row.
+RowRoot: TypeAlias = "tuple[str | None, str | None]"
+
+# Identifies a function across runs: (canonical file name, qualified name,
+# first line number)
+FrameKey: TypeAlias = "tuple[str, str, int]"
+
 
 class InspectInfo:
+    """Inspection settings for one id path.
+
+    Only fields that have been assigned are stored. The others read as their
+    defaults, which for :attr:`display_type`, :attr:`access_level` and
+    :attr:`wrap` follow the current configuration.
+    """
+
+    __slots__ = (
+        "access_level",
+        "display_type",
+        "evaluate_property",
+        "highlighted",
+        "ignore_time_budget",
+        "page_start",
+        "repeated_at_top",
+        "show_detail",
+        "show_methods",
+        "slow_display_type",
+        "wrap",
+        )
+
     show_detail: bool
     display_type: Stringifier | str
     highlighted: bool
@@ -219,29 +420,117 @@ class InspectInfo:
     access_level: VarAccessLevel
     show_methods: bool
     wrap: bool
+    # Position of the first container entry shown
+    page_start: int
+    # Whether a property is evaluated rather than shown as a placeholder.
+    # Expanding its value is up to :attr:`show_detail`, as for other values.
+    evaluate_property: bool
+
+    # The display type this path had before its stringifier went over the
+    # time budget and it was switched to "type".
+    slow_display_type: Stringifier | str | None
+    ignore_time_budget: bool
+
+    _DEFAULTS: ClassVar[dict[str, object]] = {
+        "show_detail": False,
+        "highlighted": False,
+        "repeated_at_top": False,
+        "show_methods": False,
+        "page_start": 0,
+        "evaluate_property": False,
+        "slow_display_type": None,
+        "ignore_time_budget": False,
+        }
+    _CONFIG_DEFAULTS: ClassVar[dict[str, str]] = {
+        "display_type": "stringifier",
+        "access_level": "default_variables_access_level",
+        "wrap": "wrap_variables",
+        }
+
+    # Fields kept by :meth:`get_saved_state`, with their types. The others
+    # only make sense within one session.
+    SAVED_FIELDS: ClassVar[dict[str, type]] = {
+        "access_level": str,
+        "display_type": str,
+        "evaluate_property": bool,
+        "highlighted": bool,
+        "page_start": int,
+        "repeated_at_top": bool,
+        "show_detail": bool,
+        "show_methods": bool,
+        "wrap": bool,
+        }
+
+    def __getattr__(self, name: str) -> object:
+        # Only called for fields that were not assigned.
+        return self._get_default(name)
+
+    def _get_default(self, name: str) -> object:
+        if name in self._DEFAULTS:
+            return self._DEFAULTS[name]
+
+        config_key = self._CONFIG_DEFAULTS.get(name)
+        if config_key is None:
+            raise AttributeError(name)
 
-    def __init__(self):
         # Do not globalize: cyclic import
         from pudb.debugger import CONFIG
 
-        self.show_detail = False
-        self.display_type = CONFIG["stringifier"]
-        self.highlighted = False
-        self.repeated_at_top = False
-        self.access_level = CONFIG["default_variables_access_level"]
-        self.show_methods = False
-        self.wrap = CONFIG["wrap_variables"]
+        return CONFIG[config_key]
+
+    def get_saved_state(self) -> dict[str, object]:
+        """
+        :returns: the fields among :attr:`SAVED_FIELDS` that differ from
+            their defaults, suitable for JSON and for :meth:`set_saved_state`.
+        """
+        return {
+                name: value
+                for name in self.SAVED_FIELDS
+                if (value := getattr(self, name)) != self._get_default(name)}
+
+    def set_saved_state(self, state: dict[str, object]) -> None:
+        for name, value in state.items():
+            field_type = self.SAVED_FIELDS.get(name)
+            if field_type is not None and isinstance(value, field_type):
+                setattr(self, name, value)
 
 
 @dataclass(frozen=True)
 class WatchExpression:
     expression: str
+    # Pinned watches are evaluated at every stop, even if their rows are not
+    # shown or their evaluation took longer than the time budget.
+    pinned: bool = False
+
+    @cached_property
+    def code(self) -> types.CodeType:
+        return compile(self.expression, "<watch>", "eval")
 
 
 class WatchEvalError:
     def __str__(self):
         return "<error>"
 
+
+class WatchState:
+    """What is remembered about a watch expression between stops."""
+
+    # The displayed value and the :func:`time.perf_counter_ns` time of the
+    # most recent successful evaluation
+    value_str: str | None
+    evaluated_ns: int | None
+
+    # Whether the most recent evaluation took longer than the time budget,
+    # so that the watch is not evaluated again unless asked to.
+    slow: bool
+    force_evaluation: bool
+
+    def __init__(self):
+        self.value_str = None
+        self.evaluated_ns = None
+        self.slow = False
+        self.force_evaluation = False
+
 # }}}
 
 
@@ -260,6 +549,26 @@ class VariableWidget(urwid.Widget):
     attr_prefix: str
     watch_expr: WatchExpression | None
     wrap: bool
+    # Shown right-aligned in a column of its own, e.g. the size of the value
+    size_str: str | None
+    # The value shown, or :attr:`NO_VALUE` for rows without one. Only kept
+    # while the debuggee is stopped, see :meth:`VarViewWalker.release_values`.
+    value: object
+    # Whether this row stands in for a property that was not evaluated yet
+    unevaluated_property: bool
+
+    NO_VALUE: ClassVar[object] = object()
+
+    # Assigning any of these changes what the widget displays and discards
+    # the cached wrapping and canvases.
+    _RENDER_ATTRS: ClassVar[frozenset[str]] = frozenset([
+        "prefix", "var_label", "value_str", "attr_prefix", "wrap", "size_str"])
+
+    # The size column is dropped if less than this is left for the rest.
+    MIN_TEXT_COLS: ClassVar[int] = 20
+
+    _wrapped_lines: dict[int, list[str]]
+    _canvases: dict[tuple[int, bool, str], urwid.Canvas]
 
     def __init__(self,
                 parent: VariableWidget | None,
@@ -273,6 +582,8 @@ class VariableWidget(urwid.Widget):
         super().__init__()
 
         assert isinstance(id_path, str)
+        self._wrapped_lines = {}
+        self._canvases = {}
         self.parent = parent
         self.nesting_level = 0 if parent is None else parent.nesting_level + 1
         self.prefix = self.PREFIX * self.nesting_level
@@ -281,6 +592,9 @@ class VariableWidget(urwid.Widget):
         self.id_path = id_path
         self.attr_prefix = attr_prefix or "var"
         self.watch_expr = watch_expr
+        self.size_str = None
+        self.value = self.NO_VALUE
+        self.unevaluated_property = False
         if iinfo is None:
             # Do not globalize: cyclic import
             from pudb.debugger import CONFIG
@@ -289,6 +603,13 @@ class VariableWidget(urwid.Widget):
         else:
             self.wrap = iinfo.wrap
 
+    def __setattr__(self, name: str, value: object) -> None:
+        super().__setattr__(name, value)
+        if name in self._RENDER_ATTRS and (self._wrapped_lines or self._canvases):
+            self._wrapped_lines.clear()
+            self._canvases.clear()
+            self._invalidate()
+
     def __str__(self):
         return (f"VariableWidget: {self.value_str}, level {self.nesting_level}, "
             f"at {self.id_path}")
@@ -296,12 +617,31 @@ class VariableWidget(urwid.Widget):
     def selectable(self):
         return True
 
+    def _get_text_cols(self, maxcol: int) -> int:
+        """
+        :returns: the number of columns available for the label and value
+        """
+        if self.size_str is None:
+            return maxcol
+
+        text_cols = maxcol - text_width(self.size_str) - 1
+        if text_cols < self.MIN_TEXT_COLS:
+            return maxcol
+        return text_cols
+
     def _get_wrapped_lines(self, maxcol: int) -> list[str]:
         """
         :param maxcol: the number of columns available to this widget
         :return: list of string lines, including prefixes, wrapped to fit in
-            the available space
+            the available space. The list is cached and must not be modified.
         """
+        try:
+            return self._wrapped_lines[maxcol]
+        except KeyError:
+            lines = self._wrapped_lines[maxcol] = self._wrap_lines(maxcol)
+            return lines
+
+    def _wrap_lines(self, maxcol: int) -> list[str]:
         maxcol -= len(self.prefix)  # self.prefix is padding
         var_label = self.var_label or ""
         value_str = self.value_str or ""
@@ -322,10 +662,11 @@ class VariableWidget(urwid.Widget):
         :param focus: True if this widget or one of its children is in focus
         :return: The number of rows required for this widget
         """
+        text_cols = self._get_text_cols(size[0])
         if self.wrap:
-            return len(self._get_wrapped_lines(size[0]))
+            return len(self._get_wrapped_lines(text_cols))
 
-        if len(self._get_wrapped_lines(size[0])) > 1:
+        if len(self._get_wrapped_lines(text_cols)) > 1:
             return 2
         else:
             return 1
@@ -338,13 +679,48 @@ class VariableWidget(urwid.Widget):
         :return: A Canvas subclass instance containing the rendered content of
             this widget
         """
+        key = (size[0], focus, self.attr_prefix)
+        try:
+            return self._canvases[key]
+        except KeyError:
+            canvas = self._canvases[key] = self._make_canvas(*key)
+            return canvas
+
+    def _make_canvas(self, maxcol: int, focus: bool, attr_prefix: str
+            ) -> urwid.Canvas:
+        text_cols = self._get_text_cols(maxcol)
+        text_canvas = self._make_text_canvas(text_cols, focus, attr_prefix)
+        if text_cols == maxcol:
+            return text_canvas
+
+        from pudb.ui_tools import make_canvas
+
+        assert self.size_str is not None
+        if focus:
+            apfx = "focused "+attr_prefix+" "
+        else:
+            apfx = attr_prefix+" "
+
+        size_cols = maxcol - text_cols
+        extra_rows = text_canvas.rows() - 1
+        size_canvas = make_canvas(
+                [" " + self.size_str] + [""] * extra_rows,
+                [[(apfx+"label", size_cols)]] + [[]] * extra_rows,
+                size_cols, apfx+"value")
+
+        return urwid.CanvasJoin([
+            (text_canvas, None, False, text_cols),
+            (size_canvas, None, False, size_cols),
+            ])
+
+    def _make_text_canvas(self, maxcol: int, focus: bool, attr_prefix: str
+            ) -> urwid.TextCanvas:
         from pudb.ui_tools import make_canvas
 
-        maxcol = size[0]
         if focus:
-            apfx = "focused "+self.attr_prefix+" "
+            apfx = "focused "+attr_prefix+" "
         else:
-            apfx = self.attr_prefix+" "
+            apfx = attr_prefix+" "
 
         var_label = self.var_label or ""
 
@@ -559,6 +935,435 @@ def get_stringifier(iinfo: InspectInfo) -> Callable[[object], str]:
                 return (lambda value:
                     str(custom_stringifier_dict["pudb_stringifier"](value)))
 
+
+# Strings longer than this are shown cut short, as wrapping all of them for
+# display would be slow. The pager shows all of them.
+LARGE_STR_LENGTH = 10_000
+LARGE_STR_SHOWN_LENGTH = 1000
+
+
+def stringify_large_str(value: object, iinfo: InspectInfo) -> str | None:
+    """
+    :returns: for a string longer than :data:`LARGE_STR_LENGTH` shown by one
+        of the built-in stringifiers, the stringified start of the string
+        and its length, otherwise *None*
+    """
+    if (not isinstance(value, str)
+            or len(value) <= LARGE_STR_LENGTH
+            or iinfo.display_type not in ("default", "repr", "str")):
+        return None
+
+    shown = STRINGIFIERS[iinfo.display_type](value[:LARGE_STR_SHOWN_LENGTH])
+    return f"{shown}... ({len(value)} characters)"
+
+
+# {{{ stringifier result cache
+
+# These are cheap enough that caching their results is not worthwhile.
+UNCACHED_DISPLAY_TYPES = frozenset(["type", "id"])
+
+
+StringifierVersion: TypeAlias = "tuple[int | None, int | None]"
+
+
+def _get_stringifier_version(value: object) -> StringifierVersion:
+    """
+    :returns: a cheap indication of whether *value* was modified: its
+        ``pudb_mutation_count`` and its length, each *None* if unavailable.
+        Types opt in to the first by defining a ``pudb_mutation_count``
+        attribute that is incremented on every change that may affect how
+        instances stringify. The length alone does not tell whether the
+        contents changed, so it is only checked while the debuggee is
+        stopped.
+    """
+    count = None
+    if hasattr(type(value), "pudb_mutation_count"):
+        try:
+            count = value.pudb_mutation_count  # pyright: ignore[reportAttributeAccessIssue]
+        except Exception:
+            count = None
+        if not isinstance(count, int):
+            count = None
+
+    length = None
+    if isinstance(value, Sized):
+        try:
+            length = len(value)
+        except Exception:
+            length = None
+
+    return (count, length)
+
+
+def _is_immutable(value: object) -> bool:
+    """
+    :returns: whether *value* is of a built-in immutable type, or a tuple or
+        frozenset of such values, so that how it stringifies cannot change.
+    """
+    if type(value) in IMMUTABLE_TYPES:
+        return True
+
+    return (type(value) in (tuple, frozenset)
+            and len(value) <= IMMUTABLE_CONTAINER_MAX_LENGTH
+            and all(type(item) in IMMUTABLE_TYPES for item in value))
+
+
+# Longer tuples and frozensets are not checked by :func:`_is_immutable`.
+IMMUTABLE_CONTAINER_MAX_LENGTH = 1000
+
+
+def _strong_ref(value: object) -> Callable[[], object]:
+    return lambda: value
+
+
+@dataclass(frozen=True)
+class _StringifierCacheEntry:
+    get_object: Callable[[], object]
+    # whether the entry stays valid once the debuggee has run
+    survives_run: bool
+    # whether the object is only weakly referenced once the debuggee runs
+    held_weakly_across_runs: bool
+    version: StringifierVersion
+    result: str
+    size: int
+
+
+class StringifierCache:
+    """An LRU cache of stringifier results, keyed by
+    ``(id(value), type(value), display_type)``.
+
+    Results are only reused if the key still refers to the same object and
+    its version (see :func:`_get_stringifier_version`) is unchanged. Once
+    the debuggee has had a chance to run, the results are only kept for
+    immutable values (see :func:`_is_immutable`) and for weakly
+    referenceable objects with a ``pudb_mutation_count``, see
+    :meth:`invalidate_unversioned`.
+
+    The total size of the cached results, and of the immutable values they
+    hold on to, is kept below the ``stringifier_cache_kb`` configuration
+    setting.
+    """
+
+    # Rough size of an entry, its key and its references in bytes, on top
+    # of the size of the result.
+    ENTRY_OVERHEAD: ClassVar[int] = 300
+
+    entries: OrderedDict[tuple[int, type, str], _StringifierCacheEntry]
+    total_size: int
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.total_size = 0
+
+    def _remove(self, key: tuple[int, type, str]) -> None:
+        entry = self.entries.pop(key)
+        self.total_size -= entry.size
+
+    def get(self, value: object, display_type: str) -> str | None:
+        key = (id(value), type(value), display_type)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        if (entry.get_object() is not value
+                or _get_stringifier_version(value) != entry.version):
+            self._remove(key)
+            return None
+
+        self.entries.move_to_end(key)
+        return entry.result
+
+    def put(self, value: object, display_type: str, result: str) -> None:
+        # Do not globalize: cyclic import
+        from pudb.debugger import CONFIG
+
+        max_size = CONFIG["stringifier_cache_kb"] * 1024
+        size = sys.getsizeof(result) + self.ENTRY_OVERHEAD
+
+        version = _get_stringifier_version(value)
+        if _is_immutable(value):
+            # Held on to across runs, so counted against the bound.
+            survives_run = True
+            held_weakly_across_runs = False
+            size += sys.getsizeof(value)
+            if isinstance(value, (tuple, frozenset)):
+                size += sum(sys.getsizeof(item) for item in value)
+        else:
+            # Weak references are only created once the debuggee runs, so
+            # that they do not show up in the object's __weakref__ while it
+            # is being shown.
+            held_weakly_across_runs = survives_run = (
+                    type(value).__weakrefoffset__ != 0
+                    and version[0] is not None)
+
+        if size > max_size:
+            return
+
+        key = (id(value), type(value), display_type)
+        if key in self.entries:
+            self._remove(key)
+
+        self.entries[key] = _StringifierCacheEntry(
+                _strong_ref(value), survives_run, held_weakly_across_runs,
+                version, result, size)
+        self.total_size += size
+
+        while self.total_size > max_size:
+            _, entry = self.entries.popitem(last=False)
+            self.total_size -= entry.size
+
+    def invalidate_unversioned(self) -> None:
+        """Drop the results that cannot be validated once the debuggee has
+        had a chance to change the objects: those for mutable objects
+        without a ``pudb_mutation_count`` or that are not weakly
+        referenceable. The references to the objects with a
+        ``pudb_mutation_count`` are made weak.
+        """
+        for key, entry in list(self.entries.items()):
+            value = entry.get_object()
+            if not entry.survives_run or value is None:
+                self._remove(key)
+            elif (entry.held_weakly_across_runs
+                    and not isinstance(entry.get_object, weakref.ref)):
+                try:
+                    get_object = weakref.ref(value)
+                except TypeError:
+                    self._remove(key)
+                else:
+                    self.entries[key] = dataclasses.replace(
+                            entry, get_object=get_object)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.total_size = 0
+
+
+stringifier_cache = StringifierCache()
+
+# }}}
+
+
+# {{{ stringifier time budget
+
+class StringifierBudget:
+    """Keeps track of the time spent in stringifiers while the debuggee is
+    stopped, to be compared against the ``stringifier_value_budget_ms`` and
+    ``stringifier_stop_budget_ms`` configuration settings. Either is
+    disabled if set to 0.
+
+    Stringifiers cannot be interrupted, so the budgets only take effect
+    after the fact: values whose stringifier took too long are shown by
+    type from then on, and once the time for a stop is used up, no further
+    (uncached) values are stringified until the debuggee has run again.
+    """
+
+    spent_ns: int
+
+    def __init__(self):
+        self.spent_ns = 0
+
+    def reset(self) -> None:
+        self.spent_ns = 0
+
+    def is_exhausted(self) -> bool:
+        # Do not globalize: cyclic import
+        from pudb.debugger import CONFIG
+
+        stop_budget_ms = CONFIG["stringifier_stop_budget_ms"]
+        return bool(stop_budget_ms) and self.spent_ns > stop_budget_ms * 10**6
+
+    def charge(self, elapsed_ns: int) -> bool:
+        """
+        :returns: whether *elapsed_ns* exceeds the budget for a single value.
+        """
+        # Do not globalize: cyclic import
+        from pudb.debugger import CONFIG
+
+        self.spent_ns += elapsed_ns
+        value_budget_ms = CONFIG["stringifier_value_budget_ms"]
+        return bool(value_budget_ms) and elapsed_ns > value_budget_ms * 10**6
+
+
+stringifier_budget = StringifierBudget()
+
+# }}}
+
+# }}}
+
+
+# {{{ attribute listing
+
+AttributeKind: TypeAlias = Literal["routine", "property"]
+
+ROUTINE_TYPES = (
+    staticmethod,
+    classmethod,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodDescriptorType,
+    types.WrapperDescriptorType,
+    types.ClassMethodDescriptorType,
+)
+
+# Data descriptors that only access the instance's storage
+STORAGE_DESCRIPTOR_TYPES = (
+    types.MemberDescriptorType,
+    types.GetSetDescriptorType,
+)
+
+
+def _get_attribute_kind(attr: object) -> AttributeKind | None:
+    """
+    :arg attr: an entry of a class ``__dict__``.
+    :returns: whether getting the attribute from an instance yields a
+        routine or runs code that may be expensive or have side effects, or
+        *None* if neither.
+    """
+    if isinstance(attr, ROUTINE_TYPES):
+        return "routine"
+
+    if isinstance(attr, (property, cached_property)):
+        return "property"
+
+    attr_type = type(attr)
+    if (hasattr(attr_type, "__get__") and hasattr(attr_type, "__set__")
+            and not isinstance(attr, STORAGE_DESCRIPTOR_TYPES)):
+        # e.g. ORM fields
+        return "property"
+
+    return None
+
+
+def _get_schema_fields(cls: type) -> list[str] | None:
+    """
+    :returns: the names of the fields of dataclasses, named tuples and classes
+        with ``__slots__``, or *None* for other classes.
+    """
+    if dataclasses.is_dataclass(cls):
+        return [field.name for field in dataclasses.fields(cls)]
+
+    if issubclass(cls, tuple) and isinstance(getattr(cls, "_fields", None), tuple):
+        return list(cls._fields)  # pyright: ignore[reportAttributeAccessIssue]
+
+    slots = []
+    for base in cls.__mro__:
+        base_slots = base.__dict__.get("__slots__", ())
+        if isinstance(base_slots, str):
+            base_slots = [base_slots]
+        slots.extend(name for name in base_slots
+                if name not in ["__dict__", "__weakref__"])
+    if slots:
+        return slots
+
+    return None
+
+
+@dataclass(frozen=True)
+class TypeAttributes:
+    """The attributes an instance of a class has by virtue of its class,
+    see :func:`get_type_attributes`.
+    """
+
+    # the names and attribute ids in the __dict__ of each class in the MRO,
+    # to detect changes
+    version: tuple[tuple[tuple[str, int], ...], ...]
+    # sorted
+    names: list[str]
+    kinds: dict[str, AttributeKind]
+
+
+def _get_type_attributes_version(cls: type) -> tuple[tuple[tuple[str, int], ...], ...]:
+    # Only ids are kept, holding on to the attributes could keep the class
+    # alive through the cache.
+    return tuple(
+            tuple((name, id(attr)) for name, attr in base.__dict__.items())
+            for base in cls.__mro__)
+
+
+class TypeAttributesCache:
+    """Results of :func:`get_type_attributes` per class.
+
+    Classes rarely change while the debuggee is stopped, so a result is
+    only checked against its class on first use after the debuggee ran,
+    see :meth:`forget_checks`.
+    """
+
+    entries: weakref.WeakKeyDictionary[type, TypeAttributes]
+    # classes whose entries were checked since the debuggee last ran
+    checked: weakref.WeakSet[type]
+
+    def __init__(self):
+        self.entries = weakref.WeakKeyDictionary()
+        self.checked = weakref.WeakSet()
+
+    def get(self, cls: type) -> TypeAttributes | None:
+        result = self.entries.get(cls)
+        if result is None or cls in self.checked:
+            return result
+
+        if result.version != _get_type_attributes_version(cls):
+            return None
+
+        self.checked.add(cls)
+        return result
+
+    def put(self, cls: type, result: TypeAttributes) -> None:
+        try:
+            self.entries[cls] = result
+        except TypeError:
+            # not weakly referenceable
+            return
+        self.checked.add(cls)
+
+    def forget_checks(self) -> None:
+        """Have entries checked against their classes again, e.g. once the
+        debuggee has had a chance to change them.
+        """
+        self.checked.clear()
+
+
+type_attributes_cache = TypeAttributesCache()
+
+
+def get_type_attributes(cls: type) -> TypeAttributes:
+    """
+    :returns: the attribute names and kinds of instances of *cls*, without
+        those in an instance's ``__dict__``. For dataclasses, named tuples
+        and classes with ``__slots__``, only their fields, routines and
+        properties are listed, rather than everything :func:`dir` finds.
+
+    Results are cached per class, until attributes are added to, removed
+    from or reassigned in one of the classes in its MRO, see
+    :class:`TypeAttributesCache`.
+    """
+    result = type_attributes_cache.get(cls)
+    if result is not None:
+        return result
+
+    mro = cls.__mro__
+    version = _get_type_attributes_version(cls)
+
+    kinds: dict[str, AttributeKind] = {}
+    for base in reversed(mro):
+        for name, attr in base.__dict__.items():
+            kind = _get_attribute_kind(attr)
+            if kind is None:
+                kinds.pop(name, None)
+            else:
+                kinds[name] = kind
+
+    fields = _get_schema_fields(cls)
+    if fields is None:
+        names = sorted(dir(cls))
+    else:
+        for name in fields:
+            kinds.pop(name, None)
+        names = sorted({*fields, *kinds})
+
+    result = TypeAttributes(version, names, kinds)
+    type_attributes_cache.put(cls, result)
+    return result
+
 # }}}
 
 
@@ -568,6 +1373,10 @@ class ValueWalker(ABC):
     EMPTY_LABEL: ClassVar[str] = "<empty>"
     CONTINUATION_LABEL: ClassVar[str] = "[...]"
 
+    # Whether values are compared against earlier stops, see
+    # :meth:`FrameVarInfo.record_fingerprint`.
+    TRACKS_CHANGES: ClassVar[bool] = True
+
     frame_var_info: FrameVarInfo
 
     def __init__(self, frame_var_info):
@@ -583,11 +1392,11 @@ class ValueWalker(ABC):
             ):
         pass
 
-    def add_continuation_item(self, parent: VariableWidget, id_path: str,
-                              count: int, length: int) -> bool:
+    def make_continuation_item(self, parent: VariableWidget, id_path: str,
+                              count: int, length: int) -> VariableWidget | None:
         """
         :arg length: the total length of the container. Negative if not known.
-        :returns: True if a continuation item ("[...]") was added, else False.
+        :returns: the continuation item ("[...]") if one was added, else None.
             If a continuation item was added, no further entries in the
             container should be added. If no continuation item was added,
             continue adding entries from the container.
@@ -599,60 +1408,113 @@ class ValueWalker(ABC):
                 omitted = f"{length - count}"
             else:
                 omitted = "some"
-            self.add_item(parent, self.CONTINUATION_LABEL,
+            return self.add_item(parent, self.CONTINUATION_LABEL,
                           f"<{omitted} items omitted, expand to see more>",
                           id_path=cont_id_path)
-            return True
-        return False
+        return None
 
-    def walk_container(self,
+    def add_continuation_item(self, parent: VariableWidget, id_path: str,
+                              count: int, length: int) -> bool:
+        """
+        :returns: True if a continuation item ("[...]") was added, else False.
+            See :meth:`make_continuation_item`.
+        """
+        return self.make_continuation_item(
+                parent, id_path, count, length) is not None
+
+    def iter_container(self,
                 parent: VariableWidget,
                 label: str | None,
                 value: object,
-                id_path: str | None = None):
+                id_path: str | None = None,
+                start: int = 0) -> Iterator[VariableWidget]:
+        """
+        :arg start: the position of the first entry to show.
+        """
         try:
             container_cls = next(cls for cls in CONTAINER_CLASSES
                                  if isinstance(value, cls))
         except StopIteration:
             # Not recognized as a container
-            return False
+            return
+
+        # Do not globalize: cyclic import
+        from pudb.debugger import CONFIG
 
+        page_size = max(CONFIG["container_page_size"], 1)
+
+        if start > 0:
+            yield self.add_item(parent, self.CONTINUATION_LABEL,
+                    f"<{start} items skipped, press '#' to go to another index>",
+                    id_path=f"{id_path}.skipped")
+
+        length = None
         is_empty = True
         for count, (entry_label, entry, id_path_ext) in enumerate(
-                container_cls.entries(value, label)):
+                container_cls.entries(value, label, start), start):
             is_empty = False
-            if count > 0 and count % 10 == 0:
-                try:
-                    length = container_cls.length(value)
-                except Exception:
-                    length = -1
-                if self.add_continuation_item(parent, id_path, count, length):
-                    return True
+            if count > start and (count - start) % page_size == 0:
+                if length is None:
+                    try:
+                        length = container_cls.length(value)
+                    except Exception:
+                        length = -1
+                cont_item = self.make_continuation_item(
+                        parent, id_path, count, length)
+                if cont_item is not None:
+                    yield cont_item
+                    return
 
             entry_id_path = f"{id_path}{id_path_ext}"
-            self.walk_value(parent,
+            yield from self.iter_value(parent,
                             "[{}]".format(entry_label if entry_label else ""),
                             entry, entry_id_path)
 
-        if is_empty:
-            self.add_item(parent, self.EMPTY_LABEL, None,
+        if is_empty and not start:
+            yield self.add_item(parent, self.EMPTY_LABEL, None,
                           id_path=f"{id_path}{self.EMPTY_LABEL}")
 
+    def walk_container(self,
+                parent: VariableWidget,
+                label: str | None,
+                value: object,
+                id_path: str | None = None):
+        if not isinstance(value, CONTAINER_CLASSES):
+            return False
+
+        for _ in self.iter_container(parent, label, value, id_path):
+            pass
+
         return True
 
-    def walk_attributes(self,
+    def iter_attributes(self,
                 parent: VariableWidget | None,
                 label: str | None,
                 value: object,
                 id_path: str,
-                iinfo: InspectInfo):
+                iinfo: InspectInfo) -> Iterator[VariableWidget]:
+        kinds: dict[str, AttributeKind] = {}
+        instance_dict = None
         try:
-            keys = dir(value)
+            cls = type(value)
+            if not isinstance(value, type) and cls.__dir__ is object.__dir__:
+                type_attrs = get_type_attributes(cls)
+                kinds = type_attrs.kinds
+
+                instance_dict = getattr(value, "__dict__", None)
+                if isinstance(instance_dict, dict) and instance_dict:
+                    keys = sorted({*type_attrs.names,
+                        *(key for key in instance_dict if isinstance(key, str))})
+                else:
+                    instance_dict = None
+                    keys = type_attrs.names
+            else:
+                keys = sorted(dir(value))
         except Exception:
             ui_log.exception(f"Failed to look up attributes on {label}")
             return
 
-        for key in sorted(keys):
+        for key in keys:
             if iinfo.access_level == "public":
                 if key.startswith("_"):
                     continue
@@ -660,6 +1522,23 @@ class ValueWalker(ABC):
                     and key.startswith("__") and key.endswith("__")):
                 continue
 
+            kind = kinds.get(key)
+            if instance_dict is not None and key in instance_dict:
+                # e.g. a computed cached_property
+                kind = None
+
+            if kind == "routine" and not iinfo.show_methods:
+                continue
+
+            attr_id_path = f"{id_path}.{key}"
+            if kind == "property" and not self.frame_var_info.get_inspect_info(
+                    attr_id_path, read_only=True).evaluate_property:
+                placeholder = self.add_item(parent, f".{key}",
+                        "<property, press enter to evaluate>", attr_id_path)
+                placeholder.unevaluated_property = True
+                yield placeholder
+                continue
+
             try:
                 with warnings.catch_warnings():
                     warnings.simplefilter("ignore")
@@ -669,17 +1548,74 @@ class ValueWalker(ABC):
             except Exception:
                 attr_value = WatchEvalError()
 
-            self.walk_value(parent,
-                    f".{key}", attr_value,
-                    f"{id_path}.{key}")
+            yield from self.iter_value(parent,
+                    f".{key}", attr_value, attr_id_path)
 
-    def walk_value(self,
+    def walk_attributes(self,
                 parent: VariableWidget | None,
-                label: str,
+                label: str | None,
                 value: object,
-                id_path: str | None = None,
-                attr_prefix: str | None = None):
-        if id_path is None:
+                id_path: str,
+                iinfo: InspectInfo):
+        for _ in self.iter_attributes(parent, label, value, id_path, iinfo):
+            pass
+
+    def stringify(self, value: object, id_path: str, iinfo: InspectInfo) -> str:
+        """Like ``get_stringifier(iinfo)(value)``, but using
+        :data:`stringifier_cache` and subject to :data:`stringifier_budget`.
+        If the stringifier for *value* takes too long, the display type for
+        *id_path* is switched to ``"type"``. Large strings are cut short, see
+        :func:`stringify_large_str`.
+        """
+        large_str = stringify_large_str(value, iinfo)
+        if large_str is not None:
+            return large_str
+
+        display_type = iinfo.display_type
+        if display_type in UNCACHED_DISPLAY_TYPES:
+            result = get_stringifier(iinfo)(value)
+            if iinfo.slow_display_type is not None:
+                # Do not globalize: cyclic import
+                from pudb.debugger import CONFIG
+                result += \
+                        f" (slow: >{CONFIG['stringifier_value_budget_ms']}ms)"
+            return result
+
+        result = stringifier_cache.get(value, display_type)
+        if result is not None:
+            return result
+
+        budgeted = not iinfo.ignore_time_budget
+        if budgeted and stringifier_budget.is_exhausted():
+            return f"{type_stringifier(value)} (slow: time for this stop used up)"
+
+        start_ns = perf_counter_ns()
+        result = get_stringifier(iinfo)(value)
+        too_slow = stringifier_budget.charge(perf_counter_ns() - start_ns)
+
+        # Even if it was too slow, keep the result to make retrying cheap.
+        stringifier_cache.put(value, display_type, result)
+
+        if budgeted and too_slow:
+            iinfo = self.frame_var_info.get_inspect_info(id_path, read_only=False)
+            iinfo.slow_display_type = display_type
+            iinfo.display_type = "type"
+            return self.stringify(value, id_path, iinfo)
+
+        return result
+
+    def iter_value(self,
+                parent: VariableWidget | None,
+                label: str,
+                value: object,
+                id_path: str | None = None,
+                attr_prefix: str | None = None) -> Iterator[VariableWidget]:
+        """Add items for *value* and, if it is expanded, its entries and
+        attributes, one at a time.
+
+        :yields: each item as it is added, in display order.
+        """
+        if id_path is None:
             assert label is not None
             id_path = label
 
@@ -687,7 +1623,7 @@ class ValueWalker(ABC):
         iinfo = self.frame_var_info.get_inspect_info(id_path, read_only=True)
 
         try:
-            displayed_value = get_stringifier(iinfo)(value)
+            displayed_value = self.stringify(value, id_path, iinfo)
         except Exception:
             # Unfortunately, anything can happen when calling str() or
             # repr() on a random object.
@@ -695,19 +1631,64 @@ class ValueWalker(ABC):
                             + f" (!! {iinfo.display_type} error !!)"
             ui_log.exception("stringifier failed")
 
+        if self.TRACKS_CHANGES and self.frame_var_info.stop_serial is not None:
+            # Across stops, cached strings are only reused for values that
+            # cannot have changed unnoticed, see StringifierCache.
+            fingerprint = hash((id(value), displayed_value,
+                    _get_stringifier_version(value)))
+            if (self.frame_var_info.record_fingerprint(id_path, fingerprint)
+                    and attr_prefix is None):
+                attr_prefix = "changed var"
+
         if iinfo.show_detail:
-            marker = iinfo.access_level[:3]
-            if iinfo.show_methods:
-                marker += "+()"
-            displayed_value += f" [{marker}]"
+            displayed_value += f" [{_get_detail_marker(iinfo)}]"
 
         new_parent_item = self.add_item(parent, label, displayed_value,
             id_path, attr_prefix)
+        if not isinstance(value, WatchEvalError):
+            new_parent_item.value = value
+
+        if parent is None:
+            # Do not globalize: cyclic import
+            from pudb.debugger import CONFIG
+
+            if CONFIG["show_variable_sizes"]:
+                size = deep_size_cache.get_within_budget(value)
+                new_parent_item.size_str = "?" if size is None else size.format()
+
+        yield new_parent_item
 
         if iinfo.show_detail:
-            if isinstance(value, CONTAINER_CLASSES):
-                self.walk_container(new_parent_item, label, value, id_path)
-            self.walk_attributes(new_parent_item, label, value, id_path, iinfo)
+            yield from self.iter_details(
+                    new_parent_item, label, value, id_path, iinfo)
+
+    def iter_details(self,
+                parent: VariableWidget,
+                label: str,
+                value: object,
+                id_path: str,
+                iinfo: InspectInfo) -> Iterator[VariableWidget]:
+        """Add the items shown for the expanded *value* below *parent*."""
+        if isinstance(value, CONTAINER_CLASSES):
+            yield from self.iter_container(
+                    parent, label, value, id_path, iinfo.page_start)
+        yield from self.iter_attributes(parent, label, value, id_path, iinfo)
+
+    def walk_value(self,
+                parent: VariableWidget | None,
+                label: str,
+                value: object,
+                id_path: str | None = None,
+                attr_prefix: str | None = None):
+        for _ in self.iter_value(parent, label, value, id_path, attr_prefix):
+            pass
+
+
+def _get_detail_marker(iinfo: InspectInfo) -> str:
+    marker = iinfo.access_level[:3]
+    if iinfo.show_methods:
+        marker += "+()"
+    return marker
 
 
 class BasicValueWalker(ValueWalker):
@@ -727,6 +1708,24 @@ class BasicValueWalker(ValueWalker):
         return new_item
 
 
+class ItemMakingValueWalker(ValueWalker):
+    """Creates items without keeping track of them, for use with
+    :meth:`ValueWalker.iter_value`.
+    """
+
+    def __init__(self, frame_var_info, watch_expr=None):
+        ValueWalker.__init__(self, frame_var_info)
+        self.watch_expr = watch_expr
+
+    def add_item(self, parent, var_label, value_str, id_path, attr_prefix=None):
+        iinfo = self.frame_var_info.get_inspect_info(id_path, read_only=True)
+        if iinfo.highlighted:
+            attr_prefix = "highlighted var"
+
+        return VariableWidget(parent, var_label, value_str, id_path,
+            attr_prefix, watch_expr=self.watch_expr, iinfo=iinfo)
+
+
 class WatchValueWalker(ValueWalker):
     def __init__(self, frame_var_info, widget_list, watch_expr):
         ValueWalker.__init__(self, frame_var_info)
@@ -744,6 +1743,21 @@ class WatchValueWalker(ValueWalker):
         return new_item
 
 
+class _ValueCollectingWalker(ValueWalker):
+    """Walks values like :class:`ItemMakingValueWalker`, but without
+    stringifying them, to find out which values would be shown.
+    """
+
+    TRACKS_CHANGES: ClassVar[bool] = False
+
+    @override
+    def stringify(self, value: object, id_path: str, iinfo: InspectInfo) -> str:
+        return ""
+
+    def add_item(self, parent, var_label, value_str, id_path, attr_prefix=None):
+        return VariableWidget(parent, var_label, value_str, id_path, attr_prefix)
+
+
 class TopAndMainVariableWalker(ValueWalker):
     def __init__(self, frame_var_info: FrameVarInfo):
         ValueWalker.__init__(self, frame_var_info)
@@ -751,37 +1765,17 @@ class TopAndMainVariableWalker(ValueWalker):
         self.main_widget_list = []
         self.top_widget_list = []
 
-        self.top_id_path_prefixes = []
-
-    @staticmethod
-    def _should_repeat_at_top(id_path: str | None, tipp: str) -> bool:
-        """
-        :return: True if the id_path is a child path of tipp
-        """
-        if id_path is None:
-            return False
-        if id_path == tipp:
-            return True
-
-        # Perhaps it's a child of the top-level path
-        before, sep, after = id_path.partition(tipp)
-        return (before == ""
-                and sep == tipp
-                and len(after) > 0
-                and after[0] in ".<[")
+        # Widgets in the main list that are repeated at the top. A path is
+        # repeated if it is marked as such or its parent is.
+        self.repeated_widgets: set[VariableWidget] = set()
 
     def add_item(self, parent, var_label, value_str, id_path, attr_prefix=None):
         iinfo = self.frame_var_info.get_inspect_info(id_path, read_only=True)
         if iinfo.highlighted:
             attr_prefix = "highlighted var"
 
-        repeated_at_top = iinfo.repeated_at_top
-        if repeated_at_top and id_path is not None:  # pyright: ignore[reportUnnecessaryComparison]
-            self.top_id_path_prefixes.append(id_path)
-
-        for tipp in self.top_id_path_prefixes:
-            if self._should_repeat_at_top(id_path, tipp):
-                repeated_at_top = True
+        repeated_at_top = (iinfo.repeated_at_top
+                or (parent is not None and parent in self.repeated_widgets))
 
         if repeated_at_top:
             self.top_widget_list.append(VariableWidget(parent, var_label,
@@ -790,75 +1784,1524 @@ class TopAndMainVariableWalker(ValueWalker):
         new_item = VariableWidget(parent, var_label, value_str, id_path,
             attr_prefix, iinfo=iinfo)
         self.main_widget_list.append(new_item)
+        if repeated_at_top:
+            self.repeated_widgets.add(new_item)
         return new_item
 
 # }}}
 
 
+# {{{ search
+
+@dataclass(frozen=True, eq=False)
+class VarSearchEntry:
+    """A value in the variables view, whether or not its row is shown."""
+
+    # of the value's row, see ValueWalker
+    id_path: str
+    # of the value's row, e.g. "x", "['key']" or ".attr"
+    label: str
+    value: object
+    # for the container or object the value belongs to
+    parent: VarSearchEntry | None
+    # The position of the value among the entries of its container, *None*
+    # for variables and attributes.
+    index: int | None
+
+    def get_path_label(self) -> str:
+        """
+        :returns: e.g. ``"config['users'][3].user_id"``
+        """
+        labels = []
+        entry: VarSearchEntry | None = self
+        while entry is not None:
+            labels.append(entry.label)
+            entry = entry.parent
+        return "".join(reversed(labels))
+
+
+def _is_searched_into(value: object) -> bool:
+    return not (type(value) in IMMUTABLE_TYPES
+            or isinstance(value, (type, types.ModuleType))
+            or inspect.isroutine(value))
+
+
+class VarSearchIndex:
+    """The values in the variables view of a frame, including those in
+    collapsed rows, for :class:`VarSearch`.
+
+    Values are found by a breadth-first walk of at most *max_depth* levels
+    below the variables, taking at most *max_container_entries* entries or
+    attributes from each value. The walk stops after *max_entries* values
+    or *time_limit_ns* nanoseconds. Attributes are only taken from instance
+    dictionaries, so that no properties are evaluated.
+
+    The variables are those of the view, see :func:`iter_var_view`: the
+    locals, then those in the "Closure" and "Globals" sections. Entries for
+    the latter have the entry for the section as their parent, which is not
+    in :attr:`entries` itself.
+    """
+
+    entries: list[VarSearchEntry]
+    # Stringified values of the first entries, see :meth:`stringify_values`
+    value_strs: list[str]
+    # False if the walk was cut short by the entry or time limit
+    complete: bool
+
+    def __init__(self,
+                frame_var_info: FrameVarInfo,
+                locals: dict[str, object],
+                globals: dict[str, object] | None = None,
+                closure_names: Iterable[str] = (),
+                max_depth: int = 4,
+                max_entries: int = 100_000,
+                max_container_entries: int = 1000,
+                time_limit_ns: int = 200 * 10**6):
+        self.frame_var_info = frame_var_info
+        self.entries = []
+        self.value_strs = []
+        self.complete = True
+        # Stringifies like the view does, see :meth:`stringify_values`.
+        self._walker = ItemMakingValueWalker(frame_var_info)
+
+        from collections import deque
+        deadline_ns = perf_counter_ns() + time_limit_ns
+
+        queue: deque[tuple[VarSearchEntry, int]] = deque()
+
+        def add_variable(id_path, label, value, parent):
+            entry = VarSearchEntry(id_path, label, value, parent, None)
+            self.entries.append(entry)
+            queue.append((entry, 0))
+
+        closure_vars = {var for var in closure_names if var in locals}
+        for var in sorted(locals, key=str.lower):
+            if ((var.startswith("__") and var.endswith("__"))
+                    or var in closure_vars):
+                continue
+            add_variable(var, var, locals[var], None)
+
+        if closure_vars:
+            section = VarSearchEntry(CLOSURE_ID_PATH, "", None, None, None)
+            for var in sorted(closure_vars, key=str.lower):
+                add_variable(var, var, locals[var], section)
+
+        if globals and globals is not locals:
+            section = VarSearchEntry(GLOBALS_ID_PATH, "", globals, None, None)
+            for name in sorted(globals, key=str.lower):
+                if not (name.startswith("__") and name.endswith("__")):
+                    add_variable(f"{GLOBALS_ID_PATH}.{name}", name,
+                            globals[name], section)
+
+        walked_ids = set()
+        while queue:
+            entry, depth = queue.popleft()
+            if (depth >= max_depth
+                    or not _is_searched_into(entry.value)
+                    or id(entry.value) in walked_ids):
+                continue
+            walked_ids.add(id(entry.value))
+
+            for child in self._get_children(entry, max_container_entries):
+                if (len(self.entries) >= max_entries
+                        or perf_counter_ns() > deadline_ns):
+                    self.complete = False
+                    return
+                self.entries.append(child)
+                queue.append((child, depth + 1))
+
+    @staticmethod
+    def _get_children(entry: VarSearchEntry,
+                max_count: int) -> list[VarSearchEntry]:
+        value = entry.value
+        children = []
+        try:
+            for container_cls in CONTAINER_CLASSES:
+                if isinstance(value, container_cls):
+                    for index, (entry_label, child, id_path_ext) in enumerate(
+                            islice(container_cls.entries(value, entry.label),
+                                max_count)):
+                        children.append(VarSearchEntry(
+                            f"{entry.id_path}{id_path_ext}",
+                            f"[{entry_label or ''}]", child, entry, index))
+                    break
+
+            # Like ValueWalker.iter_attributes, without dir()
+            instance_dict = None
+            if type(value).__dir__ is object.__dir__:
+                instance_dict = getattr(value, "__dict__", None)
+            if isinstance(instance_dict, dict):
+                for key, child in islice(instance_dict.items(), max_count):
+                    if isinstance(key, str) and not inspect.isroutine(child):
+                        children.append(VarSearchEntry(
+                            f"{entry.id_path}.{key}", f".{key}",
+                            child, entry, None))
+        except Exception:
+            ui_log.exception(f"Failed to search {entry.get_path_label()}")
+
+        return children
+
+    def stringify_values(self, deadline_ns: int) -> None:
+        """Stringify the values of further entries into :attr:`value_strs`,
+        as they would be shown, until *deadline_ns* (a
+        :func:`time.perf_counter_ns` value).
+
+        Stringifiers cannot be interrupted, but as in the view, results are
+        cached, and slow values are subject to :data:`stringifier_budget`
+        and shown by type from then on.
+        """
+        entries = self.entries
+        value_strs = self.value_strs
+        while len(value_strs) < len(entries):
+            if perf_counter_ns() > deadline_ns:
+                return
+
+            entry = entries[len(value_strs)]
+            iinfo = self.frame_var_info.get_inspect_info(
+                    entry.id_path, read_only=True)
+            try:
+                value_strs.append(self._walker.stringify(
+                        entry.value, entry.id_path, iinfo))
+            except Exception:
+                value_strs.append("")
+
+
+class VarSearch:
+    """The positions of the entries of *index* that match *query* by label
+    or stringified value, in :attr:`matches`. The search is case-sensitive
+    only if *query* contains upper-case letters.
+
+    Label matches are found right away. Value matches are added by
+    :meth:`update`, as values get stringified.
+    """
+
+    matches: list[int]
+
+    def __init__(self, index: VarSearchIndex, query: str):
+        self.index = index
+        self.query = query
+        self.case_sensitive = query.lower() != query
+
+        self.matches = [i for i, entry in enumerate(index.entries)
+                if self._matches(entry.label)]
+        # Number of entries whose value was checked
+        self._values_checked = 0
+
+    def _matches(self, text: str) -> bool:
+        if not self.case_sensitive:
+            text = text.lower()
+        return self.query in text
+
+    def is_complete(self) -> bool:
+        return self._values_checked == len(self.index.entries)
+
+    def update(self, deadline_ns: int) -> bool:
+        """Look for value matches until *deadline_ns* (a
+        :func:`time.perf_counter_ns` value).
+
+        :returns: whether any were found
+        """
+        from bisect import bisect_left
+
+        self.index.stringify_values(deadline_ns)
+
+        value_strs = self.index.value_strs
+        found = False
+        for i in range(self._values_checked, len(value_strs)):
+            if self._matches(value_strs[i]):
+                pos = bisect_left(self.matches, i)
+                if pos == len(self.matches) or self.matches[pos] != i:
+                    self.matches.insert(pos, i)
+                    found = True
+        self._values_checked = len(value_strs)
+
+        return found
+
+
+def _reveal_global(frame_var_info: FrameVarInfo, iinfo: InspectInfo,
+            name: str, globals: dict[str, object]) -> None:
+    """Adjust the "Globals" section's inspection state *iinfo* so that the
+    global *name* is shown, expanding continuation items as needed.
+    """
+    if name.startswith("__") and name.endswith("__"):
+        iinfo.access_level = "all"
+    elif name.startswith("_") and iinfo.access_level == "public":
+        iinfo.access_level = "private"
+    if _is_definition(globals.get(name)):
+        iinfo.show_methods = True
+
+    # Do not globalize: cyclic import
+    from pudb.debugger import CONFIG
+
+    page_size = max(CONFIG["container_page_size"], 1)
+    for position, shown_name in enumerate(
+            _iter_shown_global_names(globals, iinfo)):
+        if position and position % page_size == 0:
+            frame_var_info.get_inspect_info(
+                    f"{GLOBALS_ID_PATH}.cont-{position}", read_only=False) \
+                    .show_detail = True
+        if shown_name == name:
+            break
+
+
+def reveal_search_entry(frame_var_info: FrameVarInfo, entry: VarSearchEntry) -> None:
+    """Expand the rows containing *entry*, going to its page in containers
+    and showing private attributes as needed, so that its row is shown.
+    """
+    # Do not globalize: cyclic import
+    from pudb.debugger import CONFIG
+
+    page_size = max(CONFIG["container_page_size"], 1)
+
+    child = entry
+    parent = entry.parent
+    while parent is not None:
+        iinfo = frame_var_info.get_inspect_info(parent.id_path, read_only=False)
+        iinfo.show_detail = True
+
+        if parent.id_path == GLOBALS_ID_PATH:
+            _reveal_global(frame_var_info, iinfo, child.label,
+                    cast("dict[str, object]", parent.value))
+        elif parent.id_path == CLOSURE_ID_PATH:
+            pass
+        elif child.index is not None:
+            if not (iinfo.page_start <= child.index
+                    < iinfo.page_start + page_size):
+                iinfo.page_start = child.index if child.index >= page_size else 0
+        else:
+            name = child.label[1:]
+            if name.startswith("__") and name.endswith("__"):
+                iinfo.access_level = "all"
+            elif name.startswith("_") and iinfo.access_level == "public":
+                iinfo.access_level = "private"
+
+        child = parent
+        parent = parent.parent
+
+# }}}
+
+
+# {{{ export
+
+def _iter_mapping_items(mapping: PudbMapping) -> Iterator[tuple[object, object]]:
+    try:
+        for key in mapping:
+            yield key, mapping[key]  # pyright: ignore[reportIndexIssue]
+    except Exception as error:
+        ui_log.error(f"Object with id {id(mapping):#x} appears to be a mapping, "
+                     f"but does not behave like one: {error}")
+
+
+class JSONExporter:
+    """Turns a value into JSON text, a chunk at a time, so that large values
+    can be written out without building the document in memory.
+
+    Mappings become objects and other containers (see
+    :data:`CONTAINER_CLASSES`) become arrays. Other objects become objects
+    of the attributes in their instance dictionary, with their type under
+    ``"__type__"``. Values JSON cannot represent, and containers more than
+    *max_depth* levels down, are written as the string *stringifier* makes
+    of them.
+
+    Once *max_values* values or about *max_bytes* bytes were written, the
+    remaining entries of each open container are replaced by a single
+    :attr:`TRUNCATION_MARKER`, so that the text stays valid JSON.
+    """
+
+    TRUNCATION_MARKER: ClassVar[str] = "..."
+
+    # Number of bytes written, the text is ASCII-only
+    nbytes: int
+    value_count: int
+    # The limits that were hit: "depth", "values" or "bytes"
+    truncated: set[str]
+
+    def __init__(self,
+                stringifier: Callable[[object], str] = repr,
+                max_depth: int = 10,
+                max_values: int = 100_000,
+                max_bytes: int = 16 * 1024**2,
+                indent: int | None = None):
+        self.stringifier = stringifier
+        self.max_depth = max_depth
+        self.max_values = max_values
+        self.max_bytes = max_bytes
+        self.indent = indent
+
+        self.nbytes = 0
+        self.value_count = 0
+        self.truncated = set()
+        # of the containers being written, to stop at cycles
+        self._open_ids: set[int] = set()
+
+    def _is_full(self) -> bool:
+        if self.value_count >= self.max_values:
+            self.truncated.add("values")
+            return True
+        if self.nbytes >= self.max_bytes:
+            self.truncated.add("bytes")
+            return True
+        return False
+
+    def _count(self, text: str) -> str:
+        self.nbytes += len(text)
+        return text
+
+    def _dump_str(self, s: str) -> str:
+        max_len = max(self.max_bytes - self.nbytes, 0)
+        # Escaped, the text is at least as long as the string.
+        text = json.dumps(s[:max_len + 1])
+        if len(text) - 2 <= max_len:
+            return text
+
+        # Find the longest start of the string that fits when escaped.
+        self.truncated.add("bytes")
+        lo, hi = 0, min(len(s), max_len)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if len(json.dumps(s[:mid])) - 2 <= max_len:
+                lo = mid
+            else:
+                hi = mid - 1
+        return json.dumps(s[:lo] + self.TRUNCATION_MARKER)
+
+    def _dump_key(self, key: object) -> str:
+        if not isinstance(key, str):
+            key = PudbMapping._safe_key_repr(key)  # pyright: ignore[reportPrivateUsage]
+        return self._dump_str(key)
+
+    def _stringify(self, value: object) -> str:
+        try:
+            s = str(self.stringifier(value))
+        except Exception:
+            s = f"!! stringifier error on object with id: {id(value):#x} !!"
+        return self._dump_str(s)
+
+    def _get_members(self, value: object
+            ) -> tuple[bool, Iterable[tuple[object, object]]] | None:
+        """
+        :returns: whether *value* is written as an object and its
+            ``(key, member)`` pairs, or *None* if it is written as a string.
+        """
+        if (not _is_searched_into(value)
+                or isinstance(value, (bytearray, memoryview))):
+            return None
+
+        if isinstance(value, PudbMapping):
+            return True, _iter_mapping_items(value)
+        for container_cls in (PudbSequence, PudbCollection):
+            if isinstance(value, container_cls):
+                return False, (
+                        (None, entry) for _, entry, _
+                        in container_cls.entries(value, None))
+
+        # Like VarSearchIndex, without evaluating properties
+        instance_dict = None
+        if type(value).__dir__ is object.__dir__:
+            instance_dict = getattr(value, "__dict__", None)
+        if not isinstance(instance_dict, dict) or not instance_dict:
+            return None
+
+        cls = type(value)
+        return True, [
+                ("__type__", f"{cls.__module__}.{cls.__qualname__}"),
+                *((key, member) for key, member in instance_dict.items()
+                    if isinstance(key, str) and not inspect.isroutine(member))]
+
+    def _get_newline(self, depth: int) -> str:
+        if self.indent is None:
+            return ""
+        return "\n" + " " * (self.indent * depth)
+
+    def iter_chunks(self, value: object, depth: int = 0) -> Iterator[str]:
+        """
+        :yield: the JSON text for *value*, in chunks.
+        """
+        self.value_count += 1
+
+        if value is None or isinstance(value, (bool, int, float)):
+            try:
+                yield self._count(json.dumps(value, allow_nan=False))
+            except ValueError:
+                # nan and infinities
+                yield self._count(self._stringify(value))
+            return
+        if isinstance(value, str):
+            yield self._count(self._dump_str(value))
+            return
+
+        members = None
+        if id(value) not in self._open_ids:
+            members = self._get_members(value)
+        if members is not None and depth >= self.max_depth:
+            self.truncated.add("depth")
+            members = None
+        if members is None:
+            yield self._count(self._stringify(value))
+            return
+
+        is_object, items = members
+        marker = json.dumps(self.TRUNCATION_MARKER)
+        if is_object:
+            opening, closing = "{", "}"
+            marker = f"{marker}: {marker}"
+        else:
+            opening, closing = "[", "]"
+
+        self._open_ids.add(id(value))
+        yield self._count(opening)
+
+        separator = self._get_newline(depth + 1)
+        is_empty = True
+        for key, member in items:
+            is_empty = False
+            if self._is_full():
+                yield self._count(separator + marker)
+                break
+
+            if is_object:
+                yield self._count(f"{separator}{self._dump_key(key)}: ")
+            else:
+                yield self._count(separator)
+            yield from self.iter_chunks(member, depth + 1)
+            separator = "," + (self._get_newline(depth + 1) or " ")
+
+        if not is_empty:
+            yield self._count(self._get_newline(depth))
+        yield self._count(closing)
+        self._open_ids.discard(id(value))
+
+    def iter_lines(self, value: object) -> Iterator[str]:
+        """
+        :yield: the entries of *value* as JSON Lines, in chunks: one
+            single-member object per line for mappings, one value per line
+            for other containers, otherwise a single line for *value*.
+        """
+        members = self._get_members(value)
+        if members is None:
+            yield from self.iter_chunks(value)
+            yield self._count("\n")
+            return
+
+        is_object, items = members
+        self._open_ids.add(id(value))
+        for key, member in items:
+            if self._is_full():
+                yield self._count(json.dumps(self.TRUNCATION_MARKER) + "\n")
+                break
+
+            if is_object:
+                yield self._count(f"{{{self._dump_key(key)}: ")
+            yield from self.iter_chunks(member, depth=1)
+            yield self._count("}\n" if is_object else "\n")
+        self._open_ids.discard(id(value))
+
+
+def export_value(value: object, filename: str, lines: bool = False,
+            **kwargs: Any) -> JSONExporter:
+    """Write *value* to the file *filename* as JSON, or as JSON Lines if
+    *lines* is true. *kwargs* are passed to :class:`JSONExporter`.
+
+    :returns: the exporter, for its statistics
+    """
+    exporter = JSONExporter(**kwargs)
+    chunks = exporter.iter_lines(value) if lines else exporter.iter_chunks(value)
+    with open(filename, "w", encoding="ascii") as outf:
+        outf.writelines(chunks)
+        if not lines:
+            outf.write("\n")
+
+    return exporter
+
+# }}}
+
+
 # {{{ top level
 
 SEPARATOR = urwid.AttrMap(urwid.Text(""), "variable separator")
 
+# Types whose instances always stringify and expand the same way, so that
+# their widgets can be reused as long as the variable refers to the same
+# object.
+IMMUTABLE_TYPES = frozenset([
+    type(None),
+    bool,
+    int,
+    float,
+    complex,
+    str,
+    bytes,
+])
+
 
-def make_var_view(
+def _get_view_state_token(frame_var_info: FrameVarInfo) -> Hashable:
+    # Do not globalize: cyclic import
+    from pudb.debugger import CONFIG
+
+    return (
+            frame_var_info.state_version,
+            CONFIG["stringifier"],
+            CONFIG["custom_stringifier"],
+            CONFIG["default_variables_access_level"],
+            CONFIG["wrap_variables"],
+            CONFIG["show_variable_sizes"],
+            CONFIG["sort_variables_by_size"],
+            )
+
+
+@dataclass
+class _VarViewCacheEntry:
+    # A reference to the value, made weak or dropped while the debuggee
+    # runs, see :meth:`VarViewCache.release_values`.
+    get_value: Callable[[], object] | None
+    value_id: int
+    version: StringifierVersion
+    widgets: list[VariableWidget]
+    # For expanded values, the values of the rows after the first, see
+    # :func:`_get_subtree_values`.
+    subtree_values: tuple[object, ...] | None
+
+    def matches(self, frame_var_info: FrameVarInfo, var: str, value: object
+            ) -> bool:
+        if self.subtree_values is None:
+            return (self.get_value is not None
+                    and _refers_to(self.get_value, value))
+
+        if (id(value) != self.value_id
+                or (self.get_value is not None
+                    and not _refers_to(self.get_value, value))
+                or _get_stringifier_version(value) != self.version):
+            return False
+
+        subtree_values = _get_subtree_values(frame_var_info, var, value)
+        return (len(subtree_values) == len(self.subtree_values)
+                and all(new is old for new, old in zip(
+                    subtree_values, self.subtree_values)))
+
+
+class VarViewCache:
+    """Widgets built for the top-level variables of one frame by earlier calls
+    to :func:`iter_var_view`, to be reused if the variables still refer to
+    the same objects.
+
+    Only variables whose display cannot change without the variable being
+    rebound are cached, see :func:`_is_reusable`, and expanded ones whose
+    rows can be checked without stringifying them, see
+    :func:`_get_reusable_subtree_values`. Other variables are walked again,
+    though most of the stringified values in them are then found in
+    :data:`stringifier_cache`.
+
+    While the debuggee runs, the values are only referred to weakly, or not
+    at all, see :meth:`release_values`.
+    """
+
+    # Immutable values up to this size are held on to while the debuggee
+    # runs, others are dropped.
+    MAX_HELD_SIZE: ClassVar[int] = 4096
+
+    # Total size of the immutable values in the rows of an expanded
+    # variable up to which they are held on to to check its rows.
+    MAX_HELD_SUBTREE_SIZE: ClassVar[int] = 64 * 1024
+
+    state_token: Hashable
+    var_names: tuple[str, ...]
+    sorted_var_names: list[str]
+
+    entries: dict[str, _VarViewCacheEntry]
+
+    def __init__(self):
+        self.state_token = None
+        self.var_names = ()
+        self.sorted_var_names = []
+        self.entries = {}
+
+    def release_values(self) -> None:
+        """Drop the references to the debuggee's objects before it runs:
+        those of the widgets, see :attr:`VariableWidget.value`, and those of
+        the entries, which are made weak or dropped. Entries for collapsed
+        values are dropped along with their references, those for expanded
+        ones are checked by their rows, see :func:`_get_subtree_values`.
+        """
+        for var, entry in list(self.entries.items()):
+            for widget in entry.widgets:
+                widget.value = VariableWidget.NO_VALUE
+            if entry.get_value is None or isinstance(entry.get_value, weakref.ref):
+                continue
+
+            value = entry.get_value()
+            if (type(value) in IMMUTABLE_TYPES
+                    and sys.getsizeof(value) <= self.MAX_HELD_SIZE):
+                continue
+
+            try:
+                entry.get_value = weakref.ref(value)
+            except TypeError:
+                if entry.subtree_values is None:
+                    del self.entries[var]
+                else:
+                    entry.get_value = None
+
+
+def _refers_to(get_value: Callable[[], object], value: object) -> bool:
+    # A dead weak reference returns None, which is never weakly referenced.
+    return get_value() is value and not (
+            value is None and isinstance(get_value, weakref.ref))
+
+
+def _is_reusable(value: object, iinfo: InspectInfo) -> bool:
+    """
+    :returns: whether the row for the collapsed *value* can be reused as
+        long as the variable refers to the same object.
+    """
+    if iinfo.show_detail:
+        return False
+
+    return (type(value) in IMMUTABLE_TYPES
+            or iinfo.display_type in ["type", "id"])
+
+
+# Built-in containers, which stringify by their entries alone.
+BUILTIN_CONTAINER_TYPES = frozenset([dict, list, tuple, set, frozenset])
+
+
+def _get_subtree_values(
+            frame_var_info: FrameVarInfo, var: str, value: object
+        ) -> tuple[object, ...]:
+    """
+    :returns: the values of the rows shown below the expanded variable
+        *var*, found without stringifying them.
+    """
+    iinfo = frame_var_info.get_inspect_info(var, read_only=True)
+    walker = _ValueCollectingWalker(frame_var_info)
+    parent = VariableWidget(None, var, None, var)
+    return tuple(widget.value
+            for widget in walker.iter_details(parent, var, value, var, iinfo))
+
+
+def _get_reusable_subtree_values(
+            value: object, iinfo: InspectInfo, widgets: list[VariableWidget]
+        ) -> tuple[object, ...] | None:
+    """
+    :arg widgets: the rows shown for the expanded *value*.
+    :returns: the values of the rows after the first, if the rows can be
+        reused as long as these are the same objects, else *None*. That is
+        the case if they are small immutable values, shown in full, and
+        how *value* itself stringifies only depends on them, or on its
+        ``pudb_mutation_count``.
+    """
+    if not iinfo.show_detail or iinfo.page_start:
+        return None
+
+    if not (type(value) in BUILTIN_CONTAINER_TYPES
+            or _get_stringifier_version(value)[0] is not None
+            or iinfo.display_type in ["type", "id"]):
+        return None
+
+    subtree_values = tuple(widget.value for widget in widgets[1:])
+    size = 0
+    for widget, subtree_value in zip(widgets[1:], subtree_values):
+        if widget.var_label == ValueWalker.CONTINUATION_LABEL:
+            return None
+        if subtree_value is not VariableWidget.NO_VALUE:
+            if type(subtree_value) not in IMMUTABLE_TYPES:
+                return None
+            size += sys.getsizeof(subtree_value)
+
+    if size > VarViewCache.MAX_HELD_SUBTREE_SIZE:
+        return None
+
+    return subtree_values
+
+
+# Time spent computing sizes to sort the variables by, per view update.
+SIZE_SORT_TIME_LIMIT_NS = 200 * 10**6
+
+
+def _sort_by_size(vars: list[str], values: dict[str, object]) -> list[str]:
+    """
+    :returns: *vars* sorted by the size of their values, largest first.
+        Sizes are computed for at most :data:`SIZE_SORT_TIME_LIMIT_NS`, and
+        within the time budget of :data:`~pudb.tracing.deep_size_cache`.
+        The variables whose sizes are not known by then are put at the end,
+        in their original order. The limit may be overshot by the time limit
+        of one :func:`~pudb.tracing.get_deep_size` call.
+    """
+    deadline_ns = perf_counter_ns() + SIZE_SORT_TIME_LIMIT_NS
+
+    sized = []
+    unsized = []
+    for var in vars:
+        value = values[var]
+        size = deep_size_cache.peek(value)
+        if size is None and perf_counter_ns() < deadline_ns:
+            size = deep_size_cache.get_within_budget(value)
+
+        if size is None:
+            unsized.append(var)
+        else:
+            sized.append((size.nbytes, var))
+
+    sized.sort(key=lambda entry: entry[0], reverse=True)
+    return [var for _, var in sized] + unsized
+
+
+def get_id_path_root(id_path: str) -> RowRoot:
+    """
+    :returns: the :data:`RowRoot` of the row *id_path* is shown in or under.
+        Closure variables have the same id paths as locals.
+    """
+    if id_path in (GLOBALS_ID_PATH, CLOSURE_ID_PATH):
+        return (id_path, None)
+
+    section = None
+    if id_path.startswith(f"{GLOBALS_ID_PATH}."):
+        section = GLOBALS_ID_PATH
+        id_path = id_path[len(GLOBALS_ID_PATH) + 1:]
+
+    import re
+    return (section, re.split(r"[.<\[]", id_path, maxsplit=1)[0])
+
+
+class WatchSkipped:
+    """Returned by :func:`evaluate_watch` for watches that were not
+    evaluated.
+    """
+
+
+def evaluate_watch(
             frame_var_info: FrameVarInfo,
+            watch_expr: WatchExpression,
+            globals: dict[str, object],
             locals: dict[str, object],
-            globals: dict[str, object]
-        ):
-    vars = list(locals.keys())
-    vars.sort(key=str.lower)
+        ) -> object:
+    """Evaluate *watch_expr* unless its previous evaluation went over the
+    time budget (see :class:`WatchState`).
 
-    tmv_walker = TopAndMainVariableWalker(frame_var_info)
-    ret_walker = BasicValueWalker(frame_var_info)
-    watch_widget_list = []
+    :returns: the value, a :class:`WatchEvalError` if evaluation failed,
+        or a :class:`WatchSkipped` if the watch was not evaluated.
+    """
+    # Do not globalize: cyclic import
+    from pudb.debugger import CONFIG
 
-    for watch_expr in frame_var_info.watches:
-        try:
-            value = eval(watch_expr.expression, globals, locals)
-        except Exception:
-            value = WatchEvalError()
+    state = frame_var_info.watch_states.setdefault(
+            watch_expr.expression, WatchState())
+    if state.slow and not (watch_expr.pinned or state.force_evaluation):
+        return WatchSkipped()
+    state.force_evaluation = False
+
+    start_ns = perf_counter_ns()
+    try:
+        value = eval(watch_expr.code, globals, locals)
+    except Exception:
+        value = WatchEvalError()
+    end_ns = perf_counter_ns()
+
+    budget_ns = CONFIG["watch_budget_ms"] * 10**6
+    state.slow = bool(budget_ns) and end_ns - start_ns > budget_ns
+    if not isinstance(value, WatchEvalError):
+        state.evaluated_ns = end_ns
+
+    return value
+
+
+def _make_stale_watch_widget(
+            state: WatchState, watch_expr: WatchExpression, note: str
+        ) -> VariableWidget:
+    """
+    :returns: the row for a watch showing its last good value, if any, with
+        its age, and *note* on why it is not current.
+    """
+    from pudb.tracing import format_duration_ns
+
+    if state.value_str is None or state.evaluated_ns is None:
+        value_str = f"<not evaluated> ({note})"
+    else:
+        age = format_duration_ns(perf_counter_ns() - state.evaluated_ns)
+        value_str = f"{state.value_str} ({note}, from {age} ago)"
+
+    return VariableWidget(None, watch_expr.expression, value_str,
+            watch_expr.expression, watch_expr=watch_expr)
+
+
+# {{{ globals and closure sections
+
+GLOBALS_ID_PATH = "<globals>"
+CLOSURE_ID_PATH = "<closure>"
+
+
+def _is_definition(value: object) -> bool:
+    return (inspect.ismodule(value) or isinstance(value, type)
+            or inspect.isroutine(value))
+
+
+def _iter_shown_global_names(
+            globals: dict[str, object],
+            iinfo: InspectInfo,
+        ) -> Iterator[str]:
+    """Yield the names shown in the expanded "Globals" section with the
+    inspection state *iinfo*, in order.
+
+    Names are filtered by the section's access level like attributes are.
+    Modules, classes and functions are only shown along with methods.
+    """
+    for name in sorted(globals, key=str.lower):
+        if iinfo.access_level == "public":
+            if name.startswith("_"):
+                continue
+        elif (iinfo.access_level == "private"
+                and name.startswith("__") and name.endswith("__")):
+            continue
 
-        WatchValueWalker(frame_var_info, watch_widget_list, watch_expr) \
-                .walk_value(None, watch_expr.expression, value)
+        if not iinfo.show_methods and _is_definition(globals[name]):
+            continue
 
-    if "__return__" in vars:
-        ret_walker.walk_value(None, "Return", locals["__return__"],
-                attr_prefix="return")
+        yield name
 
+
+def _iter_globals_section(
+            walker: ValueWalker,
+            globals: dict[str, object],
+        ) -> Iterator[VariableWidget]:
+    """Yield the rows of the collapsible "Globals" section. The globals are
+    only enumerated once it is expanded, and then a page at a time, see
+    :func:`_iter_shown_global_names`.
+    """
+    iinfo = walker.frame_var_info.get_inspect_info(
+            GLOBALS_ID_PATH, read_only=True)
+    if not iinfo.show_detail:
+        yield walker.add_item(None, "Globals",
+                f"<{len(globals)} names, expand to see>", GLOBALS_ID_PATH)
+        return
+
+    header = walker.add_item(None, "Globals",
+            f"<{len(globals)} names> [{_get_detail_marker(iinfo)}]",
+            GLOBALS_ID_PATH)
+    yield header
+
+    # Do not globalize: cyclic import
+    from pudb.debugger import CONFIG
+
+    page_size = max(CONFIG["container_page_size"], 1)
+
+    count = 0
+    for name in _iter_shown_global_names(globals, iinfo):
+        if count and count % page_size == 0:
+            cont_item = walker.make_continuation_item(
+                    header, GLOBALS_ID_PATH, count, -1)
+            if cont_item is not None:
+                yield cont_item
+                return
+
+        yield from walker.iter_value(
+                header, name, globals[name], f"{GLOBALS_ID_PATH}.{name}")
+        count += 1
+
+    if not count:
+        yield walker.add_item(header, walker.EMPTY_LABEL, None,
+                f"{GLOBALS_ID_PATH}{walker.EMPTY_LABEL}")
+
+
+def _iter_closure_section(
+            walker: ValueWalker,
+            locals: dict[str, object],
+            closure_vars: list[str],
+        ) -> Iterator[VariableWidget]:
+    """Yield the rows of the "Closure" section, which is expanded unless
+    collapsed. The variables keep the id paths they would have among the
+    locals.
+    """
+    iinfo = walker.frame_var_info.get_inspect_info(
+            CLOSURE_ID_PATH, read_only=True)
+    count = len(closure_vars)
+    count_str = f"{count} variable{'' if count == 1 else 's'}"
+    if not iinfo.show_detail:
+        yield walker.add_item(None, "Closure",
+                f"<{count_str}, expand to see>", CLOSURE_ID_PATH)
+        return
+
+    header = walker.add_item(None, "Closure", f"<{count_str}>",
+            CLOSURE_ID_PATH)
+    yield header
+    for var in closure_vars:
+        yield from walker.iter_value(header, var, locals[var])
+
+# }}}
+
+
+def _iter_watch_rows(
+            frame_var_info: FrameVarInfo,
+            watch_expr: WatchExpression,
+            value: object,
+        ) -> Iterator[VariableWidget]:
+    """
+    :arg value: as returned by :func:`evaluate_watch`.
+    """
+    state = frame_var_info.watch_states[watch_expr.expression]
+    if isinstance(value, WatchSkipped):
+        # Do not globalize: cyclic import
+        from pudb.debugger import CONFIG
+
+        yield _make_stale_watch_widget(state, watch_expr,
+                f"slow: >{CONFIG['watch_budget_ms']}ms")
+        return
+    if isinstance(value, WatchEvalError) and state.value_str is not None:
+        yield _make_stale_watch_widget(state, watch_expr, "<error> now")
+        return
+
+    widgets = ItemMakingValueWalker(frame_var_info, watch_expr) \
+            .iter_value(None, watch_expr.expression, value)
+    first_widget = next(widgets)
+    if not isinstance(value, WatchEvalError):
+        state.value_str = first_widget.value_str
+    yield first_widget
+    yield from widgets
+
+
+@dataclass(frozen=True)
+class DeferredRow:
+    """Stands in for a row of a :class:`VarViewWalker` that is only built,
+    by calling :attr:`make_row`, once it is shown.
+    """
+
+    make_row: Callable[[], urwid.Widget]
+
+
+def iter_var_view(
+            frame_var_info: FrameVarInfo,
+            locals: dict[str, object],
+            globals: dict[str, object],
+            cache: VarViewCache | None = None,
+            stop_serial: int | None = None,
+            inspected: Mapping[str, object] | None = None,
+            closure_names: Iterable[str] = (),
+            defer_watches: bool = False,
+        ) -> Iterator[urwid.Widget | DeferredRow]:
+    """
+    :arg stop_serial: a number identifying the current stop, to highlight
+        values that changed since earlier stops, or *None* to not do so.
+    :arg inspected: objects shown in a section of their own after the
+        watches, by label, e.g. ones picked from the heap histogram.
+    :arg closure_names: the names of the frame's free variables, e.g. its
+        code's ``co_freevars``. Those in *locals* are shown in a "Closure"
+        section instead of with the other locals. Unless *globals* is
+        *locals*, as at module level, or empty, a collapsed "Globals"
+        section follows.
+    :arg defer_watches: whether to yield the rows of collapsed watches that
+        are not pinned as :class:`DeferredRow` instances, so that they are
+        only evaluated once shown, e.g. by a :class:`VarViewWalker`.
+    :returns: an iterator over the rows of the variables view. Values are
+        only stringified and walked as rows are requested, except for those
+        repeated at the top, which are walked right away.
+    """
+    if cache is None:
+        cache = VarViewCache()
+
+    frame_var_info.set_stop(stop_serial, locals.keys())
+
+    var_names = tuple(locals.keys())
+    if var_names == cache.var_names:
+        vars = cache.sorted_var_names
+    else:
+        vars = sorted(var_names, key=str.lower)
+        cache.var_names = var_names
+        cache.sorted_var_names = vars
+
+    closure_vars = sorted(
+            (var for var in closure_names if var in locals), key=str.lower)
+    closure_var_set = set(closure_vars)
+    vars = [var for var in vars
+            if not (var.startswith("__") and var.endswith("__"))
+            and var not in closure_var_set]
+
+    # Do not globalize: cyclic import
+    from pudb.debugger import CONFIG
+
+    if CONFIG["sort_variables_by_size"]:
+        vars = _sort_by_size(vars, locals)
+
+    state_token = _get_view_state_token(frame_var_info)
+    if state_token == cache.state_token:
+        cache.entries = {
+                var: cache.entries[var]
+                for var in vars if var in cache.entries}
+    else:
+        cache.entries = {}
+    cache.state_token = state_token
+
+    # Only the variables containing repeated paths are walked right away.
+    repeated_roots = frame_var_info.get_repeated_roots()
+    tmv_walker = TopAndMainVariableWalker(frame_var_info)
     for var in vars:
-        if not (var.startswith("__") and var.endswith("__")):
+        if (None, var) in repeated_roots:
             tmv_walker.walk_value(None, var, locals[var])
 
-    result = tmv_walker.main_widget_list
+    if (CLOSURE_ID_PATH, None) in repeated_roots:
+        for _ in _iter_closure_section(tmv_walker, locals, closure_vars):
+            pass
+    else:
+        for var in closure_vars:
+            if (None, var) in repeated_roots:
+                tmv_walker.walk_value(None, var, locals[var])
+
+    show_globals = bool(globals) and globals is not locals
+    if show_globals and (GLOBALS_ID_PATH, None) in repeated_roots:
+        for _ in _iter_globals_section(tmv_walker, globals):
+            pass
+    elif show_globals:
+        for name in sorted(name for section, name in repeated_roots
+                if section == GLOBALS_ID_PATH and name in globals):
+            tmv_walker.walk_value(None, name, globals[name],
+                    f"{GLOBALS_ID_PATH}.{name}")
+
+    watch_expressions = {watch_expr.expression
+            for watch_expr in frame_var_info.watches}
+    for expression in list(frame_var_info.watch_states):
+        if expression not in watch_expressions:
+            del frame_var_info.watch_states[expression]
+
+    # Other watches are only evaluated once their rows are requested, or
+    # shown if deferred.
+    pinned_watch_values = {
+            watch_expr: evaluate_watch(frame_var_info, watch_expr, globals, locals)
+            for watch_expr in frame_var_info.watches
+            if watch_expr.pinned}
+
+    def make_deferred_watch_row(watch_expr: WatchExpression) -> DeferredRow:
+        def make_row() -> urwid.Widget:
+            value = evaluate_watch(frame_var_info, watch_expr, globals, locals)
+            return next(_iter_watch_rows(frame_var_info, watch_expr, value))
+
+        return DeferredRow(make_row)
+
+    def iter_rows():
+        if "__return__" in locals:
+            yield from ItemMakingValueWalker(frame_var_info).iter_value(
+                    None, "Return", locals["__return__"], attr_prefix="return")
+
+        if tmv_walker.top_widget_list:
+            yield from tmv_walker.top_widget_list
+            yield SEPARATOR
+
+        have_watches = False
+        for watch_expr in frame_var_info.watches:
+            have_watches = True
+            if watch_expr.pinned:
+                value = pinned_watch_values[watch_expr]
+            elif defer_watches and not frame_var_info.get_inspect_info(
+                    watch_expr.expression, read_only=True).show_detail:
+                # A single row, whatever the value
+                yield make_deferred_watch_row(watch_expr)
+                continue
+            else:
+                value = evaluate_watch(frame_var_info, watch_expr, globals, locals)
+
+            yield from _iter_watch_rows(frame_var_info, watch_expr, value)
+
+        if have_watches:
+            yield SEPARATOR
+
+        if inspected:
+            inspected_walker = ItemMakingValueWalker(frame_var_info)
+            for label, value in inspected.items():
+                yield from inspected_walker.iter_value(None, label, value)
+            yield SEPARATOR
+
+        main_walker = ItemMakingValueWalker(frame_var_info)
+        for var in vars:
+            value = locals[var]
+            prev_entry = cache.entries.get(var)
+            if (prev_entry is not None
+                    and prev_entry.matches(frame_var_info, var, value)):
+                prev_entry.widgets[0].value = value
+                for widget, subtree_value in zip(prev_entry.widgets[1:],
+                        prev_entry.subtree_values or ()):
+                    widget.value = subtree_value
+                yield from prev_entry.widgets
+                continue
+
+            widgets = []
+            for widget in main_walker.iter_value(None, var, value):
+                widgets.append(widget)
+                yield widget
+
+            # Widgets highlighted as changed are only valid for this stop.
+            iinfo = frame_var_info.get_inspect_info(var, read_only=True)
+            subtree_values = None
+            if any(widget.attr_prefix == "changed var" for widget in widgets):
+                reusable = False
+            elif iinfo.show_detail:
+                subtree_values = _get_reusable_subtree_values(
+                        value, iinfo, widgets)
+                reusable = subtree_values is not None
+            else:
+                reusable = _is_reusable(value, iinfo)
 
-    if watch_widget_list:
-        result = ([*watch_widget_list, SEPARATOR, *result])
+            if reusable:
+                cache.entries[var] = _VarViewCacheEntry(
+                        _strong_ref(value), id(value),
+                        _get_stringifier_version(value), widgets, subtree_values)
+            else:
+                cache.entries.pop(var, None)
 
-    if tmv_walker.top_widget_list:
-        result = ([*tmv_walker.top_widget_list, SEPARATOR, *result])
+        if closure_vars:
+            yield from _iter_closure_section(main_walker, locals, closure_vars)
 
-    if ret_walker.widget_list:
-        result = (ret_walker.widget_list + result)
+        if show_globals:
+            yield from _iter_globals_section(main_walker, globals)
 
-    return result
+    return iter_rows()
+
+
+def make_var_view(
+            frame_var_info: FrameVarInfo,
+            locals: dict[str, object],
+            globals: dict[str, object],
+            cache: VarViewCache | None = None,
+            stop_serial: int | None = None,
+        ) -> list[urwid.Widget]:
+    # Without defer_watches, there are no deferred rows.
+    return cast("list[urwid.Widget]", list(iter_var_view(
+        frame_var_info, locals, globals, cache, stop_serial)))
+
+
+class VarViewWalker(urwid.ListWalker):
+    """A list walker that takes its rows from an iterator, such as the one
+    returned by :func:`iter_var_view`, and only consumes it as far as rows
+    are requested, e.g. to fill the screen or when scrolling.
+
+    While a deadline is set (see :meth:`set_deadline`), rows that could not
+    be produced before it are stood in for by a single placeholder row, and
+    are produced later by :meth:`produce_pending_rows`. This keeps the UI
+    responsive while, e.g., a large container is being expanded.
+
+    :class:`DeferredRow` instances among the rows are only built once they
+    are shown, so that, e.g., watches scrolled out of view are not
+    evaluated.
+    """
+
+    PLACEHOLDER: ClassVar[urwid.Widget] = urwid.AttrMap(
+            urwid.Text("computing\N{HORIZONTAL ELLIPSIS}"), "variable separator")
+
+    # Time to spend producing rows per batch, in nanoseconds.
+    BATCH_NS: ClassVar[int] = 30 * 10**6
+
+    def __init__(self):
+        self.rows: list[urwid.Widget | DeferredRow] = []
+        self._row_iter: Iterator[urwid.Widget | DeferredRow] = iter(())
+        self._exhausted = True
+        self._deadline_ns: int | None = None
+        # Highest position requested but not produced before the deadline
+        self._wanted = -1
+        self.focus = 0
+
+    def set_rows(self, row_iter: Iterable[urwid.Widget | DeferredRow]) -> None:
+        """Replace the rows, dropping any that are still pending. The focus
+        position is kept, as far as the new rows reach.
+        """
+        self.rows = []
+        self._row_iter = iter(row_iter)
+        self._exhausted = False
+        self._wanted = -1
+        self._modified()
+
+    def detach(self) -> None:
+        """Stop producing further rows, releasing the references the row
+        iterator holds to the values being shown.
+        """
+        self._row_iter = iter(())
+        self._exhausted = True
+        self._wanted = -1
+
+    def release_values(self) -> None:
+        """Drop the references the rows hold to the values they show, see
+        :attr:`VariableWidget.value`, or are yet to show.
+        """
+        for i, row in enumerate(self.rows):
+            if isinstance(row, VariableWidget):
+                row.value = VariableWidget.NO_VALUE
+            elif isinstance(row, DeferredRow):
+                self.rows[i] = self.PLACEHOLDER
+
+    def set_deadline(self, deadline_ns: int | None) -> None:
+        """
+        :arg deadline_ns: a :func:`time.perf_counter_ns` value after which
+            no more rows are produced on request, or *None* for no limit.
+        """
+        self._deadline_ns = deadline_ns
+
+    def has_pending_rows(self) -> bool:
+        return not self._exhausted and self._wanted >= len(self.rows)
+
+    def produce_pending_rows(self, budget_ns: int | None = None) -> None:
+        """Produce rows that were requested after the deadline, for up to
+        *budget_ns* (default: :attr:`BATCH_NS`).
+        """
+        if budget_ns is None:
+            budget_ns = self.BATCH_NS
+
+        self.set_deadline(perf_counter_ns() + budget_ns)
+        try:
+            self._materialize(self._wanted)
+        finally:
+            self.set_deadline(None)
+
+        self._modified()
+
+    def _materialize(self, position: int) -> bool:
+        """
+        :returns: whether a row exists at *position*. This may be the
+            placeholder at ``len(self.rows)`` if the deadline has passed.
+        """
+        rows = self.rows
+        while len(rows) <= position:
+            if self._exhausted:
+                return False
+            if (self._deadline_ns is not None
+                    and perf_counter_ns() > self._deadline_ns):
+                self._wanted = max(self._wanted, position)
+                return position == len(rows)
+
+            try:
+                rows.append(next(self._row_iter))
+            except StopIteration:
+                self.detach()
+                return False
+            except Exception:
+                ui_log.exception("Failed to build the variables view")
+                self.detach()
+                return False
+
+        return position >= 0
+
+    def _materialize_now(self, position: int) -> bool:
+        """Like :meth:`_materialize`, but disregarding the deadline."""
+        deadline_ns = self._deadline_ns
+        self._deadline_ns = None
+        try:
+            return self._materialize(position)
+        finally:
+            self._deadline_ns = deadline_ns
+
+    def __getitem__(self, position: int) -> urwid.Widget:
+        if not self._materialize(position):
+            raise IndexError(position)
+        if position == len(self.rows):
+            return self.PLACEHOLDER
+
+        row = self.rows[position]
+        if isinstance(row, DeferredRow):
+            try:
+                row = row.make_row()
+            except Exception:
+                ui_log.exception("Failed to build the variables view")
+                row = self.PLACEHOLDER
+            self.rows[position] = row
+        return row
+
+    def next_position(self, position: int) -> int:
+        if not self._materialize(position + 1):
+            raise IndexError(position + 1)
+        return position + 1
+
+    def prev_position(self, position: int) -> int:
+        if position <= 0:
+            raise IndexError(position - 1)
+        return position - 1
+
+    @override
+    def get_focus(self):
+        # The focused row is always produced, regardless of the deadline.
+        if not self._materialize_now(self.focus):
+            self.focus = max(len(self.rows) - 1, 0)
+        return super().get_focus()
+
+    def set_focus(self, position: int) -> None:
+        if not self._materialize_now(position):
+            raise IndexError(position)
+        self.focus = position
+        self._modified()
+
+    def positions(self, reverse: bool = False) -> Iterator[int]:
+        if reverse:
+            # Going to the end requires producing all rows.
+            while self._materialize_now(len(self.rows)):
+                pass
+            return iter(range(len(self.rows) - 1, -1, -1))
+
+        def forward():
+            position = 0
+            while self._materialize(position):
+                yield position
+                position += 1
+
+        return forward()
+
+    def index(self, widget: urwid.Widget) -> int:
+        return self.rows.index(widget)
 
 
 class FrameVarInfoKeeper:
-    frame_var_info: dict[str, FrameVarInfo]
+    """Keeps a :class:`FrameVarInfo` per function, identified by a
+    :data:`FrameKey`, for the :data:`MAX_FRAME_VAR_INFOS` most recently
+    used functions.
+
+    If the ``persist_var_view_state`` option is set, the state is also saved
+    to the configuration directory by :meth:`save_var_view_state` and loaded
+    from there the first time a function is seen.
+    """
+
+    frame_var_info: OrderedDict[FrameKey, FrameVarInfo]
+    var_view_caches: OrderedDict[FrameKey, VarViewCache]
+
+    # Number of frames for which inspection state is kept in memory.
+    MAX_FRAME_VAR_INFOS: ClassVar[int] = 100
+
+    # Number of frames for which inspection state is saved.
+    MAX_SAVED_FRAMES: ClassVar[int] = 500
+
+    # Number of frames for which widgets are kept for reuse.
+    MAX_VAR_VIEW_CACHES: ClassVar[int] = 8
+
+    # Saved per-frame entries, loaded on first use. Entries of frames that
+    # are also in :attr:`frame_var_info` may be out of date.
+    saved_state: OrderedDict[FrameKey, dict[str, object]] | None
+    # Frames whose state may have changed since it was last saved
+    modified_frames: set[FrameKey]
 
     # self.debugger set by subclass
     debugger:  Debugger  # pyright: ignore[reportUninitializedInstanceVariable]
 
     def __init__(self):
-        self.frame_var_info = {}
+        self.frame_var_info = OrderedDict()
+        self.var_view_caches = OrderedDict()
+        self.saved_state = None
+        self.modified_frames = set()
+
+    # {{{ saved state
+
+    @staticmethod
+    def _is_persistent() -> bool:
+        # Do not globalize: cyclic import
+        from pudb.debugger import CONFIG
+
+        return CONFIG["persist_var_view_state"]
+
+    def _get_saved_state(self) -> OrderedDict[FrameKey, dict[str, object]]:
+        if self.saved_state is None:
+            from pudb.settings import load_var_view_state
+
+            self.saved_state = OrderedDict()
+            for entry in load_var_view_state():
+                key = (entry.get("file"), entry.get("qualname"),
+                        entry.get("firstlineno"))
+                if (isinstance(key[0], str) and isinstance(key[1], str)
+                        and isinstance(key[2], int)):
+                    self.saved_state[key] = entry
+
+        return self.saved_state
+
+    def _stash_saved_state(self, ssid: FrameKey, fvi: FrameVarInfo) -> None:
+        state = fvi.get_saved_state()
+        saved_state = self._get_saved_state()
+        saved_state.pop(ssid, None)
+        if not state:
+            return
 
-    def get_frame_var_info(self, read_only: bool, ssid: str | None = None):
+        filename, qualname, firstlineno = ssid
+        saved_state[ssid] = {
+                "file": filename,
+                "qualname": qualname,
+                "firstlineno": firstlineno,
+                **state}
+
+        while len(saved_state) > self.MAX_SAVED_FRAMES:
+            saved_state.popitem(last=False)
+
+    def save_var_view_state(self) -> None:
+        """Save the state of the frames modified since the last call, if the
+        ``persist_var_view_state`` option is set.
+        """
+        if not self.modified_frames or not self._is_persistent():
+            return
+
+        for ssid in self.modified_frames:
+            fvi = self.frame_var_info.get(ssid)
+            if fvi is not None:
+                self._stash_saved_state(ssid, fvi)
+
+        from pudb.settings import save_var_view_state
+        save_var_view_state(list(self._get_saved_state().values()))
+        self.modified_frames.clear()
+
+    # }}}
+
+    def _find_frame_var_info(self, ssid: FrameKey) -> FrameVarInfo | None:
+        fvi = self.frame_var_info.get(ssid)
+        if fvi is not None:
+            self.frame_var_info.move_to_end(ssid)
+            return fvi
+
+        if self._is_persistent():
+            entry = self._get_saved_state().get(ssid)
+            if entry is not None:
+                fvi = FrameVarInfo.from_saved_state(entry)
+                self._add_frame_var_info(ssid, fvi)
+
+        return fvi
+
+    def _add_frame_var_info(self, ssid: FrameKey, fvi: FrameVarInfo) -> None:
+        self.frame_var_info[ssid] = fvi
+        while len(self.frame_var_info) > self.MAX_FRAME_VAR_INFOS:
+            old_ssid, old_fvi = self.frame_var_info.popitem(last=False)
+            if old_ssid in self.modified_frames and self._is_persistent():
+                self._stash_saved_state(old_ssid, old_fvi)
+
+    def get_frame_var_info(self, read_only: bool, ssid: FrameKey | None = None):
         if ssid is None:
             ssid = self.debugger.get_stack_situation_id()
+
+        fvi = self._find_frame_var_info(ssid)
         if read_only:
-            return self.frame_var_info.get(ssid, FrameVarInfo())
-        else:
-            return self.frame_var_info.setdefault(ssid, FrameVarInfo())
+            return fvi if fvi is not None else FrameVarInfo()
+
+        if fvi is None:
+            fvi = FrameVarInfo()
+            self._add_frame_var_info(ssid, fvi)
+        fvi.state_version += 1
+        self.modified_frames.add(ssid)
+        return fvi
+
+    def get_tracking_frame_var_info(self, ssid: FrameKey | None = None):
+        """Like ``get_frame_var_info(read_only=True)``, but keeps the
+        :class:`FrameVarInfo` for the frame, so that it can track changes
+        between stops.
+        """
+        if ssid is None:
+            ssid = self.debugger.get_stack_situation_id()
+
+        fvi = self._find_frame_var_info(ssid)
+        if fvi is None:
+            fvi = FrameVarInfo()
+            self._add_frame_var_info(ssid, fvi)
+        return fvi
+
+    def get_var_view_cache(self, ssid: FrameKey | None = None) -> VarViewCache:
+        if ssid is None:
+            ssid = self.debugger.get_stack_situation_id()
+
+        try:
+            self.var_view_caches.move_to_end(ssid)
+            return self.var_view_caches[ssid]
+        except KeyError:
+            cache = self.var_view_caches[ssid] = VarViewCache()
+            while len(self.var_view_caches) > self.MAX_VAR_VIEW_CACHES:
+                self.var_view_caches.popitem(last=False)
+            return cache
+
+    def release_var_view_values(self) -> None:
+        """See :meth:`VarViewCache.release_values`."""
+        for cache in self.var_view_caches.values():
+            cache.release_values()
 
 # }}}
 